@@ -41,6 +41,16 @@ def write_df(df: pd.DataFrame, path: Union[str, Path]):
         raise NotImplementedError(f'Can not write df with extension {ext.value}')
 
 
+def append_df(df: pd.DataFrame, path: Union[str, Path]):
+    """ Append dataframe to given .csv. Header is written only if the file does not exist yet. """
+
+    ext = get_restricted_extension(path, [AnalysisExtension.CSV])
+    if ext == AnalysisExtension.CSV:
+        df.to_csv(path, index=False, mode='a', header=not Path(path).exists())
+    else:
+        raise NotImplementedError(f'Can not write df with extension {ext.value}')
+
+
 def equal_df(expected_df: pd.DataFrame, actual_df: pd.DataFrame) -> bool:
     return (expected_df.empty and actual_df.empty) or expected_df.reset_index(drop=True).equals(
         actual_df.reset_index(drop=True))
@@ -1,8 +1,11 @@
 from typing import List, Optional
 
 import pandas as pd
+from hyperstyle.src.python.review.application_config import LanguageVersion
 
 from core.src.model.column_name import SubmissionColumns
+from core.src.model.quality.issue.issue import BaseIssue
+from core.src.model.quality.report import BaseReport
 from core.src.utils.quality.report_utils import get_language_version, parse_report
 
 
@@ -12,15 +15,33 @@ def split_code_to_lines(code: str, keep_ends: bool = False) -> List[str]:
     return code.splitlines(keep_ends)
 
 
+def merge_lines_to_code(code_lines: List[str]) -> str:
+    """ Merge code lines split by `split_code_to_lines` back to code. """
+
+    return '\n'.join(code_lines)
+
+
+def get_comment_to_code_line(issue: BaseIssue, language_version: LanguageVersion) -> str:
+    """ Get comment with issue name to add in the end of code line. """
+
+    comment_symbol = '#' if language_version == LanguageVersion.PYTHON_3 else '//'
+    return f'  {comment_symbol} {issue.get_name()}'
+
+
 def get_code_with_issue_comment(submission: pd.Series, issues_column: str,
                                 issue_name: Optional[str] = None,
-                                issue_line_number: Optional[int] = None) -> str:
-    """ Add comment to code lines where issues appear in submission. """
+                                issue_line_number: Optional[int] = None,
+                                report: Optional[BaseReport] = None) -> str:
+    """
+    Add comment to code lines where issues appear in submission.
+    Already parsed `report` can be passed to avoid parsing it from `issues_column` again.
+    """
 
     code_lines = split_code_to_lines(submission[SubmissionColumns.CODE.value])
     language_version = get_language_version(submission[SubmissionColumns.LANG.value])
 
-    report = parse_report(submission, issues_column)
+    if report is None:
+        report = parse_report(submission, issues_column)
     for issue in report.get_issues():
         if issue_name is None or issue.get_name() == issue_name:
             if issue_line_number is None or issue.get_line_number() == issue_line_number:
@@ -0,0 +1,118 @@
+import datetime
+from dataclasses import fields, is_dataclass, MISSING
+from functools import lru_cache
+from types import NoneType
+from typing import (
+    Any, Callable, Dict, get_args, get_origin, get_type_hints, List, Optional, Tuple, Type, TypeVar, Union,
+)
+
+from data_collection.src.api.utils import str_to_datetime
+from data_collection.src.utils.json_utils import kebab_to_snake_case
+
+T = TypeVar('T')
+
+# Converter of json value to the value of field type, None means that the value is used as is
+Converter = Optional[Callable[[Any], Any]]
+# Field name, its name in kebab case, converter of its value, whether it has default value and whether it is optional
+FieldPlan = Tuple[str, str, Converter, bool, bool]
+
+_NO_VALUE = object()
+
+
+class DecodingError(ValueError):
+    pass
+
+
+def decode(data_class: Type[T], data: Dict[str, Any]) -> T:
+    """
+    Decode json `data` to `data_class` instance like `dacite.from_dict` with datetime parsing does,
+    but using the decoder built once for each dataclass. Keys can be both in snake and kebab case.
+    """
+
+    return get_decoder(data_class)(data)
+
+
+@lru_cache(maxsize=None)
+def get_decoder(data_class: Type[T]) -> Callable[[Dict[str, Any]], T]:
+    """ Build decoder of json to `data_class` instance from types of its fields. """
+
+    type_hints = get_type_hints(data_class)
+    plans: List[FieldPlan] = [
+        (
+            field.name,
+            field.name.replace('_', '-'),
+            _get_converter(type_hints[field.name]),
+            field.default is not MISSING or field.default_factory is not MISSING,
+            _is_optional(type_hints[field.name]),
+        )
+        for field in fields(data_class)
+        if field.init
+    ]
+
+    def _decode(data: Dict[str, Any]) -> T:
+        kwargs = {}
+        for name, kebab_name, converter, has_default, is_optional in plans:
+            value = data.get(name, _NO_VALUE)
+            if value is _NO_VALUE:
+                value = data.get(kebab_name, _NO_VALUE)
+
+            if value is _NO_VALUE:
+                if has_default:
+                    continue
+                if not is_optional:
+                    raise DecodingError(f'Missing value for field "{name}" of {data_class.__name__}')
+                value = None
+            elif converter is not None and value is not None:
+                value = converter(value)
+
+            kwargs[name] = value
+        return data_class(**kwargs)
+
+    return _decode
+
+
+def _is_optional(field_type: Any) -> bool:
+    return get_origin(field_type) is Union and NoneType in get_args(field_type)
+
+
+def _get_converter(field_type: Any) -> Converter:  # noqa: WPS231 Each type is converted in its own way
+    if field_type is datetime.datetime:
+        return str_to_datetime
+
+    if is_dataclass(field_type):
+        return get_decoder(field_type)
+
+    origin = get_origin(field_type)
+    args = get_args(field_type)
+
+    if origin is Union:
+        types = [arg for arg in args if arg is not NoneType]
+        if len(types) == 1:
+            return _get_converter(types[0])
+        return _get_union_converter(types)
+
+    if origin is list:
+        item_converter = _get_converter(args[0]) if args else None
+        if item_converter is None:
+            return None
+        return lambda value: [item_converter(item) for item in value]
+
+    if field_type is Any or field_type is dict or origin is dict:
+        return kebab_to_snake_case
+
+    return None
+
+
+def _get_union_converter(types: List[Any]) -> Converter:
+    """ Values are converted to the first type of union which fits them: dicts to dataclasses, other as is. """
+
+    def _convert(value: Any) -> Any:
+        for union_type in types:
+            if is_dataclass(union_type):
+                if isinstance(value, dict):
+                    return get_decoder(union_type)(value)
+            elif isinstance(value, get_origin(union_type) or union_type):
+                return value
+        raise DecodingError(f'Value {value!r} does not match any of {types}')
+
+    return _convert
@@ -0,0 +1,46 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+
+class PageCache:
+    """
+    On-disk cache of raw json pages received from the platform.
+
+    Each page is saved to a separate file in `cache_path` named by the hash of request url and params
+    (including the page number), so pages of different requests and threads never overwrite each other.
+    Files are written atomically, therefore a page interrupted while saving is just fetched again.
+    """
+
+    def __init__(self, cache_path: str):
+        os.makedirs(cache_path, exist_ok=True)
+        self.cache_path = cache_path
+
+    @staticmethod
+    def get_key(api_url: str, params: Dict[str, Any]) -> str:
+        request = json.dumps([api_url, sorted(params.items())], default=str)
+        return hashlib.sha1(request.encode()).hexdigest()
+
+    def _get_page_path(self, api_url: str, params: Dict[str, Any]) -> str:
+        return os.path.join(self.cache_path, f'{self.get_key(api_url, params)}.json')
+
+    def get(self, api_url: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """ Get cached page json of given request or None if the page was not cached. """
+
+        page_path = self._get_page_path(api_url, params)
+        if not os.path.exists(page_path):
+            return None
+
+        with open(page_path, encoding='utf8') as f:
+            return json.load(f)['response']
+
+    def put(self, api_url: str, params: Dict[str, Any], response_json: Dict[str, Any]):
+        """ Save page json of given request together with the request itself. """
+
+        page_path = self._get_page_path(api_url, params)
+        tmp_path = f'{page_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf8') as f:
+            json.dump({'url': api_url, 'params': params, 'response': response_json}, f, default=str)
+        os.replace(tmp_path, page_path)
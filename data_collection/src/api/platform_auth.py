@@ -1,10 +1,23 @@
 import webbrowser
+from enum import Enum, unique
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from typing import Optional
 from urllib.parse import parse_qs, urlparse
 
 import requests
 
+from data_collection.src.api.token_cache import Token
+
+
+@unique
+class GrantType(str, Enum):  # noqa: WPS600 We can inherit from str in Enums
+    AUTHORIZATION_CODE = 'authorization_code'
+    CLIENT_CREDENTIALS = 'client_credentials'
+
+    @classmethod
+    def values(cls):
+        return list(map(lambda c: c.value, cls))
+
 
 class OauthHandler(BaseHTTPRequestHandler):
     """ Handler process authorization code request and ask platform for access token."""
@@ -22,7 +35,7 @@ class OauthHandler(BaseHTTPRequestHandler):
         response = requests.post(
             '{host}/oauth2/token/'.format(host=self.server.platform_host),
             data={
-                'grant_type': 'authorization_code',
+                'grant_type': GrantType.AUTHORIZATION_CODE.value,
                 'code': code,
                 'redirect_uri': 'http://localhost:{port}'.format(port=self.server.port),
             },
@@ -32,9 +45,9 @@ class OauthHandler(BaseHTTPRequestHandler):
         self.send_response(200)
         self.send_header("Content-type", "text/html")
         self.end_headers()
-        access_token = response.json()['access_token']
-        self.server.platform_token = access_token
-        self.wfile.write(access_token.encode())
+        token = Token.from_response(response.json())
+        self.server.platform_token = token
+        self.wfile.write(token.access_token.encode())
 
 
 class OauthServer(HTTPServer):
@@ -57,7 +70,7 @@ class OauthServer(HTTPServer):
             client_id=self.client_id)
         webbrowser.open(oauth_url)
 
-    def get_token(self) -> Optional[str]:
+    def get_token(self) -> Optional[Token]:
         """ Execute token request. """
 
         self.handle_request()
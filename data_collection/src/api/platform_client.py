@@ -1,33 +1,299 @@
 import datetime
 import logging
 import os
-from dataclasses import asdict
-from typing import Dict, List, Optional, Type, TypeVar
+import random
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from http import HTTPStatus
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, TypeVar
 
+import numpy as np
 import requests
-from dacite import Config, from_dict
+from requests.adapters import HTTPAdapter
 
-from data_collection.src.api.platform_auth import OauthServer
+from data_collection.src.api.decoder import decode
+from data_collection.src.api.page_cache import PageCache
+from data_collection.src.api.platform_auth import GrantType, OauthServer
+from data_collection.src.api.rate_limiter import RateLimiter
+from data_collection.src.api.token_cache import Token, TokenCache
 from core.src.model.api.platform_objects import BaseRequestParams, Object, ObjectResponse
-from data_collection.src.api.utils import str_to_datetime
 from data_collection.src.hyperskill.hyperskill_objects import HyperskillPlatform
 from data_collection.src.stepik.stepik_objects import StepikPlatform
 from data_collection.src.utils.json_utils import kebab_to_snake_case
+from data_collection.src.utils.objects_writer import ObjectsWriter
 
 T = TypeVar('T', bound=Object)
 
+# Connect and read timeouts in seconds
+DEFAULT_TIMEOUT = (10, 60)
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_IDS_BATCH_SIZE = 100
+# Delay before the n-th retry is BACKOFF_FACTOR * 2^n seconds, but not more than MAX_BACKOFF
+BACKOFF_FACTOR = 1
+MAX_BACKOFF = 60
+RETRY_STATUSES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+
+
+class PlatformRequestError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class FailedRequest(Object):
+    """ Request of the objects page which finally failed. """
+
+    obj_class: str
+    obj_id: Optional[int]
+    page: int
+    params: str
+    error: str
+
+
+def get_backoff(attempt: int) -> float:
+    """ Get delay in seconds before the retry after `attempt` failed attempts with a small random jitter. """
+
+    backoff = min(MAX_BACKOFF, BACKOFF_FACTOR * 2 ** attempt)
+    return backoff * random.uniform(0.9, 1.1)
+
+
+def get_retry_after(response: requests.Response) -> Optional[float]:
+    """ Get delay in seconds from `Retry-After` header which can be number of seconds or date. """
+
+    retry_after = response.headers.get('Retry-After')
+    if retry_after is None:
+        return None
+
+    if retry_after.isdigit():
+        return float(retry_after)
+
+    try:
+        retry_date = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_date - datetime.datetime.now(retry_date.tzinfo)).total_seconds())
+
 
 class PlatformClient:
-    """ Base class for Hyperskill and Stepik clients which wraps data exchange process according to open APIs. """
+    """
+    Base class for Hyperskill and Stepik clients which wraps data exchange process according to open APIs.
+    All requests are sent with one session, so connections to the platform are kept alive and reused.
+
+    If `concurrency` is greater than one, requests for different ids (topics, users, etc.) are sent in parallel
+    by `concurrency` threads and the next page of objects is fetched while the current one is parsed.
+
+    Requests are limited to `rate_limit` per second (not limited by default) and are retried up to `max_retries` times
+    with exponential backoff on connection errors and server errors. If the platform throttles requests, all of them
+    are paused for `Retry-After` seconds and the rate is decreased. Pages which finally failed are kept
+    in `failed_requests`.
+
+    Objects requested by ids are fetched in batches of `ids_batch_size` ids per request if the platform allows it.
+
+    If `updated_since` is given, only objects updated since that time are returned for object classes
+    which have time of the last update (see `UPDATED_AT_FIELDS`). For classes returned by the platform from
+    the newest to the oldest (see `NEWEST_FIRST_CLASSES`), pages with older objects are not requested at all.
+    Syncing can not be resumed from the cache, because cached pages do not depend on `updated_since`.
+
+    If `cache_path` is given, each received page is saved there as raw json. With `resume` cached pages are
+    replayed instead of being requested again, so a restarted collection continues from the first missing page.
+
+    The token is received with `grant_type`: authorization code grant opens the authorization page and waits
+    for the user, while client credentials grant does not require any interaction. If `token_cache_path` is given,
+    the token is saved there and reused by next clients until it expires, then it is refreshed if possible.
+
+    If `objects_writer` is given, each page of objects requested by `get_objects` is written to it as soon as it is
+    received, so they are saved even if the collection is interrupted. Pages requested in parallel
+    are written in order of their arrival.
+    """
+
+    # Fields with time of the last update of objects by their classes
+    UPDATED_AT_FIELDS: Dict[str, str] = {}
+    # Classes of objects which are returned from the newest to the oldest if sync order params are used
+    NEWEST_FIRST_CLASSES: Set[str] = set()
+
+    def __init__(self, host: str, client_id: str, client_secret: str, port: int,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 concurrency: int = 1,
+                 rate_limit: Optional[float] = None,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 cache_path: Optional[str] = None,
+                 resume: bool = False,
+                 ids_batch_size: int = DEFAULT_IDS_BATCH_SIZE,
+                 updated_since: Optional[datetime.datetime] = None,
+                 grant_type: GrantType = GrantType.AUTHORIZATION_CODE,
+                 token_cache_path: Optional[str] = None,
+                 objects_writer: Optional[ObjectsWriter] = None):
+        if resume and cache_path is None:
+            raise ValueError('Cache path is required to resume data collection')
+        if resume and updated_since is not None:
+            # Cached pages do not depend on the time of the last sync, so they can be outdated
+            raise ValueError('Data collection can not be resumed while syncing updated objects')
 
-    def __init__(self, host: str, client_id: str, client_secret: str, port: int):
         self.host = host
         self.client_id = client_id
         self.client_secret = client_secret
         self.port = port
-        self.token = self._get_authentication_code_token()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.ids_batch_size = ids_batch_size
+        self.updated_since = updated_since
+        self.grant_type = grant_type
+
+        # Each thread can fetch an object and prefetch its next page at the same time
+        self._session = self._create_session(max(pool_size, 2 * concurrency))
+
+        self._token_cache = None if token_cache_path is None else TokenCache(token_cache_path)
+        self._token_lock = Lock()
+        self.token: Optional[str] = None
+        self._set_token(self._get_token())
+
+        self._latencies: List[float] = []
+        self._latencies_lock = Lock()
+
+        self._rate_limiter = RateLimiter(rate_limit)
+        self._page_cache = None if cache_path is None else PageCache(cache_path)
+        self.resume = resume
+        self.failed_requests: List[FailedRequest] = []
+        self._failed_requests_lock = Lock()
+
+        self._objects_writer = objects_writer
+        # Only objects requested by `get_objects` are written, not the related ones (e.g. topics of steps)
+        self._written_obj_class: Optional[str] = None
+        self._written_objects_count = 0
+        self._objects_writer_lock = Lock()
+
+        self._requests_executor: Optional[ThreadPoolExecutor] = None
+        self._pages_executor: Optional[ThreadPoolExecutor] = None
+        if concurrency > 1:
+            # Pages are fetched by separate threads, so requests waiting for their pages never block them
+            self._requests_executor = ThreadPoolExecutor(max_workers=concurrency)
+            self._pages_executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    @staticmethod
+    def _create_session(pool_size: int) -> requests.Session:
+        """ Create session with pool of `pool_size` keep-alive connections to the platform. """
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def close(self):
+        """ Stop all threads and close all connections of the session. """
+
+        for executor in (self._requests_executor, self._pages_executor):
+            if executor is not None:
+                executor.shutdown()
+        self._session.close()
+
+    def get_latency_statistics(self) -> Dict[str, float]:
+        """ Get number of sent requests and percentiles of their latency in seconds. """
+
+        with self._latencies_lock:
+            latencies = list(self._latencies)
+
+        if not latencies:
+            return {'requests': 0}
+
+        return {
+            'requests': len(latencies),
+            'mean': float(np.mean(latencies)),
+            'p50': float(np.percentile(latencies, 50)),
+            'p95': float(np.percentile(latencies, 95)),
+            'max': float(np.max(latencies)),
+        }
+
+    def log_latency_statistics(self):
+        logging.info(f'Requests latency statistics: {self.get_latency_statistics()}')
+
+    def _set_token(self, token: Optional[Token]):
+        self._token = token
+        self.token = None if token is None else token.access_token
+        if self.token is not None:
+            self._session.headers['Authorization'] = 'Bearer {token}'.format(token=self.token)
+
+    def _get_token(self) -> Optional[Token]:
+        """ Get token from the cache refreshing it if it is expired, or run authorization process. """
+
+        if self._token_cache is not None:
+            token = self._token_cache.get(self.host, self.client_id, self.grant_type.value)
+            if token is not None and not token.is_expired():
+                logging.info('Using cached token')
+                return token
+            if token is not None and token.refresh_token is not None:
+                refreshed_token = self._refresh_token(token)
+                if refreshed_token is not None:
+                    return refreshed_token
+
+        if self.grant_type == GrantType.CLIENT_CREDENTIALS:
+            token = self._get_client_credential_token()
+        else:
+            token = self._get_authentication_code_token()
+        self._save_token(token)
+        return token
+
+    def _save_token(self, token: Optional[Token]):
+        if self._token_cache is not None and token is not None:
+            self._token_cache.put(self.host, self.client_id, self.grant_type.value, token)
+
+    def _renew_token(self, expired_token: Optional[Token]) -> bool:
+        """
+        Renew token rejected by the platform without user interaction: refresh it if possible or request new one
+        using client credentials. Returns whether the token can be used.
+        """
+
+        with self._token_lock:
+            if self._token != expired_token:
+                # Token has been already renewed by another thread
+                return True
+
+            token = None
+            if expired_token is not None and expired_token.refresh_token is not None:
+                token = self._refresh_token(expired_token)
+            if token is None and self.grant_type == GrantType.CLIENT_CREDENTIALS:
+                token = self._get_client_credential_token()
+                self._save_token(token)
+            if token is None:
+                return False
+
+            self._set_token(token)
+            return True
+
+    def _refresh_token(self, token: Token) -> Optional[Token]:
+        """ Get new token using refresh token of the expired one. Returns None if the token can not be refreshed. """
 
-    def _get_authentication_code_token(self):
+        auth = requests.auth.HTTPBasicAuth(self.client_id, self.client_secret)
+        try:
+            response = requests.post('{host}/oauth2/token/'.format(host=self.host),
+                                     data={'grant_type': 'refresh_token', 'refresh_token': token.refresh_token},
+                                     auth=auth,
+                                     timeout=self.timeout)
+        except requests.RequestException as e:
+            logging.warning(f'Unable to refresh token: {e}')
+            return None
+
+        if response.status_code != HTTPStatus.OK:
+            logging.warning(f'Unable to refresh token: {response.status_code} {response.reason}')
+            return None
+
+        logging.info('Token is refreshed')
+        refreshed_token = Token.from_response(response.json())
+        self._save_token(refreshed_token)
+        return refreshed_token
+
+    def _get_authentication_code_token(self) -> Optional[Token]:
         """ Runs authorization process using authentication-code grant type and
         gets session token for data exchange. """
 
@@ -38,20 +304,44 @@ class PlatformClient:
         server.open_oauth_page()
         return server.get_token()
 
-    def _get_client_credential_token(self) -> str:
+    def _get_client_credential_token(self) -> Token:
         """ Runs authorization process using client-credential grant type and
         gets session token for data exchange. """
 
         auth = requests.auth.HTTPBasicAuth(self.client_id, self.client_secret)
         response = requests.post('{host}/oauth2/token/'.format(host=self.host),
-                                 data={'grant_type': 'client_credentials'},
-                                 auth=auth)
-        token = response.json().get('access_token', None)
-        if not token:
-            logging.error('Unable to authorize with provided credentials')
-            exit(1)
-        logging.info(f'Got token: {token}')
-        return token
+                                 data={'grant_type': GrantType.CLIENT_CREDENTIALS.value},
+                                 auth=auth,
+                                 timeout=self.timeout)
+        if response.status_code != HTTPStatus.OK or not response.json().get('access_token'):
+            raise ValueError('Unable to authorize with provided credentials')
+
+        logging.info('Got token using client credentials')
+        return Token.from_response(response.json())
+
+    @staticmethod
+    def _get_obj_class_value(obj_class: str) -> str:
+        # Since Python 3.11 format of str enums returns the name of the member instead of its value
+        return str(getattr(obj_class, 'value', obj_class))
+
+    def _start_writing(self, obj_class: str):
+        """ Start writing pages of objects of given class to the objects writer. """
+
+        with self._objects_writer_lock:
+            self._written_obj_class = self._get_obj_class_value(obj_class)
+            self._written_objects_count = 0
+
+    def _write_objects(self, obj_class: str, objects: List[T], count: Optional[int] = None):
+        """ Write received objects to the objects writer if they are requested, but not more than `count`. """
+
+        if self._objects_writer is None or self._get_obj_class_value(obj_class) != self._written_obj_class:
+            return
+
+        with self._objects_writer_lock:
+            if count is not None:
+                objects = objects[:max(0, count - self._written_objects_count)]
+            self._written_objects_count += len(objects)
+            self._objects_writer.write_objects(objects)
 
     def _get_objects(self,
                      obj_class: str,
@@ -63,28 +353,81 @@ class PlatformClient:
 
         objects = []
         page = 1
+        next_page_response: Optional[Future] = None
         while count is None or len(objects) < count:
-            logging.info(f'Getting {obj_class} page={page} params={params}')
+            page_params = replace(params, page=page)
+            logging.info(f'Getting {obj_class} page={page} params={page_params}')
             # Disabled because I don't know how to fix it while not breaking everything accidentally :-)
             try:  # noqa: WPS229
-                params.page = page
-                response = self._fetch(obj_class, params, obj_response_type, obj_id)
-                if response is None:
-                    break
-                objects += response.get_objects()
+                if next_page_response is not None:
+                    response_json = next_page_response.result()
+                    next_page_response = None
+                else:
+                    response_json = self._fetch_json(obj_class, page_params, obj_id)
+
+                # Fetch the next page while the current one is parsed
+                has_next = kebab_to_snake_case(response_json.get('meta', {})).get('has_next', False)
+                if self._pages_executor is not None and has_next:
+                    next_page_response = self._pages_executor.submit(self._fetch_json, obj_class,
+                                                                     replace(params, page=page + 1), obj_id)
+
+                response = self._parse_response(response_json, obj_response_type)
+                page_objects = response.get_objects()
+                updated_objects = self._filter_updated_objects(obj_class, page_objects)
+                if count is not None:
+                    updated_objects = updated_objects[:count - len(objects)]
+                objects += updated_objects
+                self._write_objects(obj_class, updated_objects, count)
 
                 if count is not None and len(objects) >= count:
-                    return objects[:count]
+                    break
+
+                if obj_class in self.NEWEST_FIRST_CLASSES and len(updated_objects) < len(page_objects) \
+                        and self._is_newest_first(obj_class, page_objects):
+                    logging.info(f'Reached {obj_class} updated before {self.updated_since}')
+                    break
 
                 if response.meta.has_next:
                     page += 1
                 else:
                     break
             except Exception as e:
-                logging.error(f'Unable to get {obj_class} page={page} params={params}: {e}')
+                logging.error(f'Unable to get {obj_class} page={page} params={page_params}: {e}')
+                with self._failed_requests_lock:
+                    self.failed_requests.append(FailedRequest(str(getattr(obj_class, 'value', obj_class)), obj_id,
+                                                              page, str(self._prepare_params(page_params)), str(e)))
+                break
 
+        if next_page_response is not None:
+            next_page_response.cancel()
         return objects
 
+    def _filter_updated_objects(self, obj_class: str, objects: List[T]) -> List[T]:
+        """ Keep only objects updated since `updated_since`. Objects without update time are always kept. """
+
+        updated_at_field = self.UPDATED_AT_FIELDS.get(obj_class)
+        if self.updated_since is None or updated_at_field is None:
+            return objects
+
+        return [
+            obj for obj in objects
+            if getattr(obj, updated_at_field) is None or getattr(obj, updated_at_field) >= self.updated_since
+        ]
+
+    def _is_newest_first(self, obj_class: str, objects: List[T]) -> bool:
+        """
+        Check that objects are sorted from the newest to the oldest, so the rest pages contain only older objects.
+        If the platform ignored the order params, all pages are requested.
+        """
+
+        updated_at_field = self.UPDATED_AT_FIELDS[obj_class]
+        updated_at = [getattr(obj, updated_at_field) for obj in objects if getattr(obj, updated_at_field) is not None]
+        if all(previous >= current for previous, current in zip(updated_at, updated_at[1:])):
+            return True
+
+        logging.warning(f'{obj_class} are not sorted from the newest to the oldest, so all pages are requested')
+        return False
+
     def _get_objects_by_ids(self,
                             obj_class: str,
                             obj_ids: List[int],
@@ -93,16 +436,68 @@ class PlatformClient:
                             count: Optional[int] = None) -> List[T]:
         """ Get objects (steps, topics, ect.) from platform by given `obj_class`, `params` and `obj_ids`."""
 
+        return self._get_objects_concurrently(
+            [
+                (lambda obj_id=obj_id: self._get_objects(obj_class, obj_response_type, params, obj_id))
+                for obj_id in obj_ids
+            ],
+            count,
+        )
+
+    def _get_objects_by_ids_batches(self,
+                                    obj_class: str,
+                                    obj_ids: Optional[List[int]],
+                                    obj_response_type: Type[ObjectResponse[T]],
+                                    params: BaseRequestParams,
+                                    count: Optional[int] = None) -> List[T]:
+        """
+        Get objects (steps, topics, ect.) from platform by given `obj_class`, `params` and `obj_ids`
+        passing up to `ids_batch_size` ids to one request. If `obj_ids` is None, all objects are requested.
+        """
+
+        if obj_ids is None:
+            return self._get_objects(obj_class, obj_response_type, params, count=count)
+
+        batches = [obj_ids[i:i + self.ids_batch_size] for i in range(0, len(obj_ids), self.ids_batch_size)]
+        return self._get_objects_concurrently(
+            [
+                (lambda batch=batch: self._get_objects(obj_class, obj_response_type, replace(params, ids=batch),
+                                                       count=count))
+                for batch in batches
+            ],
+            count,
+        )
+
+    def _get_objects_concurrently(self,
+                                  objects_requestors: List[Callable[[], List[T]]],
+                                  count: Optional[int] = None) -> List[T]:
+        """
+        Run all requestors of objects and concatenate their objects in order of requestors.
+        Requestors are run in parallel if concurrency is enabled, otherwise one by one.
+        When `count` objects are received, the rest requestors are not run.
+        """
+
+        if self._requests_executor is None:
+            objects = []
+            for objects_requestor in objects_requestors:
+                objects += objects_requestor()
+                if count is not None and len(objects) >= count:
+                    return objects[:count]
+            return objects
+
+        futures = [self._requests_executor.submit(objects_requestor) for objects_requestor in objects_requestors]
         objects = []
-        for obj_id in obj_ids:
-            objects += self._get_objects(obj_class, obj_response_type, params, obj_id)
+        for i, future in enumerate(futures):
+            objects += future.result()
             if count is not None and len(objects) >= count:
+                for not_needed_future in futures[i + 1:]:
+                    not_needed_future.cancel()
                 return objects[:count]
 
         return objects
 
     @staticmethod
-    def _prepare_params(params: BaseRequestParams) -> Dict[str, str]:
+    def _prepare_params(params: BaseRequestParams) -> Dict[str, Any]:
         """ Prepare request params. Remove None params and convert list request values to string objects,
         separated by comma. """
 
@@ -115,33 +510,79 @@ class PlatformClient:
             dict_params[key] = value
         return dict_params
 
-    def _fetch(self,
-               obj_class: str,
-               params: BaseRequestParams,
-               obj_response_type: Type[ObjectResponse[T]],
-               obj_id: Optional[int] = None) -> Optional[ObjectResponse[T]]:
-        """ Builds, executed and processes request to educational platform.
-        Response is parsed to `obj_response_type`."""
+    def _fetch_json(self,
+                    obj_class: str,
+                    params: BaseRequestParams,
+                    obj_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Builds and executes request to educational platform, retrying it if the platform is temporarily unavailable.
+        Returns response json. Raises PlatformRequestError if request finally failed.
+        On resume the page is taken from the cache if it was received before.
+        """
 
         dict_params = self._prepare_params(params)
+        # Since Python 3.11 format of str enums returns the name of the member instead of its value
+        if isinstance(obj_class, Enum):
+            obj_class = obj_class.value
         api_url = '{host}/api/{obj_class}s'.format(host=self.host, obj_class=obj_class)
 
         if obj_id is not None:
             api_url = '{url}/{obj_id}'.format(url=api_url, obj_id=obj_id)
-        if self.token is not None:
-            raw_response = requests.get(api_url, headers={'Authorization': 'Bearer {token}'.format(token=self.token)},
-                                        params=dict_params, timeout=None)
-        else:
-            raw_response = requests.get(api_url, params=dict_params, timeout=None)
 
-        if raw_response is None or raw_response.status_code != 200:
-            logging.warning(f"Failed to fetch {api_url}: {raw_response}")
-            return None
-        else:
-            response_json = raw_response.json()
+        if self.resume:
+            cached_json = self._page_cache.get(api_url, dict_params)
+            if cached_json is not None:
+                logging.debug(f'Replayed {api_url} params={dict_params} from cache')
+                return cached_json
+
+        for attempt in range(self.max_retries + 1):
+            self._rate_limiter.acquire()
+            token = self._token
+
+            start = time.perf_counter()
+            try:
+                raw_response = self._session.get(api_url, params=dict_params, timeout=self.timeout)
+            except requests.RequestException as e:
+                error = f'{type(e).__name__}: {e}'
+                logging.warning(f'Failed to fetch {api_url} params={dict_params} attempt={attempt}: {error}')
+                if attempt < self.max_retries:
+                    time.sleep(get_backoff(attempt))
+                continue
+            finally:
+                latency = time.perf_counter() - start
+                with self._latencies_lock:
+                    self._latencies.append(latency)
+            logging.debug(f'Fetched {api_url} params={dict_params} in {latency:.3f}s')
+
+            if raw_response.status_code == HTTPStatus.OK:
+                self._rate_limiter.recover()
+                response_json = raw_response.json()
+                if self._page_cache is not None:
+                    self._page_cache.put(api_url, dict_params, response_json)
+                return response_json
 
-        preprocessed_response = kebab_to_snake_case(response_json)
+            error = f'{raw_response.status_code} {raw_response.reason}'
+            logging.warning(f'Failed to fetch {api_url} params={dict_params} attempt={attempt}: {error}')
+            if raw_response.status_code == HTTPStatus.UNAUTHORIZED and attempt < self.max_retries \
+                    and self._renew_token(token):
+                continue
+            if raw_response.status_code not in RETRY_STATUSES:
+                break
+            if attempt == self.max_retries:
+                continue
+
+            backoff = get_backoff(attempt)
+            if raw_response.status_code == HTTPStatus.TOO_MANY_REQUESTS:
+                retry_after = get_retry_after(raw_response)
+                self._rate_limiter.throttle(backoff if retry_after is None else retry_after)
+            else:
+                time.sleep(backoff)
+
+        raise PlatformRequestError(f'Failed to fetch {api_url} params={dict_params}: {error}')
+
+    @staticmethod
+    def _parse_response(response_json: Dict[str, Any],
+                        obj_response_type: Type[ObjectResponse[T]]) -> ObjectResponse[T]:
+        """ Parse response json to `obj_response_type`. """
 
-        return from_dict(data_class=obj_response_type,
-                         data=preprocessed_response,
-                         config=Config(type_hooks={datetime.datetime: str_to_datetime}))
+        return decode(obj_response_type, response_json)
@@ -0,0 +1,67 @@
+import time
+from threading import Lock
+from typing import Optional
+
+# Rate is not decreased lower than this part of the initial one
+MIN_RATE_FRACTION = 1 / 16
+# Part of the initial rate which is restored after each successful request
+RECOVERY_RATE_FRACTION = 1 / 20
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket limiting requests to `rate` per second on average with bursts up to `capacity`.
+
+    The rate is adaptive: when the platform throttles requests, all requests are paused for the given time
+    and the rate is halved, after successful requests it is gradually restored to the initial one.
+    If `rate` is None, requests are not limited and only pauses asked by the platform are respected.
+    """
+
+    def __init__(self, rate: Optional[float] = None, capacity: Optional[int] = None):
+        self._max_rate = rate
+        self._rate = rate
+        self._capacity = capacity if capacity is not None else max(1, int(rate or 1))
+        self._tokens = float(self._capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = Lock()
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self._rate
+
+    def acquire(self):
+        """ Wait until the next request can be sent. """
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._rate is None:
+                    return
+                else:
+                    self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+                    self._updated_at = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+
+    def throttle(self, pause: float):
+        """ Pause all requests for `pause` seconds and decrease the rate after the platform throttled a request. """
+
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            if self._rate is not None:
+                self._rate = max(self._max_rate * MIN_RATE_FRACTION, self._rate / 2)
+                self._tokens = 0
+                self._updated_at = self._paused_until
+
+    def recover(self):
+        """ Increase the rate after a successful request until it reaches the initial one. """
+
+        with self._lock:
+            if self._rate is not None and self._rate < self._max_rate:
+                self._rate = min(self._max_rate, self._rate + self._max_rate * RECOVERY_RATE_FRACTION)
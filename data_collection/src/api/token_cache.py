@@ -0,0 +1,86 @@
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Any, Dict, Iterator, Optional
+
+DEFAULT_TOKEN_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'hyperstyle-analysis-prod', 'tokens.json')
+# Tokens which expire in less than this number of seconds are not used
+EXPIRATION_MARGIN = 60
+
+
+@dataclass(frozen=True)
+class Token:
+    access_token: str
+    refresh_token: Optional[str] = None
+    # Unix time when the token expires, None if it is unknown
+    expires_at: Optional[float] = None
+
+    @classmethod
+    def from_response(cls, response_json: Dict[str, Any]) -> 'Token':
+        """ Create token from json response of the platform token endpoint. """
+
+        expires_in = response_json.get('expires_in')
+        return cls(
+            access_token=response_json['access_token'],
+            refresh_token=response_json.get('refresh_token'),
+            expires_at=None if expires_in is None else time.time() + float(expires_in),
+        )
+
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at - EXPIRATION_MARGIN < time.time()
+
+
+class TokenCache:
+    """
+    File with tokens of the platforms, so the authorization is not required for each run.
+    Tokens are stored by the platform host, client id and grant type. The file is readable only by its owner.
+    The file is locked while it is read or updated, so it can be shared by parallel processes.
+    """
+
+    def __init__(self, path: str = DEFAULT_TOKEN_CACHE_PATH):
+        self.path = path
+        self._lock = Lock()
+
+    @staticmethod
+    def _get_key(host: str, client_id: str, grant_type: str) -> str:
+        return f'{host} {client_id} {grant_type}'
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """ Lock the file from other threads of this process and from other processes. """
+
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(f'{self.path}.lock', 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+
+        with open(self.path) as f:
+            return json.load(f)
+
+    def get(self, host: str, client_id: str, grant_type: str) -> Optional[Token]:
+        with self._locked():
+            token = self._read().get(self._get_key(host, client_id, grant_type))
+        return None if token is None else Token(**token)
+
+    def put(self, host: str, client_id: str, grant_type: str, token: Token):
+        with self._locked():
+            tokens = self._read()
+            tokens[self._get_key(host, client_id, grant_type)] = asdict(token)
+
+            tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as f:
+                json.dump(tokens, f, indent=4)
+            os.replace(tmp_path, self.path)
@@ -6,6 +6,11 @@ def str_to_datetime(date_string: Optional[str]) -> Optional[datetime.datetime]:
     """ Transform time string from platform in format `2013-07-12T07:00:00Z` to datetime. """
     if date_string is None:
         return None
+    if date_string.endswith('Z'):
+        try:
+            return datetime.datetime.fromisoformat(date_string[:-1])
+        except ValueError:
+            pass
     try:
         timestamp = datetime.datetime.strptime(date_string, '%Y-%m-%dT%H:%M:%S.%fZ')
     except ValueError:
@@ -0,0 +1,109 @@
+import argparse
+import logging
+import sys
+import time
+from typing import Dict, List, Optional
+
+from core.src.model.api.platform_objects import Platform
+from data_collection.src.api.platform_client import DEFAULT_IDS_BATCH_SIZE, DEFAULT_POOL_SIZE, PlatformClient
+from data_collection.src.benchmark.mock_platform import MockPlatformConfig, MockPlatformServer, RESPONSE_TYPES
+from data_collection.src.hyperskill.hyperskill_client import HyperskillClient
+from data_collection.src.stepik.stepik_client import StepikClient
+
+
+class MockHyperskillClient(HyperskillClient):
+    def _get_authentication_code_token(self) -> None:
+        # Mock platform does not check authorization
+        return None
+
+
+class MockStepikClient(StepikClient):
+    def _get_authentication_code_token(self) -> None:
+        # Mock platform does not check authorization
+        return None
+
+
+mock_platform_client = {
+    Platform.HYPERSKILL: MockHyperskillClient,
+    Platform.STEPIK: MockStepikClient,
+}
+
+
+def run_benchmark(config: MockPlatformConfig,
+                  obj_class: str,
+                  ids: Optional[List[int]] = None,
+                  concurrency: int = 1,
+                  pool_size: int = DEFAULT_POOL_SIZE,
+                  ids_batch_size: int = DEFAULT_IDS_BATCH_SIZE) -> Dict[str, float]:
+    """ Collect objects from the mock platform with the platform client and get throughput statistics. """
+
+    with MockPlatformServer(config) as server:
+        client: PlatformClient = mock_platform_client[config.platform](
+            pool_size=pool_size, concurrency=concurrency, ids_batch_size=ids_batch_size,
+        )
+        client.host = server.url
+
+        start = time.perf_counter()
+        objects = client.get_objects(obj_class, ids)
+        total_time = time.perf_counter() - start
+
+        client.close()
+        latency_statistics = client.get_latency_statistics()
+
+    return {
+        'objects': len(objects),
+        'pages': server.platform.ok_responses,
+        'failed_responses': server.platform.failed_responses,
+        'failed_requests': len(client.failed_requests),
+        'seconds': total_time,
+        'objects_per_second': len(objects) / total_time,
+        'pages_per_second': server.platform.ok_responses / total_time,
+        'latency_p50_ms': latency_statistics.get('p50', 0) * 1000,
+        'latency_p95_ms': latency_statistics.get('p95', 0) * 1000,
+    }
+
+
+def configure_parser(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('platform', type=str, help='Platform to imitate.', choices=Platform.values())
+    parser.add_argument('object', type=str, help='Objects to collect from the mock platform.')
+    parser.add_argument('--objects-count', type=int, default=10000, help='Number of objects on the mock platform.')
+    parser.add_argument('--filtered-objects-count', type=int, default=10,
+                        help='Number of objects filtered by related object, e.g. steps of one topic.')
+    parser.add_argument('--ids-count', type=int, default=None,
+                        help='Number of objects to collect by ids. All objects are collected by default.')
+    parser.add_argument('--page-size', type=int, default=100, help='Maximum number of objects in one page.')
+    parser.add_argument('--latency', type=float, default=0.05, help='Latency of the mock platform in seconds.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Part of responses failed with 503 status.')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Part of responses failed with 429 status.')
+    parser.add_argument('--seed', type=int, default=None, help='Seed of errors injection.')
+    parser.add_argument('-c', '--concurrency', type=int, nargs='+', default=[1],
+                        help='Concurrency of the client. Benchmark is run for each given value.')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                        help='Number of keep-alive connections of the client.')
+    parser.add_argument('--ids-batch-size', type=int, default=DEFAULT_IDS_BATCH_SIZE,
+                        help='Number of ids passed to one request.')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    configure_parser(parser)
+
+    args = parser.parse_args(sys.argv[1:])
+    platform = Platform(args.platform)
+    if args.object not in RESPONSE_TYPES[platform]:
+        parser.error(f'Mock platform does not serve {args.object} objects')
+
+    logging.basicConfig(level=logging.WARNING)
+    ids = None if args.ids_count is None else list(range(1, args.ids_count + 1))
+    for concurrency in args.concurrency:
+        config = MockPlatformConfig(platform, args.objects_count, args.filtered_objects_count, args.page_size,
+                                    args.latency, args.error_rate, args.throttle_rate, args.seed)
+        stats = run_benchmark(config, args.object, ids, concurrency, args.pool_size, args.ids_batch_size)
+
+        print(f'concurrency: {concurrency}')
+        for name, value in stats.items():
+            print(f'    {name}: {value:.2f}' if isinstance(value, float) else f'    {name}: {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+"""
+Local stand-in for Hyperskill and Stepik APIs which serves synthetic paginated responses
+with configurable latency and injected errors. It is used to measure data collection performance offline.
+"""
+
+import datetime
+import json
+import random
+import re
+import time
+from dataclasses import dataclass, fields, is_dataclass
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from types import NoneType
+from typing import Any, Dict, get_args, get_origin, get_type_hints, List, Optional, Type, Union
+from urllib.parse import parse_qs, urlparse
+
+from core.src.model.api.platform_objects import ObjectResponse, Platform
+from data_collection.src.hyperskill.api.projects import ProjectsResponse
+from data_collection.src.hyperskill.api.steps import StepsResponse as HyperskillStepsResponse
+from data_collection.src.hyperskill.api.submissions import SubmissionResponse
+from data_collection.src.hyperskill.api.topics import TopicsResponse
+from data_collection.src.hyperskill.api.tracks import TracksResponse
+from data_collection.src.hyperskill.api.users import UserResponse
+from data_collection.src.hyperskill.hyperskill_objects import ObjectClass as HyperskillObjectClass
+from data_collection.src.stepik.api.courses import CoursesResponse
+from data_collection.src.stepik.api.lessons import LessonsResponse
+from data_collection.src.stepik.api.steps import StepsResponse as StepikStepsResponse
+from data_collection.src.stepik.api.submissions import SubmissionsResponse
+from data_collection.src.stepik.api.users import UsersResponse
+from data_collection.src.stepik.stepik_objects import ObjectClass as StepikObjectClass
+
+RESPONSE_TYPES: Dict[Platform, Dict[str, Type[ObjectResponse]]] = {
+    Platform.HYPERSKILL: {
+        HyperskillObjectClass.STEP.value: HyperskillStepsResponse,
+        HyperskillObjectClass.TOPIC.value: TopicsResponse,
+        HyperskillObjectClass.TRACK.value: TracksResponse,
+        HyperskillObjectClass.PROJECT.value: ProjectsResponse,
+        HyperskillObjectClass.USER.value: UserResponse,
+        HyperskillObjectClass.SUBMISSION.value: SubmissionResponse,
+    },
+    Platform.STEPIK: {
+        StepikObjectClass.COURSE.value: CoursesResponse,
+        StepikObjectClass.LESSON.value: LessonsResponse,
+        StepikObjectClass.STEP.value: StepikStepsResponse,
+        StepikObjectClass.USER.value: UsersResponse,
+        StepikObjectClass.SUBMISSION.value: SubmissionsResponse,
+    },
+}
+
+API_PATH_PATTERN = re.compile(r'^/api/(?P<obj_class>[\w-]+)s(/(?P<obj_id>\d+))?/?$')
+# Params filtering objects by related ones, e.g. steps of the topic or submissions of the user
+FILTER_PARAMS = ('topic', 'step', 'user')
+
+
+@dataclass
+class MockPlatformConfig:
+    """
+    Configuration of the mock platform: each list endpoint serves `objects_count` objects by pages of at most
+    `page_size` objects, and `filtered_objects_count` objects if they are filtered by related object
+    (e.g. steps of the topic). Each response is delayed by `latency` seconds, `error_rate` part of responses
+    fail with 503 status and `throttle_rate` part of them with 429 status.
+    """
+
+    platform: Platform = Platform.HYPERSKILL
+    objects_count: int = 1000
+    filtered_objects_count: int = 10
+    page_size: int = 100
+    latency: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+def generate_value(field_type: Any) -> Any:  # noqa: WPS231 Each type is generated in its own way
+    """ Generate synthetic json value of given field type. Optional values are always generated. """
+
+    if field_type is datetime.datetime:
+        return '2023-07-12T07:00:00.123456Z'
+    if is_dataclass(field_type):
+        type_hints = get_type_hints(field_type)
+        return {field.name: generate_value(type_hints[field.name]) for field in fields(field_type) if field.init}
+
+    origin = get_origin(field_type)
+    args = get_args(field_type)
+    if origin is Union:
+        return generate_value(next(arg for arg in args if arg is not NoneType))
+    if origin is list:
+        return [generate_value(args[0])] if args else []
+    if field_type is dict or origin is dict:
+        return {}
+    if field_type is bool:
+        return True
+    if field_type is int:
+        return 1
+    if field_type is float:
+        return 0.5
+    if field_type is str:
+        return 'text'
+    return None
+
+
+class MockPlatform:
+    """ Synthetic objects and response pages of all object classes of the platform. """
+
+    def __init__(self, config: MockPlatformConfig):
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._random_lock = Lock()
+        self._templates: Dict[str, Dict[str, Any]] = {}
+        self._objects_keys: Dict[str, str] = {}
+        for obj_class, response_type in RESPONSE_TYPES[config.platform].items():
+            objects_field = next(field for field in fields(response_type) if field.name != 'meta')
+            objects_type = get_args(get_type_hints(response_type)[objects_field.name])[0]
+            self._objects_keys[obj_class] = objects_field.name
+            self._templates[obj_class] = generate_value(objects_type)
+
+        self.ok_responses = 0
+        self.failed_responses = 0
+        self._stats_lock = Lock()
+
+    def get_failure_status(self) -> Optional[HTTPStatus]:
+        with self._random_lock:
+            value = self._random.random()
+        if value < self.config.throttle_rate:
+            return HTTPStatus.TOO_MANY_REQUESTS
+        if value < self.config.throttle_rate + self.config.error_rate:
+            return HTTPStatus.SERVICE_UNAVAILABLE
+        return None
+
+    def get_page(self, obj_class: str, ids: Optional[List[int]], page: int, page_size: int) -> Optional[Dict]:
+        """ Get response page with objects of given class or None if there is no such class. """
+
+        if obj_class not in self._templates:
+            return None
+
+        if ids is None:
+            ids = list(range(1, self.config.objects_count + 1))
+        page_size = min(page_size, self.config.page_size)
+        page_ids = ids[(page - 1) * page_size:page * page_size]
+
+        template = self._templates[obj_class]
+        return {
+            'meta': {'page': page, 'has_next': page * page_size < len(ids), 'has_previous': page > 1},
+            self._objects_keys[obj_class]: [{**template, 'id': obj_id} for obj_id in page_ids],
+        }
+
+    def add_response(self, is_ok: bool):
+        with self._stats_lock:
+            if is_ok:
+                self.ok_responses += 1
+            else:
+                self.failed_responses += 1
+
+
+class MockPlatformHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are sent separately, so Nagle's algorithm would delay each keep-alive response
+    disable_nagle_algorithm = True
+
+    @property
+    def platform(self) -> MockPlatform:
+        return self.server.platform
+
+    def do_GET(self):  # noqa: N802 Name is defined by BaseHTTPRequestHandler
+        if self.platform.config.latency > 0:
+            time.sleep(self.platform.config.latency)
+
+        url = urlparse(self.path)
+        match = API_PATH_PATTERN.match(url.path)
+        if match is None:
+            self._send(HTTPStatus.NOT_FOUND, {})
+            return
+
+        failure_status = self.platform.get_failure_status()
+        if failure_status is not None:
+            self.platform.add_response(False)
+            retry_after = '0' if failure_status == HTTPStatus.TOO_MANY_REQUESTS else None
+            self._send(failure_status, {}, {} if retry_after is None else {'Retry-After': retry_after})
+            return
+
+        query = parse_qs(url.query)
+        page = int(query.get('page', ['1'])[0])
+        page_size = int(query.get('page_size', [str(self.platform.config.page_size)])[0])
+        ids = self._get_requested_ids(match.group('obj_id'), query)
+
+        response_page = self.platform.get_page(match.group('obj_class'), ids, page, page_size)
+        if response_page is None:
+            self._send(HTTPStatus.NOT_FOUND, {})
+            return
+
+        self.platform.add_response(True)
+        self._send(HTTPStatus.OK, response_page)
+
+    def _get_requested_ids(self, obj_id: Optional[str], query: Dict[str, List[str]]) -> Optional[List[int]]:
+        if obj_id is not None:
+            return [int(obj_id)]
+        if 'ids' in query:
+            return [int(obj_id) for obj_id in query['ids'][0].split(',')]
+        if 'ids[]' in query:
+            return [int(obj_id) for obj_id in query['ids[]']]
+
+        for filter_param in FILTER_PARAMS:
+            if filter_param in query:
+                # Each related object has its own objects
+                related_id = int(query[filter_param][0].split(',')[0])
+                filtered_objects_count = self.platform.config.filtered_objects_count
+                return list(range((related_id - 1) * filtered_objects_count + 1,
+                                  related_id * filtered_objects_count + 1))
+        return None
+
+    def _send(self, status: HTTPStatus, body: Dict, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args):  # noqa: WPS125 Signature is defined by BaseHTTPRequestHandler
+        pass
+
+
+class MockPlatformServer(ThreadingHTTPServer):
+    """ Mock platform server running in a background thread at `url`. Use it as a context manager. """
+
+    daemon_threads = True
+
+    def __init__(self, config: MockPlatformConfig, host: str = 'localhost', port: int = 0):
+        super().__init__((host, port), MockPlatformHandler)
+        self.platform = MockPlatform(config)
+        self._thread = Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f'http://{self.server_address[0]}:{self.server_port}'
+
+    def __enter__(self) -> 'MockPlatformServer':
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+        self.server_close()
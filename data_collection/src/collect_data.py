@@ -1,12 +1,22 @@
 import argparse
 import logging
+import os
 import sys
 from typing import List
 from core.src.utils.df_utils import read_df
 from core.src.model.api.platform_objects import Platform
+from data_collection.src.api.platform_auth import GrantType
+from data_collection.src.api.platform_client import (
+    DEFAULT_IDS_BATCH_SIZE,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_TIMEOUT,
+)
+from data_collection.src.api.token_cache import DEFAULT_TOKEN_CACHE_PATH
 from data_collection.src.hyperskill.hyperskill_client import HyperskillClient
 from data_collection.src.stepik.stepik_client import StepikClient
-from data_collection.src.utils.csv_utils import save_objects_to_csv
+from data_collection.src.utils.objects_writer import ObjectsWriter, OutputFormat, save_objects
+from data_collection.src.utils.sync_utils import get_last_sync_time, sync_objects_csv
 
 platform_client = {
     Platform.HYPERSKILL: HyperskillClient,
@@ -26,6 +36,36 @@ def configure_parser() -> argparse.ArgumentParser:
     parser.add_argument('--ids-from-column', '-c', type=str, default=None, help='column in csv file to get ids from')
     parser.add_argument('--count', '-cnt', type=int, default=None, help='count of requested objects')
     parser.add_argument('--port', '-p', type=int, default=8000, help='port to run authorization server at')
+    parser.add_argument('--grant-type', type=str, default=GrantType.AUTHORIZATION_CODE.value,
+                        choices=GrantType.values(),
+                        help='grant type of authorization: authorization code grant opens authorization page, '
+                             'client credentials grant does not require any interaction')
+    parser.add_argument('--token-cache-path', type=str, default=DEFAULT_TOKEN_CACHE_PATH,
+                        help='file to save platform token to and reuse it by next runs')
+    parser.add_argument('--no-token-cache', action='store_true', help='do not save and reuse platform token')
+    parser.add_argument('--connect-timeout', type=float, default=DEFAULT_TIMEOUT[0],
+                        help='seconds to wait for connection to platform')
+    parser.add_argument('--read-timeout', type=float, default=DEFAULT_TIMEOUT[1],
+                        help='seconds to wait for response from platform')
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                        help='number of keep-alive connections to platform')
+    parser.add_argument('--concurrency', type=int, default=1,
+                        help='number of requests to platform sent in parallel')
+    parser.add_argument('--rate-limit', type=float, default=None,
+                        help='maximum number of requests to platform per second (not limited by default)')
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help='number of retries of failed request to platform')
+    parser.add_argument('--ids-batch-size', type=int, default=DEFAULT_IDS_BATCH_SIZE,
+                        help='number of ids of requested objects passed to one request')
+    parser.add_argument('--cache-path', type=str, default=None,
+                        help='directory to save received pages to (`cache` in output directory by default)')
+    parser.add_argument('--output-format', type=str, default=OutputFormat.CSV.value, choices=OutputFormat.values(),
+                        help='format of files with collected objects')
+    parser.add_argument('--sync', action='store_true',
+                        help='request only objects updated since the previous sync and merge them '
+                             'into csv file collected before')
+    parser.add_argument('--resume', action='store_true',
+                        help='replay pages saved to cache by previous run and request only missing ones')
     return parser
 
 
@@ -44,8 +84,29 @@ def main():
     parser = configure_parser()
     args = parser.parse_args(sys.argv[1:])
 
+    cache_path = args.cache_path if args.cache_path is not None else os.path.join(args.output_path, 'cache')
+
     platform = Platform(args.platform)
-    client = platform_client[platform]()
+    client_class = platform_client[platform]
+    output_format = OutputFormat(args.output_format)
+
+    updated_since = None
+    if args.sync:
+        if args.object not in client_class.UPDATED_AT_FIELDS:
+            parser.error(f'Sync is not supported for {args.object} objects')
+        if output_format != OutputFormat.CSV:
+            parser.error('Sync is supported only for csv output format')
+        if args.resume:
+            parser.error('Sync can not be resumed from cached pages, run it again without --resume')
+        updated_since = get_last_sync_time(args.output_path, args.object)
+        logging.info(f'Syncing {args.object} objects updated since {updated_since}')
+
+    # Without sync objects are written as soon as pages are received, otherwise they are merged after collection
+    objects_writer = None if args.sync else ObjectsWriter(args.output_path, args.object, output_format)
+    client = client_class(args.port, (args.connect_timeout, args.read_timeout), args.pool_size,
+                          args.concurrency, args.rate_limit, args.max_retries, cache_path, args.resume,
+                          args.ids_batch_size, updated_since, GrantType(args.grant_type),
+                          None if args.no_token_cache else args.token_cache_path, objects_writer)
 
     if args.ids is not None:
         ids = args.ids
@@ -54,8 +115,26 @@ def main():
     else:
         ids = None
 
-    objects = client.get_objects(args.object, ids, args.count)
-    save_objects_to_csv(args.output_path, objects, args.object)
+    try:
+        objects = client.get_objects(args.object, ids, args.count)
+    finally:
+        client.log_latency_statistics()
+        client.close()
+        if objects_writer is not None:
+            objects_writer.close()
+
+    if not args.sync:
+        logging.info(f'{objects_writer.objects_count} {args.object} objects are written')
+    elif client.failed_requests:
+        # The sync state is not moved forward, so objects of failed requests are requested again by the next sync
+        logging.error('Updated objects are not merged because some requests failed')
+    else:
+        sync_objects_csv(args.output_path, objects, args.object, client_class.UPDATED_AT_FIELDS[args.object])
+
+    if client.failed_requests:
+        logging.error(f'{len(client.failed_requests)} requests failed, '
+                      f'see {args.output_path}/failed_requests.{output_format.value}')
+        save_objects(args.output_path, client.failed_requests, 'failed_request', output_format)
 
 
 if __name__ == '__main__':
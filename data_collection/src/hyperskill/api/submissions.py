@@ -18,6 +18,7 @@ from data_collection.src.hyperskill.hyperskill_objects import HyperskillPlatform
 class SubmissionRequestParams(BaseRequestParams):
     step: Optional[List[int]] = None
     user: Optional[int] = None
+    order: Optional[str] = None
 
 
 @dataclass(frozen=True)
@@ -1,17 +1,26 @@
+import datetime
 import os
-from typing import Callable, Dict, List, Optional
-
-from data_collection.src.api.platform_client import PlatformClient
+from typing import Callable, Dict, List, Optional, Tuple
+
+from data_collection.src.api.platform_auth import GrantType
+from data_collection.src.api.platform_client import (
+    DEFAULT_IDS_BATCH_SIZE,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_TIMEOUT,
+    PlatformClient,
+)
 from core.src.model.api.platform_objects import BaseRequestParams, Object
 from data_collection.src.hyperskill.api.projects import Project, ProjectsResponse
 from data_collection.src.hyperskill.api.search_results import \
     SearchResult, SearchResultsRequestParams, SearchResultsResponse
-from data_collection.src.hyperskill.api.steps import StepsRequestParams, StepsResponse
+from data_collection.src.hyperskill.api.steps import Step, StepsRequestParams, StepsResponse
 from data_collection.src.hyperskill.api.submissions import Submission, SubmissionRequestParams, SubmissionResponse
 from data_collection.src.hyperskill.api.topics import Topic, TopicsResponse
 from data_collection.src.hyperskill.api.tracks import Track, TracksResponse
 from data_collection.src.hyperskill.api.users import User, UserResponse
 from data_collection.src.hyperskill.hyperskill_objects import HyperskillPlatform, ObjectClass
+from data_collection.src.utils.objects_writer import ObjectsWriter
 
 
 ObjectRequestor = Callable[[Optional[List[int]], Optional[int]], List[Object]]
@@ -24,10 +33,30 @@ class HyperskillClient(PlatformClient):
     for data exchange.
     """
 
-    def __init__(self, port: int = 8000):
+    UPDATED_AT_FIELDS = {
+        ObjectClass.STEP: 'updated_at',
+        ObjectClass.SUBMISSION: 'time',
+    }
+    NEWEST_FIRST_CLASSES = {ObjectClass.SUBMISSION}
+
+    def __init__(self, port: int = 8000,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 concurrency: int = 1,
+                 rate_limit: Optional[float] = None,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 cache_path: Optional[str] = None,
+                 resume: bool = False,
+                 ids_batch_size: int = DEFAULT_IDS_BATCH_SIZE,
+                 updated_since: Optional[datetime.datetime] = None,
+                 grant_type: GrantType = GrantType.AUTHORIZATION_CODE,
+                 token_cache_path: Optional[str] = None,
+                 objects_writer: Optional[ObjectsWriter] = None):
         client_id = os.environ.get(HyperskillPlatform.CLIENT_ID)
         client_secret = os.environ.get(HyperskillPlatform.CLIENT_SECRET)
-        super().__init__(HyperskillPlatform.BASE_URL, client_id, client_secret, port)
+        super().__init__(HyperskillPlatform.BASE_URL, client_id, client_secret, port, timeout, pool_size, concurrency,
+                         rate_limit, max_retries, cache_path, resume, ids_batch_size, updated_since, grant_type,
+                         token_cache_path, objects_writer)
 
         self._get_objects_by_class: Dict[ObjectClass, ObjectRequestor] = {
             ObjectClass.TOPIC: self.get_topics,
@@ -40,8 +69,11 @@ class HyperskillClient(PlatformClient):
 
     def get_objects(self, obj: str, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Object]:
         if obj not in ObjectClass.values():
+            self._start_writing(ObjectClass.SEARCH_RESULT)
             return self.get_search_result(obj, count)
 
+        self._start_writing(ObjectClass(obj))
+
         return self._get_objects_by_class[ObjectClass(obj)](ids, count)
 
     def get_search_result(self, query: str, count: Optional[int] = None) -> List[SearchResult]:
@@ -52,43 +84,47 @@ class HyperskillClient(PlatformClient):
     def get_steps(self, ids: Optional[List[int]] = None,
                   count: Optional[int] = None,
                   topic_ids: Optional[List[int]] = None):
-        """ Returns steps data. If topic_ids are defined method returns steps only related to listed topics, otherwise
-         return all steps. """
+        """ Returns steps data. If ids are defined, steps are requested by batches of ids directly, otherwise steps
+        of all topics are requested topic by topic in parallel. If topic_ids are defined method returns steps only
+        related to listed topics. """
+        if ids is not None:
+            steps = self._get_objects_by_ids_batches(ObjectClass.STEP, ids, StepsResponse, StepsRequestParams(),
+                                                     count=count)
+            if topic_ids is not None:
+                steps = [s for s in steps if s.topic in topic_ids]
+            return steps
+
         if topic_ids is None:
             topics = self.get_topics()
             topic_ids = [t.id for t in topics]
 
-        steps = []
-        for topic_id in topic_ids:
-            steps += self._get_objects(ObjectClass.STEP, StepsResponse,
-                                       StepsRequestParams(topic=topic_id), count=count)
-            if count is not None and len(steps) >= count:
-                return steps[:count]
+        def get_topic_steps(topic_id: int) -> List[Step]:
+            return self._get_objects(ObjectClass.STEP, StepsResponse, StepsRequestParams(topic=topic_id), count=count)
 
-        if ids is not None:
-            steps = [s for s in steps if s.id in ids]
-
-        return steps
+        return self._get_objects_concurrently(
+            [(lambda topic_id=topic_id: get_topic_steps(topic_id)) for topic_id in topic_ids],
+            count,
+        )
 
     def get_topics(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Topic]:
         """ Returns topics data. """
-        return self._get_objects(ObjectClass.TOPIC, TopicsResponse,
-                                 BaseRequestParams(ids=ids), count=count)
+        return self._get_objects_by_ids_batches(ObjectClass.TOPIC, ids, TopicsResponse,
+                                                BaseRequestParams(), count=count)
 
     def get_projects(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Project]:
         """ Returns projects data. """
-        return self._get_objects(ObjectClass.PROJECT, ProjectsResponse,
-                                 BaseRequestParams(ids=ids), count=count)
+        return self._get_objects_by_ids_batches(ObjectClass.PROJECT, ids, ProjectsResponse,
+                                                BaseRequestParams(), count=count)
 
     def get_tracks(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Track]:
         """ Returns tracks data. """
-        return self._get_objects(ObjectClass.TRACK, TracksResponse,
-                                 BaseRequestParams(ids=ids), count=count)
+        return self._get_objects_by_ids_batches(ObjectClass.TRACK, ids, TracksResponse,
+                                                BaseRequestParams(), count=count)
 
     def get_users(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[User]:
         """ Returns users data. Only about users which have shared their profile data. """
-        return self._get_objects(ObjectClass.USER, UserResponse,
-                                 BaseRequestParams(ids=ids), count=count)
+        return self._get_objects_by_ids_batches(ObjectClass.USER, ids, UserResponse,
+                                                BaseRequestParams(), count=count)
 
     def get_submissions(self, ids: Optional[List[int]] = None,
                         count: Optional[int] = None,
@@ -96,14 +132,17 @@ class HyperskillClient(PlatformClient):
                         user_ids: Optional[List[int]] = None) -> List[Submission]:
         """ Returns submissions data. Only for steps, which have been passed by application owner and only submissions
         which were shared by user. """
+        # Submissions are requested from the newest to the oldest, so pages of not updated ones are not requested
+        order = None if self.updated_since is None else 'desc'
         if user_ids is None:
-            return self._get_objects(ObjectClass.SUBMISSION, SubmissionResponse,
-                                     SubmissionRequestParams(ids=ids, step=step_ids), count=count)
-
-        submissions = []
-        for user_id in user_ids:
-            submissions += self._get_objects(ObjectClass.SUBMISSION, SubmissionResponse,
-                                             SubmissionRequestParams(ids=ids, step=step_ids, user=user_id), count=count)
-            if count is not None and len(submissions) >= count:
-                return submissions[:count]
-        return submissions
+            return self._get_objects_by_ids_batches(ObjectClass.SUBMISSION, ids, SubmissionResponse,
+                                                    SubmissionRequestParams(step=step_ids, order=order), count=count)
+
+        def get_user_submissions(user_id: int) -> List[Submission]:
+            params = SubmissionRequestParams(ids=ids, step=step_ids, user=user_id, order=order)
+            return self._get_objects(ObjectClass.SUBMISSION, SubmissionResponse, params, count=count)
+
+        return self._get_objects_concurrently(
+            [(lambda user_id=user_id: get_user_submissions(user_id)) for user_id in user_ids],
+            count,
+        )
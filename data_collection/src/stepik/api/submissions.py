@@ -14,7 +14,7 @@ from core.src.model.api.platform_objects import BaseRequestParams, Object, Objec
 
 @dataclass
 class SubmissionRequestParams(BaseRequestParams):
-    pass
+    order: Optional[str] = None
 
 
 @dataclass(frozen=True)
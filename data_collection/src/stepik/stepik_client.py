@@ -1,27 +1,57 @@
+import datetime
 import os
-from typing import Callable, Dict, List, Optional, Type, TypeVar
+from dataclasses import replace
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
 
-from data_collection.src.api.platform_client import PlatformClient
+from data_collection.src.api.platform_auth import GrantType
+from data_collection.src.api.platform_client import (
+    DEFAULT_IDS_BATCH_SIZE,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_TIMEOUT,
+    PlatformClient,
+)
 from core.src.model.api.platform_objects import BaseRequestParams, Object, ObjectResponse
 from data_collection.src.stepik.api.courses import Course, CoursesResponse
 from data_collection.src.stepik.api.lessons import Lesson, LessonsResponse
 from data_collection.src.stepik.api.search_results import SearchResult, SearchResultsRequestParams, \
     SearchResultsResponse
 from data_collection.src.stepik.api.steps import Step, StepsResponse
-from data_collection.src.stepik.api.submissions import Submission, SubmissionsResponse
+from data_collection.src.stepik.api.submissions import Submission, SubmissionRequestParams, SubmissionsResponse
 from data_collection.src.stepik.api.users import User, UsersResponse
 from data_collection.src.stepik.stepik_objects import ObjectClass, StepikPlatform
+from data_collection.src.utils.objects_writer import ObjectsWriter
 
 T = TypeVar('T', bound=Object)
 ObjectRequestor = Callable[[Optional[List[int]], Optional[int]], List[Object]]
 
 
 class StepikClient(PlatformClient):
+    UPDATED_AT_FIELDS = {
+        ObjectClass.LESSON: 'update_date',
+        ObjectClass.STEP: 'update_date',
+        ObjectClass.SUBMISSION: 'time',
+    }
+    NEWEST_FIRST_CLASSES = {ObjectClass.SUBMISSION}
 
-    def __init__(self, port: int = 8000):
+    def __init__(self, port: int = 8000,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 concurrency: int = 1,
+                 rate_limit: Optional[float] = None,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 cache_path: Optional[str] = None,
+                 resume: bool = False,
+                 ids_batch_size: int = DEFAULT_IDS_BATCH_SIZE,
+                 updated_since: Optional[datetime.datetime] = None,
+                 grant_type: GrantType = GrantType.AUTHORIZATION_CODE,
+                 token_cache_path: Optional[str] = None,
+                 objects_writer: Optional[ObjectsWriter] = None):
         client_id = os.environ.get(StepikPlatform.CLIENT_ID)
         client_secret = os.environ.get(StepikPlatform.CLIENT_SECRET)
-        super().__init__(StepikPlatform.BASE_URL, client_id, client_secret, port)
+        super().__init__(StepikPlatform.BASE_URL, client_id, client_secret, port, timeout, pool_size, concurrency,
+                         rate_limit, max_retries, cache_path, resume, ids_batch_size, updated_since, grant_type,
+                         token_cache_path, objects_writer)
 
         self._get_objects_by_class: Dict[ObjectClass, ObjectRequestor] = {
             ObjectClass.COURSE: self.get_courses,
@@ -33,8 +63,11 @@ class StepikClient(PlatformClient):
 
     def get_objects(self, obj: str, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Object]:
         if obj not in ObjectClass.values():
+            self._start_writing(ObjectClass.SEARCH_RESULT)
             return self.get_search_result(obj, count)
 
+        self._start_writing(ObjectClass(obj))
+
         return self._get_objects_by_class[ObjectClass(obj)](ids, count)
 
     def get_search_result(self, query: str, count: Optional[int] = None) -> List[SearchResult]:
@@ -54,13 +87,22 @@ class StepikClient(PlatformClient):
         return self._get_objects_default(ids, count, ObjectClass.USER, UsersResponse)
 
     def get_submissions(self, ids: Optional[List[int]] = None, count: Optional[int] = None) -> List[Submission]:
-        return self._get_objects_default(ids, count, ObjectClass.SUBMISSION, SubmissionsResponse)
+        # Submissions are requested from the newest to the oldest, so pages of not updated ones are not requested
+        params = SubmissionRequestParams(order=None if self.updated_since is None else 'desc')
+        return self._get_objects_by_ids_batches(ObjectClass.SUBMISSION, ids, SubmissionsResponse, params, count=count)
 
     def _get_objects_default(self,
                              ids: Optional[List[int]],
                              count: Optional[int],
                              obj_class: ObjectClass,
                              obj_response_type: Type[ObjectResponse[T]]) -> List[T]:
-        params = BaseRequestParams()
-        return self._get_objects_by_ids(obj_class, ids, obj_response_type, params, count=count) if ids is not None \
-            else self._get_objects(obj_class, obj_response_type, params, count=count)
+        return self._get_objects_by_ids_batches(obj_class, ids, obj_response_type, BaseRequestParams(), count=count)
+
+    @staticmethod
+    def _prepare_params(params: BaseRequestParams) -> Dict[str, Any]:
+        """ Prepare request params. Stepik API accepts several ids as repeated `ids[]` params. """
+
+        dict_params = PlatformClient._prepare_params(replace(params, ids=None))
+        if params.ids is not None:
+            dict_params['ids[]'] = params.ids
+        return dict_params
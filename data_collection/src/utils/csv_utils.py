@@ -1,40 +1,86 @@
 import csv
 import logging
 import os
-from dataclasses import asdict
-from typing import List, TypeVar
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, Iterable, List, TypeVar
 
 from core.src.model.api.platform_objects import Object
 
+DEFAULT_BUFFER_SIZE = 10000
+
 
 class CsvWriter:
+    """
+    Writer of rows to csv file. The file is kept open while writing, and rows are written in batches
+    of `buffer_size`, so call `close` (or use the writer as a context manager) to write the rest rows.
+    """
 
-    def __init__(self, result_dir: str, csv_file: str, field_names: List[str]):
+    def __init__(self, result_dir: str, csv_file: str, field_names: List[str], buffer_size: int = DEFAULT_BUFFER_SIZE):
         os.makedirs(result_dir, exist_ok=True)
         self.csv_path = os.path.join(result_dir, csv_file)
         self.fieldnames = field_names
+        self.buffer_size = buffer_size
+
+        self._file = open(self.csv_path, 'w', newline='', encoding='utf8')
+        self._writer = csv.DictWriter(self._file, fieldnames=field_names, extrasaction='ignore')
+        self._writer.writeheader()
+        self._rows: List[dict] = []
 
-        with open(self.csv_path, 'w+', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=field_names)
-            writer.writeheader()
+    def __enter__(self) -> 'CsvWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
     def write_csv(self, data: dict):
-        with open(self.csv_path, 'a+', newline='', encoding='utf8') as f:
-            writer = csv.DictWriter(f, fieldnames=self.fieldnames)
-            writer.writerow({k: data[k] for k in self.fieldnames})
+        self._rows.append(data)
+        if len(self._rows) >= self.buffer_size:
+            self.flush()
+
+    def write_rows(self, rows: Iterable[dict]):
+        for row in rows:
+            self.write_csv(row)
+
+    def flush(self):
+        self._writer.writerows(self._rows)
+        self._rows = []
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
 
 
 T = TypeVar('T', bound=Object)
 
 
+def to_plain_value(value: Any) -> Any:
+    """ Convert nested dataclasses to dicts as `asdict` does, but without copying plain values. """
+
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, (list, tuple)):
+        return type(value)(to_plain_value(item) for item in value)
+    if isinstance(value, dict):
+        return {key: to_plain_value(item) for key, item in value.items()}
+    return value
+
+
+def get_field_names(obj: Object) -> List[str]:
+    return list(type(obj).__annotations__.keys())
+
+
+def object_to_row(obj: Object, field_names: List[str]) -> Dict[str, Any]:
+    return {name: to_plain_value(getattr(obj, name)) for name in field_names}
+
+
 def save_objects_to_csv(output_path: str, objects: List[T], obj_class: str):
     if not objects:
         return
 
-    if not os.path.exists(output_path):
-        os.makedirs(output_path)
-
     logging.info(f'Writing {len(objects)} of type {type(objects[0])} to csv: {output_path}/{obj_class}s.csv')
-    csv_writer = CsvWriter(output_path, f'{obj_class}s.csv', list(type(objects[0]).__annotations__.keys()))
-    for obj in objects:
-        csv_writer.write_csv(asdict(obj))
+    field_names = get_field_names(objects[0])
+    with CsvWriter(output_path, f'{obj_class}s.csv', field_names) as csv_writer:
+        csv_writer.write_rows(object_to_row(obj, field_names) for obj in objects)
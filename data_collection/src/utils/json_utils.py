@@ -2,10 +2,7 @@ def kebab_to_snake_case(json):
     if isinstance(json, dict):
         return kebab_to_snake_case_dict(json)
     if isinstance(json, list):
-        new_json = []
-        for d in json:
-            if isinstance(d, dict):
-                new_json.append(kebab_to_snake_case_dict)
+        return [kebab_to_snake_case(item) for item in json]
     return json
 
 
@@ -0,0 +1,82 @@
+import json
+import logging
+import os
+from enum import Enum
+from threading import Lock
+from typing import IO, List, Optional
+
+from core.src.model.api.platform_objects import Object
+from data_collection.src.utils.csv_utils import CsvWriter, get_field_names, object_to_row
+
+
+class OutputFormat(str, Enum):  # noqa: WPS600 We can inherit from str in Enums
+    CSV = 'csv'
+    JSONL = 'jsonl'
+
+    @classmethod
+    def values(cls):
+        return list(map(lambda c: c.value, cls))
+
+
+class ObjectsWriter:
+    """
+    Thread-safe writer of platform objects to `{obj_class}s.{output_format}` file in `output_path`.
+
+    Objects can be written incrementally by `write_objects` as soon as they are received.
+    The file is created with the first written objects, so nothing is written if there are no objects.
+    """
+
+    def __init__(self, output_path: str, obj_class: str, output_format: OutputFormat = OutputFormat.CSV):
+        self.output_path = output_path
+        self.file_name = f'{obj_class}s.{output_format.value}'
+        self.output_format = output_format
+        self.objects_count = 0
+
+        self._field_names: Optional[List[str]] = None
+        self._csv_writer: Optional[CsvWriter] = None
+        self._jsonl_file: Optional[IO] = None
+        self._lock = Lock()
+
+    def __enter__(self) -> 'ObjectsWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write_objects(self, objects: List[Object]):
+        if not objects:
+            return
+
+        with self._lock:
+            if self._field_names is None:
+                self._open(objects[0])
+
+            rows = [object_to_row(obj, self._field_names) for obj in objects]
+            if self._csv_writer is not None:
+                self._csv_writer.write_rows(rows)
+            else:
+                self._jsonl_file.write(''.join(f'{json.dumps(row, default=str)}\n' for row in rows))
+            self.objects_count += len(objects)
+
+    def _open(self, obj: Object):
+        logging.info(f'Writing objects of type {type(obj)} to {self.output_format.value}: '
+                     f'{self.output_path}/{self.file_name}')
+        self._field_names = get_field_names(obj)
+        if self.output_format == OutputFormat.CSV:
+            self._csv_writer = CsvWriter(self.output_path, self.file_name, self._field_names)
+        else:
+            os.makedirs(self.output_path, exist_ok=True)
+            self._jsonl_file = open(os.path.join(self.output_path, self.file_name), 'w', encoding='utf8')
+
+    def close(self):
+        with self._lock:
+            if self._csv_writer is not None:
+                self._csv_writer.close()
+            if self._jsonl_file is not None:
+                self._jsonl_file.close()
+
+
+def save_objects(output_path: str, objects: List[Object], obj_class: str,
+                 output_format: OutputFormat = OutputFormat.CSV):
+    with ObjectsWriter(output_path, obj_class, output_format) as writer:
+        writer.write_objects(objects)
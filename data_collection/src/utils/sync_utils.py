@@ -0,0 +1,76 @@
+import datetime
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from core.src.model.api.platform_objects import Object
+from data_collection.src.utils.csv_utils import get_field_names, object_to_row
+
+SYNC_STATE_FILE = 'sync_state.json'
+
+
+def _get_sync_state_path(output_path: str) -> str:
+    return os.path.join(output_path, SYNC_STATE_FILE)
+
+
+def _read_sync_state(output_path: str) -> Dict[str, str]:
+    sync_state_path = _get_sync_state_path(output_path)
+    if not os.path.exists(sync_state_path):
+        return {}
+
+    with open(sync_state_path) as f:
+        return json.load(f)
+
+
+def get_last_sync_time(output_path: str, obj_class: str) -> Optional[datetime.datetime]:
+    """ Get the latest update time of objects of `obj_class` collected by the previous successful sync. """
+
+    last_sync_time = _read_sync_state(output_path).get(obj_class)
+    return None if last_sync_time is None else datetime.datetime.fromisoformat(last_sync_time)
+
+
+def save_last_sync_time(output_path: str, obj_class: str, last_sync_time: datetime.datetime):
+    sync_state = _read_sync_state(output_path)
+    sync_state[obj_class] = last_sync_time.isoformat()
+
+    with open(_get_sync_state_path(output_path), 'w') as f:
+        json.dump(sync_state, f, indent=4)
+
+
+def _to_csv_value(value) -> str:
+    return '' if value is None else str(value)
+
+
+def sync_objects_csv(output_path: str, objects: List[Object], obj_class: str, updated_at_field: str) -> int:
+    """
+    Merge updated `objects` into `{obj_class}s.csv` in `output_path` collected previously: objects with the same id
+    are replaced and new ones are appended. Stored values are kept as is, so the file is not changed by reading.
+    Returns number of objects in the merged file and saves the latest update time of objects to the sync state.
+    """
+
+    csv_path = os.path.join(output_path, f'{obj_class}s.csv')
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False) if os.path.exists(csv_path) else pd.DataFrame()
+
+    if objects:
+        field_names = get_field_names(objects[0])
+        rows = [object_to_row(obj, field_names) for obj in objects]
+        updated_df = pd.DataFrame(
+            [{name: _to_csv_value(value) for name, value in row.items()} for row in rows],
+            columns=field_names,
+        )
+        df = pd.concat([df, updated_df]).drop_duplicates(subset='id', keep='last')
+
+    if df.empty:
+        return 0
+
+    logging.info(f'Merged {len(objects)} updated objects into {len(df)} objects: {csv_path}')
+    os.makedirs(output_path, exist_ok=True)
+    df.to_csv(csv_path, index=False)
+
+    last_sync_time = pd.to_datetime(df[updated_at_field], errors='coerce', format='ISO8601').max()
+    if not pd.isna(last_sync_time):
+        save_last_sync_time(output_path, obj_class, last_sync_time.to_pydatetime())
+    return len(df)
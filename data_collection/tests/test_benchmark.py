@@ -0,0 +1,42 @@
+import pytest
+
+from core.src.model.api.platform_objects import Platform
+from data_collection.src.benchmark.benchmark_collection import run_benchmark
+from data_collection.src.benchmark.mock_platform import MockPlatformConfig
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr('data_collection.src.api.platform_client.BACKOFF_FACTOR', 0)
+
+
+BENCHMARK_TEST_DATA = [
+    (Platform.HYPERSKILL, 'user', None, 1, 250, 3),
+    (Platform.HYPERSKILL, 'step', None, 4, 250 * 10, 3 + 250),
+    (Platform.HYPERSKILL, 'step', list(range(1, 151)), 4, 150, 2),
+    (Platform.STEPIK, 'submission', None, 1, 250, 3),
+    (Platform.STEPIK, 'lesson', list(range(1, 151)), 2, 150, 2),
+]
+
+
+@pytest.mark.parametrize(('platform', 'obj_class', 'ids', 'concurrency', 'expected_objects', 'expected_pages'),
+                         BENCHMARK_TEST_DATA)
+def test_run_benchmark(platform: Platform, obj_class: str, ids, concurrency: int,
+                       expected_objects: int, expected_pages: int):
+    config = MockPlatformConfig(platform, objects_count=250, page_size=100)
+    stats = run_benchmark(config, obj_class, ids, concurrency)
+
+    assert stats['objects'] == expected_objects
+    assert stats['pages'] == expected_pages
+    assert stats['failed_requests'] == 0
+
+
+def test_run_benchmark_with_errors():
+    config = MockPlatformConfig(Platform.STEPIK, objects_count=1000, page_size=10, error_rate=0.1, throttle_rate=0.1,
+                                seed=42)
+    stats = run_benchmark(config, 'step', concurrency=2)
+
+    assert stats['objects'] == 1000
+    assert stats['pages'] == 100
+    assert stats['failed_responses'] > 0
+    assert stats['failed_requests'] == 0
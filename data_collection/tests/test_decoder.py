@@ -0,0 +1,67 @@
+import datetime
+from typing import Any, Dict
+
+import pytest
+
+from data_collection.src.api.decoder import decode, DecodingError
+from data_collection.src.hyperskill.api.submissions import Feedback, Submission
+from data_collection.src.hyperskill.api.users import UserResponse
+from data_collection.src.utils.json_utils import kebab_to_snake_case
+from data_collection.tests.test_platform_client import get_user
+
+
+def get_submission(feedback: Any) -> Dict[str, Any]:
+    return {
+        'id': 1, 'user_id': 2, 'attempt': 3, 'eta': 0, 'feedback': feedback, 'hint': '', 'reply': None,
+        'initial_status': 'evaluation', 'status': 'correct', 'client': 'web', 'step': 4,
+        'time': '2023-07-12T07:00:00.123456Z', 'can-download-test-set': False, 'is_downloaded_test': False,
+        'is_free_test': False, 'next_free_test_available_at': '2023-07-12T07:00:00Z', 'is_samples_test': False,
+        'solving_context': 'default', 'is_published': False,
+    }
+
+
+def test_decode_response():
+    response = decode(UserResponse, {
+        'meta': {'page': 1, 'has-next': False, 'has_previous': False},
+        'users': [get_user(1), get_user(2)],
+    })
+
+    assert response.meta.has_next is False
+    assert [user.fullname for user in response.users] == ['user1', 'user2']
+    assert response.users[0].gamification.active_days == 0
+    assert response.users[0].country is None
+    assert response.users[0].url.endswith('/1')
+
+
+def test_decode_submission():
+    submission = decode(Submission, get_submission('Wrong answer'))
+
+    assert submission.feedback == 'Wrong answer'
+    assert submission.time == datetime.datetime(2023, 7, 12, 7, 0, 0, 123456)
+    assert submission.next_free_test_available_at == datetime.datetime(2023, 7, 12, 7, 0, 0)
+    assert submission.can_download_test_set is False
+    assert submission.failed_test_number is None
+
+
+def test_decode_union_with_dataclass():
+    submission = decode(Submission, get_submission({
+        'message': 'Good job',
+        'code_style': {'quality': {'code': 'A', 'text': 'Good'}, 'errors': []},
+    }))
+
+    assert isinstance(submission.feedback, Feedback)
+    assert submission.feedback.code_style.quality.code == 'A'
+
+
+def test_decode_missing_field():
+    submission = get_submission(None)
+    del submission['status']
+
+    with pytest.raises(DecodingError):
+        decode(Submission, submission)
+
+
+def test_kebab_to_snake_case():
+    json = {'a-b': [{'c-d': 1}, [{'e-f': 2}], 3], 'g-h': {'i-j': None}}
+
+    assert kebab_to_snake_case(json) == {'a_b': [{'c_d': 1}, [{'e_f': 2}], 3], 'g_h': {'i_j': None}}
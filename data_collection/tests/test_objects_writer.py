@@ -0,0 +1,55 @@
+import csv
+import json
+from dataclasses import asdict
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from data_collection.src.api.platform_client import PlatformClient
+from data_collection.src.hyperskill.api.users import User, UserResponse
+from data_collection.src.utils.objects_writer import ObjectsWriter, OutputFormat
+from data_collection.tests.test_platform_client import get_user
+
+
+@pytest.fixture
+def users() -> List[User]:
+    response = PlatformClient._parse_response({
+        'meta': {'page': 1, 'has_next': False, 'has_previous': False},
+        'users': [get_user(user_id) for user_id in range(1, 6)],
+    }, UserResponse)
+    return response.get_objects()
+
+
+def test_write_objects_to_csv_incrementally(users: List[User], tmp_path: Path):
+    with ObjectsWriter(str(tmp_path), 'user') as writer:
+        writer.write_objects(users[:2])
+        writer.write_objects([])
+        writer.write_objects(users[2:])
+
+    with open(tmp_path / 'users.csv', encoding='utf8') as f:
+        rows = list(csv.DictReader(f))
+
+    expected_rows = [
+        {key: '' if value is None else str(value) for key, value in asdict(user).items()}
+        for user in users
+    ]
+    assert rows == expected_rows
+    assert writer.objects_count == len(users)
+
+
+def test_write_objects_to_jsonl(users: List[User], tmp_path: Path):
+    with ObjectsWriter(str(tmp_path), 'user', OutputFormat.JSONL) as writer:
+        writer.write_objects(users)
+
+    with open(tmp_path / 'users.jsonl', encoding='utf8') as f:
+        rows = [json.loads(line) for line in f]
+
+    assert rows == [asdict(user) for user in users]
+
+
+def test_write_no_objects(tmp_path: Path):
+    with ObjectsWriter(str(tmp_path), 'user') as writer:
+        writer.write_objects([])
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,320 @@
+import datetime
+import json
+import multiprocessing
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Thread
+from typing import Callable, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from data_collection.src.api.platform_auth import GrantType
+from data_collection.src.api.platform_client import PlatformClient
+from data_collection.src.api.rate_limiter import RateLimiter
+from data_collection.src.api.token_cache import Token, TokenCache
+from data_collection.src.benchmark.mock_platform import generate_value
+from data_collection.src.hyperskill.api.submissions import Submission
+from data_collection.src.hyperskill.hyperskill_objects import HyperskillPlatform, ObjectClass
+from data_collection.src.hyperskill.hyperskill_client import HyperskillClient
+from data_collection.src.utils.objects_writer import ObjectsWriter
+
+PAGES_COUNT = 3
+
+
+def get_user(user_id: int) -> Dict:
+    return {
+        'id': user_id, 'avatar': '', 'badge_title': '', 'bio': '', 'fullname': f'user{user_id}',
+        'gamification': {'active_days': 0, 'daily_step_completed_count': 0, 'passed_problems': 0,
+                         'passed_projects': 0, 'passed_topics': 0},
+        'invitation_code': '', 'comments_posted': {}, 'username': '', 'selected_tracks': [], 'completed_tracks': [],
+        'languages': [],
+    }
+
+
+class FlakyPlatformHandler(BaseHTTPRequestHandler):
+    """
+    Handler which throttles the first attempt of each request and fails the second attempt of the second page.
+    Requests with `expired` token are rejected. Tokens are issued by client credentials and refresh token grants.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # noqa: N802 Name is defined by BaseHTTPRequestHandler
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        page = int(query['page'][0])
+        self.server.requests.append(self.path)
+        attempts = self.server.requests.count(self.path)
+
+        if url.path != '/api/users':
+            self._send(HTTPStatus.NOT_FOUND, {})
+        elif self.headers.get('Authorization') == 'Bearer expired':
+            self._send(HTTPStatus.UNAUTHORIZED, {})
+        elif attempts == 1:
+            self._send(HTTPStatus.TOO_MANY_REQUESTS, {}, {'Retry-After': '0'})
+        elif page == 2 and attempts == 2:
+            self._send(HTTPStatus.SERVICE_UNAVAILABLE, {})
+        else:
+            self._send(HTTPStatus.OK, self._get_users_page(page, query.get('ids')))
+
+    def do_POST(self):  # noqa: N802 Name is defined by BaseHTTPRequestHandler
+        body = parse_qs(self.rfile.read(int(self.headers['Content-Length'])).decode())
+        self.server.token_requests.append(body['grant_type'][0])
+        self._send(HTTPStatus.OK, {'access_token': body['grant_type'][0], 'expires_in': 36000})
+
+    @staticmethod
+    def _get_users_page(page: int, ids: Optional[List[str]]) -> Dict:
+        if ids is not None:
+            return {
+                'meta': {'page': page, 'has_next': False, 'has_previous': False},
+                'users': [get_user(int(user_id)) for user_id in ids[0].split(',')],
+            }
+
+        return {
+            'meta': {'page': page, 'has_next': page < PAGES_COUNT, 'has_previous': page > 1},
+            'users': [get_user(page)],
+        }
+
+    def _send(self, status: HTTPStatus, body: Dict, headers: Dict[str, str] = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args):  # noqa: WPS125 Signature is defined by BaseHTTPRequestHandler
+        pass
+
+
+@pytest.fixture
+def platform_server() -> Iterator[ThreadingHTTPServer]:
+    server = ThreadingHTTPServer(('localhost', 0), FlakyPlatformHandler)
+    server.requests = []
+    server.token_requests = []
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f'http://localhost:{server.server_port}'
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def create_client(platform_server: ThreadingHTTPServer, monkeypatch) -> Iterator[Callable[..., HyperskillClient]]:
+    monkeypatch.setattr(PlatformClient, '_get_authentication_code_token', lambda self: None)
+    monkeypatch.setattr('data_collection.src.api.platform_client.BACKOFF_FACTOR', 0)
+    clients = []
+
+    def _create_client(**kwargs) -> HyperskillClient:
+        client = HyperskillClient(max_retries=2, **kwargs)
+        client.host = platform_server.url
+        clients.append(client)
+        return client
+
+    yield _create_client
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def client(create_client: Callable[..., HyperskillClient]) -> HyperskillClient:
+    return create_client()
+
+
+def test_get_objects_with_retries(client: HyperskillClient):
+    users = client.get_users()
+
+    assert [user.id for user in users] == list(range(1, PAGES_COUNT + 1))
+    assert client.failed_requests == []
+    assert client.get_latency_statistics()['requests'] == 2 * PAGES_COUNT + 1
+
+
+def test_get_objects_by_ids_batches(create_client: Callable[..., HyperskillClient]):
+    client = create_client(ids_batch_size=2)
+    users = client.get_users(ids=[1, 2, 3, 4, 5])
+
+    assert [user.id for user in users] == [1, 2, 3, 4, 5]
+    assert client.failed_requests == []
+    # Each of 3 batches is throttled once
+    assert client.get_latency_statistics()['requests'] == 6
+
+
+def test_get_steps_by_ids(client: HyperskillClient, monkeypatch):
+    requests = []
+
+    def get_objects(obj_class, obj_response_type, params, count=None):
+        requests.append((obj_class, params))
+        return []
+
+    monkeypatch.setattr(client, '_get_objects', get_objects)
+
+    client.get_steps(ids=list(range(250)))
+
+    assert [obj_class for obj_class, _ in requests] == [ObjectClass.STEP] * 3
+    assert [params.ids for _, params in requests] == [list(range(0, 100)), list(range(100, 200)), list(range(200, 250))]
+
+
+@pytest.mark.parametrize(('concurrency', 'count'), [(1, None), (1, 2), (4, None), (4, 5)])
+def test_write_objects_as_pages_arrive(create_client: Callable[..., HyperskillClient], tmp_path: Path,
+                                       concurrency: int, count: Optional[int]):
+    writer = ObjectsWriter(str(tmp_path), ObjectClass.USER.value)
+    client = create_client(concurrency=concurrency, ids_batch_size=2, objects_writer=writer)
+    written_pages = []
+    writer.write_objects = lambda objects: written_pages.append([obj.id for obj in objects])
+
+    users = client.get_objects(ObjectClass.USER.value, [1, 2, 3, 4, 5], count)
+
+    # Each batch of ids is written separately as soon as it is received
+    assert sorted(written_pages) == ([[1, 2]] if count == 2 else [[1, 2], [3, 4], [5]])
+    assert sorted(user_id for page in written_pages for user_id in page) == [user.id for user in users]
+
+
+@pytest.mark.parametrize(('days', 'expected_ids', 'expected_pages'), [
+    # Submissions are returned from the newest to the oldest, so the last page is not requested
+    ([9, 8, 7, 6, 5, 4], [1, 2, 3], [1, 2]),
+    # The platform ignored the order, so all pages are requested
+    ([4, 5, 6, 7, 8, 9], [4, 5, 6], [1, 2, 3]),
+])
+def test_sync_submissions(create_client: Callable[..., HyperskillClient], days: List[int],
+                          expected_ids: List[int], expected_pages: List[int]):
+    client = create_client(updated_since=datetime.datetime(2023, 7, 7))
+    requested_pages = []
+
+    def fetch_json(obj_class, params, obj_id=None) -> Dict:
+        requested_pages.append(params.page)
+        assert params.order == 'desc'
+        page_days = days[(params.page - 1) * 2:params.page * 2]
+        return {
+            'meta': {'page': params.page, 'has_next': params.page < 3, 'has_previous': params.page > 1},
+            'submissions': [
+                {**generate_value(Submission), 'id': (params.page - 1) * 2 + i + 1, 'time': f'2023-07-0{day}T00:00:00Z'}
+                for i, day in enumerate(page_days)
+            ],
+        }
+
+    client._fetch_json = fetch_json
+    submissions = client.get_submissions()
+
+    assert [submission.id for submission in submissions] == expected_ids
+    assert requested_pages == expected_pages
+
+
+def test_sync_can_not_be_resumed(tmp_path: Path):
+    with pytest.raises(ValueError):
+        HyperskillClient(cache_path=str(tmp_path), resume=True, updated_since=datetime.datetime.now())
+
+
+def test_failed_requests_ledger(client: HyperskillClient):
+    topics = client.get_topics()
+
+    assert topics == []
+    assert len(client.failed_requests) == 1
+    assert client.failed_requests[0].obj_class == ObjectClass.TOPIC.value
+    assert client.failed_requests[0].page == 1
+    assert '404' in client.failed_requests[0].error
+
+
+def test_resume_from_page_cache(create_client: Callable[..., HyperskillClient], tmp_path: Path):
+    users = create_client(cache_path=str(tmp_path)).get_users()
+
+    resumed_client = create_client(cache_path=str(tmp_path), resume=True)
+    assert resumed_client.get_users() == users
+    assert resumed_client.get_latency_statistics()['requests'] == 0
+
+
+def test_resume_from_partial_page_cache(create_client: Callable[..., HyperskillClient], tmp_path: Path):
+    users = create_client(cache_path=str(tmp_path)).get_users()
+    cached_pages = sorted(tmp_path.iterdir(), key=lambda page_path: page_path.stat().st_mtime)
+    cached_pages[-1].unlink()
+
+    resumed_client = create_client(cache_path=str(tmp_path), resume=True)
+    assert resumed_client.get_users() == users
+    assert resumed_client.get_latency_statistics()['requests'] == 1
+
+
+def test_client_credentials_token_cache(platform_server: ThreadingHTTPServer, tmp_path: Path):
+    token_cache_path = str(tmp_path / 'tokens.json')
+    for _ in range(2):
+        client = PlatformClient(platform_server.url, 'client_id', 'client_secret', 0,
+                                grant_type=GrantType.CLIENT_CREDENTIALS, token_cache_path=token_cache_path)
+        client.close()
+        assert client.token == GrantType.CLIENT_CREDENTIALS.value
+
+    assert platform_server.token_requests == [GrantType.CLIENT_CREDENTIALS.value]
+
+
+def test_refresh_rejected_token(create_client: Callable[..., HyperskillClient], platform_server: ThreadingHTTPServer,
+                                tmp_path: Path, monkeypatch):
+    monkeypatch.setenv(HyperskillPlatform.CLIENT_ID, 'client_id')
+    monkeypatch.setenv(HyperskillPlatform.CLIENT_SECRET, 'client_secret')
+    token_cache = TokenCache(str(tmp_path / 'tokens.json'))
+    token_cache.put(HyperskillPlatform.BASE_URL, 'client_id', GrantType.AUTHORIZATION_CODE.value,
+                    Token('expired', 'refresh', time.time() + 3600))
+
+    client = create_client(token_cache_path=token_cache.path)
+    assert client.token == 'expired'
+
+    users = client.get_users()
+
+    assert len(users) == PAGES_COUNT
+    assert client.failed_requests == []
+    assert client.token == 'refresh_token'
+    assert platform_server.token_requests == ['refresh_token']
+    refreshed_token = token_cache.get(platform_server.url, 'client_id', GrantType.AUTHORIZATION_CODE.value)
+    assert refreshed_token.access_token == 'refresh_token'
+
+
+def test_expired_token_is_not_used(tmp_path: Path):
+    token_cache = TokenCache(str(tmp_path / 'tokens.json'))
+    token_cache.put('host', 'client_id', GrantType.CLIENT_CREDENTIALS.value, Token('token', None, time.time() - 1))
+    token = token_cache.get('host', 'client_id', GrantType.CLIENT_CREDENTIALS.value)
+
+    assert token.is_expired()
+    assert token_cache.get('host', 'other_client_id', GrantType.CLIENT_CREDENTIALS.value) is None
+
+
+def put_tokens(token_cache_path: str, client_id: str):
+    token_cache = TokenCache(token_cache_path)
+    for i in range(20):
+        token_cache.put('host', f'{client_id}_{i}', GrantType.CLIENT_CREDENTIALS.value, Token(f'{client_id}_{i}'))
+
+
+def test_token_cache_in_parallel_processes(tmp_path: Path):
+    token_cache_path = str(tmp_path / 'tokens.json')
+    processes = [
+        multiprocessing.Process(target=put_tokens, args=(token_cache_path, f'client_{i}')) for i in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    with open(token_cache_path) as f:
+        assert len(json.load(f)) == 4 * 20
+
+
+def test_rate_limiter():
+    rate_limiter = RateLimiter(rate=100, capacity=1)
+
+    start = time.monotonic()
+    for _ in range(11):
+        rate_limiter.acquire()
+
+    assert time.monotonic() - start >= 0.09
+
+
+def test_rate_limiter_throttle():
+    rate_limiter = RateLimiter(rate=100)
+    rate_limiter.throttle(0.1)
+
+    start = time.monotonic()
+    rate_limiter.acquire()
+
+    assert time.monotonic() - start >= 0.09
+    assert rate_limiter.rate == 50
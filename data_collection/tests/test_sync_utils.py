@@ -0,0 +1,43 @@
+import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from data_collection.src.hyperskill.api.submissions import Submission
+from data_collection.src.api.decoder import decode
+from data_collection.src.utils.objects_writer import save_objects
+from data_collection.src.utils.sync_utils import get_last_sync_time, sync_objects_csv
+from data_collection.tests.test_decoder import get_submission
+
+
+def create_submission(submission_id: int, status: str, time: str) -> Submission:
+    return decode(Submission, {**get_submission(None), 'id': submission_id, 'status': status, 'time': time})
+
+
+def test_sync_objects_csv(tmp_path: Path):
+    save_objects(str(tmp_path), [
+        create_submission(1, 'wrong', '2023-07-01T00:00:00Z'),
+        create_submission(2, 'wrong', '2023-07-02T00:00:00Z'),
+    ], 'submission')
+    stored_df = pd.read_csv(tmp_path / 'submissions.csv', dtype=str, keep_default_na=False)
+
+    objects_count = sync_objects_csv(str(tmp_path), [
+        create_submission(2, 'correct', '2023-07-03T00:00:00Z'),
+        create_submission(3, 'correct', '2023-07-04T00:00:00.5Z'),
+    ], 'submission', 'time')
+
+    df = pd.read_csv(tmp_path / 'submissions.csv', dtype=str, keep_default_na=False)
+    assert objects_count == 3
+    assert df['id'].tolist() == ['1', '2', '3']
+    assert df['status'].tolist() == ['wrong', 'correct', 'correct']
+    assert df.iloc[0].equals(stored_df.iloc[0])
+    assert get_last_sync_time(str(tmp_path), 'submission') == datetime.datetime(2023, 7, 4, 0, 0, 0, 500000)
+
+
+def test_sync_objects_csv_without_stored_objects(tmp_path: Path):
+    assert get_last_sync_time(str(tmp_path), 'submission') is None
+    assert sync_objects_csv(str(tmp_path), [], 'submission', 'time') == 0
+
+    sync_objects_csv(str(tmp_path), [create_submission(1, 'wrong', '2023-07-01T00:00:00Z')], 'submission', 'time')
+
+    assert get_last_sync_time(str(tmp_path), 'submission') == datetime.datetime(2023, 7, 1)
@@ -3,16 +3,17 @@ import logging
 import sys
 import time
 from pathlib import Path
+from typing import Dict
 
 import pandas as pd
 
 from core.src.model.column_name import SubmissionColumns
-from core.src.model.report.hyperstyle_report import HyperstyleReport
+from core.src.model.report.hyperstyle_report import HyperstyleNewFormatReport, HyperstyleReport
 from core.src.utils.df_utils import read_df, write_df
 from core.src.utils.file.file_utils import get_output_path, get_output_filename
 from data_labelling.src.hyperstyle.evaluation_args import configure_arguments
 from data_labelling.src.hyperstyle.hyperstyle_evaluation_config import HyperstyleEvaluationConfig
-from data_labelling.src.utils.evaluation_utils import evaluate_by_solution
+from data_labelling.src.utils.evaluation_utils import evaluate_by_batch, evaluate_by_solution
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -32,10 +33,41 @@ def parse_hyperstyle_result(results_path: Path) -> pd.Series:
     return pd.Series({SubmissionColumns.HYPERSTYLE_ISSUES.value: report.to_json()})
 
 
-def evaluate_hyperstyle(df_solutions: pd.DataFrame, config: HyperstyleEvaluationConfig) -> pd.DataFrame:
-    """ Run hyperstyle tool on solutions. """
+def parse_hyperstyle_batch_result(results_path: Path) -> Dict[Path, pd.Series]:
+    """ Parse result for batch of solutions by paths of their files. """
+
+    try:
+        report = HyperstyleNewFormatReport.from_file(results_path)
+    except Exception as e:
+        logging.error(f"Can not parse new format report from hyperstyle output: {e}")
+        raise Exception(e)  # noqa: WPS454 Disabled because we want to log the exception
+
+    return {
+        Path(file_report.file_name): pd.Series({
+            SubmissionColumns.HYPERSTYLE_ISSUES.value: file_report.to_hyperstyle_report().to_json(),
+        })
+        for file_report in report.file_review_results
+    }
+
+
+def evaluate_hyperstyle(df_solutions: pd.DataFrame,
+                        config: HyperstyleEvaluationConfig,
+                        batch_size: int = 1,
+                        n_workers: int = 1) -> pd.DataFrame:
+    """
+    Run hyperstyle tool on solutions by `n_workers` parallel workers. If `batch_size` is greater than 1,
+    the tool is run once on each batch of solutions written on same language version,
+    which requires the new format of the tool output.
+    """
+
+    if batch_size > 1:
+        if not config.new_format:
+            raise ValueError('Hyperstyle must be run with the new format to evaluate batches of solutions')
+        return evaluate_by_batch(df_solutions, config, parse_hyperstyle_batch_result, batch_size,
+                                 working_directory=config.working_directory, n_workers=n_workers)
+
     return evaluate_by_solution(df_solutions, config, parse_hyperstyle_result,
-                                working_directory=config.working_directory)
+                                working_directory=config.working_directory, n_workers=n_workers)
 
 
 def main():
@@ -49,14 +81,15 @@ def main():
     config = HyperstyleEvaluationConfig(tool_path=args.tool_path,
                                         allow_duplicates=args.allow_duplicates,
                                         with_all_categories=args.with_all_categories,
-                                        new_format=False,
+                                        # Results of batch evaluation are split by files of solutions
+                                        new_format=args.batch_size > 1,
                                         tmp_path=args.tmp_directory,
                                         disable=args.disable,
                                         working_directory=args.working_directory,
                                         venv=args.venv)
 
     logger.info('Start processing:')
-    results = evaluate_hyperstyle(df_solutions, config)
+    results = evaluate_hyperstyle(df_solutions, config, args.batch_size, args.n_workers)
     if args.output_path is None:
         output_path = get_output_path(args.solutions_file_path, HYPERSTYLE_OUTPUT_SUFFIX)
     else:
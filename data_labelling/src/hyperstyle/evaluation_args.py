@@ -49,3 +49,15 @@ def configure_arguments(parser: argparse.ArgumentParser) -> None:
                         default=None,
                         type=str,
                         help='Disable inspectors, example: pylint,flake8.')
+
+    parser.add_argument('--batch-size',
+                        default=1,
+                        type=int,
+                        help='Number of solutions written on same language version which are evaluated by one run '
+                             'of the tool. By default, each solution is evaluated separately.')
+
+    parser.add_argument('--n-workers',
+                        default=1,
+                        type=int,
+                        help='Number of solutions (or batches of solutions) evaluated in parallel. '
+                             'Each worker runs the tool in its own temporary directory.')
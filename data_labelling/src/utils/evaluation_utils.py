@@ -1,8 +1,10 @@
 import logging
 import subprocess
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Callable, List, TypeVar, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, TypeVar, Optional, Tuple
 
 import pandas as pd
 
@@ -17,27 +19,108 @@ logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 T = TypeVar('T')
+R = TypeVar('R')
 
 
 def evaluate_by_solution(df_solutions: pd.DataFrame,
                          config: EvaluationConfig,
                          parse_result: Callable[[Path], pd.Series],
-                         working_directory: Optional[str] = None) -> pd.DataFrame:
+                         working_directory: Optional[str] = None,
+                         n_workers: int = 1) -> pd.DataFrame:
     """
-    Run evaluation tool on each solution separately.
-    Return solutions with evaluation results.
+    Run evaluation tool on each solution separately, up to `n_workers` solutions are evaluated in parallel.
+    Return solutions with evaluation results in the original order.
     """
 
-    results = df_solutions.apply(
+    results = _map_in_parallel(
         lambda solution: evaluate(solution, config, parse_result, working_directory=working_directory),
-        axis=1
+        (solution for _, solution in df_solutions.iterrows()),
+        n_workers,
     )
+    return _add_feedback(df_solutions, results)
+
+
+def evaluate_by_batch(df_solutions: pd.DataFrame,
+                      config: EvaluationConfig,
+                      parse_result: Callable[[Path], Dict[Path, pd.Series]],
+                      batch_size: int,
+                      working_directory: Optional[str] = None,
+                      n_workers: int = 1) -> pd.DataFrame:
+    """
+    Run evaluation tool once on each batch of up to `batch_size` solutions written on same language version,
+    so the tool startup is paid once per batch instead of once per solution.
+    Up to `n_workers` batches are evaluated in parallel.
+    Return solutions with evaluation results in the original order.
+    """
+
+    batches = list(get_batches(df_solutions, batch_size))
+    batches_results = _map_in_parallel(
+        lambda batch_positions: evaluate_batch(df_solutions.iloc[batch_positions], config, parse_result,
+                                               working_directory),
+        batches,
+        n_workers,
+    )
+
+    results: List[Optional[Tuple[T, float]]] = [None] * len(df_solutions)
+    for batch_positions, batch_results in zip(batches, batches_results):
+        for position, result in zip(batch_positions, batch_results):
+            results[position] = result
+    return _add_feedback(df_solutions, results)
+
+
+def _map_in_parallel(function: Callable[[T], R], items: Iterable[T], n_workers: int) -> List[R]:
+    """
+    Apply function to items by `n_workers` threads preserving the order of items.
+    Threads are enough because the evaluation tool is run in subprocesses.
+    """
+
+    if n_workers <= 1:
+        return list(map(function, items))
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        return list(executor.map(function, items))
+
+
+def _add_feedback(df_solutions: pd.DataFrame, results: List[Tuple[T, float]]) -> pd.DataFrame:
     feedback_df = pd.DataFrame.from_records(results,
                                             columns=[SubmissionColumns.HYPERSTYLE_ISSUES.value,
                                                      SubmissionColumns.CODE_STYLE_FEEDBACK_TIME.value])
     return pd.concat([df_solutions, feedback_df], axis=1)
 
 
+def get_batches(df_solutions: pd.DataFrame, batch_size: int) -> Iterator[List[int]]:
+    """
+    Split positions of solutions to batches of up to `batch_size` solutions written on same language version.
+    Solutions with the same id are placed to different batches, because each solution is saved to its own directory.
+    """
+
+    batches: Dict[str, List[int]] = {}
+    batches_ids: Dict[str, set] = {}
+    solution_ids = df_solutions[SubmissionColumns.ID.value]
+    languages = df_solutions[SubmissionColumns.LANG.value]
+    for position, (solution_id, language) in enumerate(zip(solution_ids, languages)):
+        batch = batches.setdefault(language, [])
+        batch_ids = batches_ids.setdefault(language, set())
+        if len(batch) == batch_size or solution_id in batch_ids:
+            yield batch
+            batch = batches[language] = []
+            batch_ids = batches_ids[language] = set()
+        batch.append(position)
+        batch_ids.add(solution_id)
+
+    yield from (batch for batch in batches.values() if batch)
+
+
+def create_workspace(config: EvaluationConfig, language_version: str) -> Path:
+    """
+    Create unique directory for one run of the tool on solutions written on given language version,
+    so runs of parallel workers do not remove files of each other.
+    """
+
+    create_directory(config.tmp_path)
+    return Path(tempfile.mkdtemp(prefix=f'{language_version}_', dir=config.tmp_path))
+
+
 def evaluate(
         solution: pd.Series,
         config: EvaluationConfig,
@@ -50,23 +133,64 @@ def evaluate(
     """
     language_version = solution[SubmissionColumns.LANG.value]
 
-    language_version_path = create_directory(config.tmp_path / language_version, clear=True)
-    input_path = create_directory(language_version_path / 'input', clear=True)
-    output_path = create_directory(language_version_path / 'output', clear=True)
-
-    submission_path = save_solution_to_file(solution, input_path)
-    command = config.build_command(input_path, output_path, get_language_version(language_version), submission_path)
-    output, cur_time = evaluate_command(command, working_directory)
-    if output is not None:
-        next(create_file(output_path / config.result_path, output))
+    language_version_path = create_workspace(config, language_version)
+    try:
+        input_path = create_directory(language_version_path / 'input', clear=True)
+        output_path = create_directory(language_version_path / 'output', clear=True)
 
-    result = parse_result(output_path / config.result_path)[0]
+        submission_path = save_solution_to_file(solution, input_path)
+        command = config.build_command(input_path, output_path, get_language_version(language_version),
+                                       submission_path)
+        output, cur_time = evaluate_command(command, working_directory)
+        if output is not None:
+            next(create_file(output_path / config.result_path, output))
 
-    remove_directory(language_version_path)
+        result = parse_result(output_path / config.result_path)[0]
+    finally:
+        # Workspace is unique for each run, so nobody else removes it
+        remove_directory(language_version_path)
 
     return result, cur_time
 
 
+def evaluate_batch(
+        df_batch: pd.DataFrame,
+        config: EvaluationConfig,
+        parse_result: Callable[[Path], Dict[Path, pd.Series]],
+        working_directory: Optional[str] = None
+) -> List[Tuple[Optional[T], float]]:
+    """
+    Run tool on directory with batch of solutions written on same language version.
+    `parse_result` returns results by paths of files relative to the directory, so they are split back to solutions
+    by paths of saved solutions. Return result of each solution and time of the run divided between solutions.
+    """
+    language_version = df_batch[SubmissionColumns.LANG.value].iloc[0]
+
+    language_version_path = create_workspace(config, language_version)
+    try:
+        input_path = create_directory(language_version_path / 'input', clear=True)
+        output_path = create_directory(language_version_path / 'output', clear=True)
+
+        submission_paths = [save_solution_to_file(solution, input_path) for _, solution in df_batch.iterrows()]
+        command = config.build_command(input_path, output_path, get_language_version(language_version), None)
+        output, cur_time = evaluate_command(command, working_directory)
+        if output is not None:
+            next(create_file(output_path / config.result_path, output))
+
+        results = parse_result(output_path / config.result_path)
+    finally:
+        remove_directory(language_version_path)
+
+    solution_time = cur_time / len(df_batch)
+    solution_results = []
+    for submission_path in submission_paths:
+        result = results.get(submission_path.relative_to(input_path))
+        if result is None:
+            logger.error(f'There is no evaluation result for {submission_path.relative_to(input_path)}')
+        solution_results.append((None if result is None else result[0], solution_time))
+    return solution_results
+
+
 def evaluate_command(command: List[str], working_directory: Optional[str] = None) -> Tuple[Optional[str], float]:
     logger.info('Start evaluation')
     start = time.time()
@@ -0,0 +1,85 @@
+import platform
+from pathlib import Path
+
+import hyperstyle
+import pandas as pd
+import pytest
+
+from core.src.model.column_name import SubmissionColumns
+from data_labelling.src.hyperstyle.evaluate import evaluate_hyperstyle
+from data_labelling.src.hyperstyle.hyperstyle_evaluation_config import HyperstyleEvaluationConfig
+from data_labelling.src.utils.evaluation_utils import create_workspace, get_batches
+
+TOOL_PATH = Path(hyperstyle.__file__).parent / 'src' / 'python' / 'review' / 'run_tool.py'
+
+GET_BATCHES_TEST_DATA = [
+    ([1, 2, 3, 4, 5], ['python3'] * 5, 2, [[0, 1], [2, 3], [4]]),
+    ([1, 2, 3, 4], ['python3', 'java11', 'python3', 'java11'], 2, [[0, 2], [1, 3]]),
+    ([1, 2, 1, 3], ['python3'] * 4, 3, [[0, 1], [2, 3]]),
+    ([], [], 2, []),
+]
+
+
+@pytest.mark.parametrize(('ids', 'languages', 'batch_size', 'expected_batches'), GET_BATCHES_TEST_DATA)
+def test_get_batches(ids, languages, batch_size, expected_batches):
+    df_solutions = pd.DataFrame({SubmissionColumns.ID.value: ids, SubmissionColumns.LANG.value: languages})
+
+    assert list(get_batches(df_solutions, batch_size)) == expected_batches
+
+
+@pytest.fixture
+def df_solutions() -> pd.DataFrame:
+    return pd.DataFrame({
+        SubmissionColumns.ID.value: [1, 2, 3, 4],
+        SubmissionColumns.LANG.value: ['python3'] * 4,
+        SubmissionColumns.CODE.value: ['a = 1\nprint(a)\n', 'import os\n', 'def f(x):\n    return x\n', 'print(1)\n'],
+    })
+
+
+@pytest.mark.parametrize(('batch_size', 'n_workers'), [(1, 3), (2, 1), (2, 2)])
+def test_evaluate_hyperstyle(df_solutions: pd.DataFrame, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+                             batch_size: int, n_workers: int):
+    # Run the tool directly instead of the bash prefix which is used inside docker
+    monkeypatch.setattr(platform, 'system', lambda: 'Darwin')
+
+    def get_config(new_format: bool) -> HyperstyleEvaluationConfig:
+        return HyperstyleEvaluationConfig(tool_path=str(TOOL_PATH), allow_duplicates=False,
+                                          with_all_categories=False, new_format=new_format,
+                                          tmp_path=tmp_path / f'new_format_{new_format}')
+
+    expected_df = evaluate_hyperstyle(df_solutions, get_config(False))
+    actual_df = evaluate_hyperstyle(df_solutions, get_config(batch_size > 1), batch_size, n_workers)
+
+    issues_column = SubmissionColumns.HYPERSTYLE_ISSUES.value
+    assert actual_df[SubmissionColumns.ID.value].tolist() == df_solutions[SubmissionColumns.ID.value].tolist()
+    assert actual_df[issues_column].tolist() == expected_df[issues_column].tolist()
+    assert actual_df[SubmissionColumns.CODE_STYLE_FEEDBACK_TIME.value].notna().all()
+
+
+def test_create_workspace(tmp_path: Path):
+    config = HyperstyleEvaluationConfig(tool_path=str(TOOL_PATH), allow_duplicates=False,
+                                        with_all_categories=False, new_format=False, tmp_path=tmp_path)
+
+    assert create_workspace(config, 'python3') != create_workspace(config, 'python3')
+
+
+def test_evaluate_hyperstyle_by_batch_requires_new_format(tmp_path: Path):
+    config = HyperstyleEvaluationConfig(tool_path=str(TOOL_PATH), allow_duplicates=False,
+                                        with_all_categories=False, new_format=False, tmp_path=tmp_path)
+
+    with pytest.raises(ValueError):
+        evaluate_hyperstyle(pd.DataFrame(), config, batch_size=2)
+
+
+def test_workspace_is_removed_on_failure(df_solutions: pd.DataFrame, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(platform, 'system', lambda: 'Darwin')
+    # The tool fails on the missing script, so there is no report to parse
+    config = HyperstyleEvaluationConfig(tool_path=str(tmp_path / 'missing.py'), allow_duplicates=False,
+                                        with_all_categories=False, new_format=True, tmp_path=tmp_path)
+
+    with pytest.raises(Exception):
+        evaluate_hyperstyle(df_solutions, config, batch_size=2)
+    with pytest.raises(Exception):
+        evaluate_hyperstyle(df_solutions, config, batch_size=1)
+
+    assert list(config.tmp_path.iterdir()) == []
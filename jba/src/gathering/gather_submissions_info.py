@@ -5,72 +5,171 @@ import logging
 import pandas as pd
 import requests
 import sys
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
 
 from core.src.model.column_name import SubmissionColumns
 from core.src.utils.df_utils import filter_df_by_single_value, read_df, write_df
-from core.src.utils.file.file_utils import get_output_path
+from core.src.utils.file.file_utils import get_output_path, get_parent_folder
 from core.src.utils.logging_utils import configure_logger
 from jba.src.gathering.query_info_storage import QueryInfoStorage
+from jba.src.gathering.submissions_storage import SolutionsCache, SubmissionsStorage
 from jba.src.models.edu_columns import EduColumnName
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
 
-def _get_submissions_by_course_and_user_id(query_storage_info: QueryInfoStorage,
+# Connect and read timeouts in seconds
+DEFAULT_TIMEOUT = (10, 60)
+DEFAULT_CONCURRENCY = 8
+
+SUBMISSION_COLUMNS = [
+    EduColumnName.ID.value,
+    EduColumnName.TASK_ID.value,
+    EduColumnName.SOLUTION_AWS_KEY.value,
+    SubmissionColumns.TIME.value,
+    EduColumnName.FORMAT_VERSION.value,
+    EduColumnName.UPDATE_VERSION.value,
+    EduColumnName.STATUS.value,
+    EduColumnName.CHECKER_OUTPUT.value,
+    EduColumnName.TASK_TYPE.value,
+    EduColumnName.USER_ID.value,
+    EduColumnName.UUID.value,
+    EduColumnName.VISIBILITY.value,
+    EduColumnName.TASK_NAME.value,
+    EduColumnName.CODE_SNIPPETS.value,
+]
+
+
+class SubmissionsFetcher:
+    """
+    Fetcher of submissions and their code which sends all requests with one session of keep-alive connections.
+    Submissions of up to `concurrency` users are requested in parallel, and code of submissions from one page
+    is downloaded from S3 by up to `concurrency` parallel requests. If `solutions_cache` is given,
+    solutions downloaded before are taken from it.
+    """
+
+    def __init__(self, query_storage_info: QueryInfoStorage, concurrency: int = DEFAULT_CONCURRENCY,
+                 solutions_cache: Optional[SolutionsCache] = None):
+        self.query_storage_info = query_storage_info
+        self.solutions_cache = solutions_cache
+        # Each user thread and each code thread can keep its own connection
+        pool_size = 2 * concurrency
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # User requests wait for code requests, so they are run by separate threads to avoid deadlocks
+        self._users_executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._code_executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def __enter__(self) -> 'SubmissionsFetcher':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._users_executor.shutdown()
+        self._code_executor.shutdown()
+        self.session.close()
+
+    def get(self, endpoint: str, with_auth: bool = True) -> requests.Response:
+        headers = self.query_storage_info.get_auth_headers() if with_auth else None
+        return self.session.get(endpoint, headers=headers, timeout=DEFAULT_TIMEOUT)
+
+    def map_users(self, func: Callable[[str], T], user_ids: Iterable[str]) -> Iterator[T]:
+        """ Apply `func` to users in parallel, results are returned in order of users. """
+
+        return self._users_executor.map(func, user_ids)
+
+    def map_code(self, func: Callable[[str], T], aws_keys: Iterable[str]) -> List[T]:
+        """ Apply `func` to solutions aws keys in parallel, results are returned in order of keys. """
+
+        return list(self._code_executor.map(func, aws_keys))
+
+
+def _get_submissions_by_course_and_user_id(fetcher: SubmissionsFetcher,
                                            course_id: int, user_id: str,
-                                           to_gather_code: bool = False) -> pd.DataFrame:
+                                           to_gather_code: bool = False,
+                                           storage: Optional[SubmissionsStorage] = None) -> Optional[pd.DataFrame]:
+    """
+    Gather all pages of user submissions. If `storage` is given, each page is written to it as soon as it is
+    gathered (pages gathered by previous runs are skipped) and None is returned.
+    """
+
+    page = 0 if storage is None else storage.get_start_page(course_id, user_id)
+    if page is None:
+        logger.info(f'Submissions for course {course_id}, user {user_id} were gathered before')
+        return None
+
     has_next = True
-    page = 0
     submissions_dfs = []
-    logger.info(f'Start getting submissions for course {course_id}, user {user_id}')
-    while has_next:  # noqa: WPS426 Disabled because it's convenient to use lambda inside the apply function
-        endpoint = f'{query_storage_info.base_end_point}/admin/course/{course_id}/user/{user_id}/submissions/all?page={page}'
-        response = requests.get(endpoint, headers=query_storage_info.get_auth_headers())
+    logger.info(f'Start getting submissions for course {course_id}, user {user_id} from page {page}')
+    base_end_point = fetcher.query_storage_info.base_end_point
+    while has_next:
+        endpoint = f'{base_end_point}/admin/course/{course_id}/user/{user_id}/submissions/all?page={page}'
+        try:
+            response = fetcher.get(endpoint)
+        except requests.RequestException as e:
+            logger.error(f'Can not gather submissions for course {course_id}, user {user_id}, and page {page}: {e}')
+            break
         if response.status_code != 200:
             logger.error(f'Can not gather submissions for course {course_id}, user {user_id}, and page {page}')
             break
         submissions = response.json()
         submissions_df = pd.DataFrame(submissions['submissions'])
         if submissions_df.shape == (0, 0):
+            if storage is not None:
+                storage.write_page(course_id, user_id, page, None, is_finished=True)
             break
         if to_gather_code:
-            submissions_df[EduColumnName.CODE_SNIPPETS.value] = submissions_df.apply(
-                lambda row: _get_solution_from_s3(query_storage_info, row), axis=1)
-        submissions_dfs.append(submissions_df)
-        logger.info(f'Page {page} was handled successfully')
+            submissions_df[EduColumnName.CODE_SNIPPETS.value] = fetcher.map_code(
+                lambda aws_key: _get_solution_from_s3(fetcher, aws_key),
+                submissions_df[EduColumnName.SOLUTION_AWS_KEY.value],
+            )
         has_next = submissions['has_next']
+        if storage is not None:
+            storage.write_page(course_id, user_id, page, submissions_df, is_finished=not has_next)
+        else:
+            submissions_dfs.append(submissions_df)
+        logger.info(f'Page {page} was handled successfully')
         page += 1
     logger.info(f'Submissions for course {course_id}, user {user_id} were gathered successfully')
+    if storage is not None:
+        return None
     if not submissions_dfs:
-        return pd.DataFrame([
-            EduColumnName.ID.value,
-            EduColumnName.TASK_ID.value,
-            EduColumnName.SOLUTION_AWS_KEY.value,
-            SubmissionColumns.TIME.value,
-            EduColumnName.FORMAT_VERSION.value,
-            EduColumnName.UPDATE_VERSION.value,
-            EduColumnName.STATUS.value,
-            EduColumnName.CHECKER_OUTPUT.value,
-            EduColumnName.TASK_TYPE.value,
-            EduColumnName.USER_ID.value,
-            EduColumnName.UUID.value,
-            EduColumnName.VISIBILITY.value,
-            EduColumnName.TASK_NAME.value,
-            EduColumnName.CODE_SNIPPETS.value,
-        ])
+        return pd.DataFrame(columns=SUBMISSION_COLUMNS)
     return pd.concat(submissions_dfs)
 
 
-def _get_solution_from_s3(query_storage_info: QueryInfoStorage, row: pd.DataFrame) -> Optional[str]:
-    aws_key = row[EduColumnName.SOLUTION_AWS_KEY.value]
-    endpoint = f'{query_storage_info.base_end_point}/solution?solutionKey={aws_key}'
-    response = requests.get(endpoint, headers=query_storage_info.get_auth_headers())
-    if response.status_code != 200:
-        logger.error(f'Can not gather code for aws key: {aws_key}')
+def _get_solution_from_s3(fetcher: SubmissionsFetcher, aws_key: str) -> Optional[str]:
+    if fetcher.solutions_cache is not None:
+        solution = fetcher.solutions_cache.get(aws_key)
+        if solution is not None:
+            return solution
+
+    solution = _download_solution_from_s3(fetcher, aws_key)
+    if fetcher.solutions_cache is not None and solution is not None:
+        fetcher.solutions_cache.put(aws_key, solution)
+    return solution
+
+
+def _download_solution_from_s3(fetcher: SubmissionsFetcher, aws_key: str) -> Optional[str]:
+    endpoint = f'{fetcher.query_storage_info.base_end_point}/solution?solutionKey={aws_key}'
+    try:
+        response = fetcher.get(endpoint)
+        if response.status_code != 200:
+            logger.error(f'Can not gather code for aws key: {aws_key}')
+            return None
+        s3_link = response.content.decode('utf-8')
+        # Presigned S3 link must not be requested with the authorization header
+        solution_response = fetcher.get(s3_link, with_auth=False)
+    except requests.RequestException as e:
+        logger.error(f'Can not gather code for aws key: {aws_key}: {e}')
         return None
-    s3_link = response.content.decode('utf-8')
-    solution_response = requests.get(s3_link)
     if solution_response.status_code != 200:
         logger.error(f'Can not gather code for s3 link: {s3_link}')
         return None
@@ -81,20 +180,30 @@ def _get_solution_from_s3(query_storage_info: QueryInfoStorage, row: pd.DataFram
     return solution
 
 
-def _get_submissions_by_course_id_and_users(query_storage_info: QueryInfoStorage, course_id: int, user_ids: List[str],
-                                            to_gather_code: bool = False) -> pd.DataFrame:
-    submission_dfs = []
-    for user_id in user_ids:
+def _get_submissions_by_course_id_and_users(fetcher: SubmissionsFetcher, course_id: int, user_ids: List[str],
+                                            to_gather_code: bool = False,
+                                            storage: Optional[SubmissionsStorage] = None) -> pd.DataFrame:
+    def get_user_submissions(user_id: str) -> Optional[pd.DataFrame]:
         logger.info(f'------------START HANDLING USER {user_id}------------')
-        submission_dfs.append(
-            _get_submissions_by_course_and_user_id(query_storage_info, course_id, user_id, to_gather_code))
+        user_submissions_df = _get_submissions_by_course_and_user_id(fetcher, course_id, user_id, to_gather_code,
+                                                                     storage)
         logger.info(f'------------FINISH HANDLING USER {user_id}------------')
+        return user_submissions_df
+
+    submission_dfs = list(fetcher.map_users(get_user_submissions, user_ids))
+    if storage is not None:
+        submissions_df = storage.read_submissions(course_id, user_ids)
+        return pd.DataFrame(columns=SUBMISSION_COLUMNS) if submissions_df is None else submissions_df
+
+    if not submission_dfs:
+        return pd.DataFrame(columns=SUBMISSION_COLUMNS)
     return pd.concat(submission_dfs)
 
 
-def _get_submissions(query_storage_info: QueryInfoStorage,
+def _get_submissions(fetcher: SubmissionsFetcher,
                      course_data_df: pd.DataFrame,
-                     to_gather_code: bool = False) -> pd.DataFrame:
+                     to_gather_code: bool = False,
+                     storage: Optional[SubmissionsStorage] = None) -> pd.DataFrame:
     submissions_df = []
     course_ids = course_data_df[EduColumnName.COURSE_ID.value].unique()
     for course_id in course_ids:
@@ -102,7 +211,7 @@ def _get_submissions(query_storage_info: QueryInfoStorage,
         user_ids = filter_df_by_single_value(course_data_df, EduColumnName.COURSE_ID.value, course_id)[
             EduColumnName.USER_ID.value].unique()
         submissions_by_course_id_and_users = \
-            _get_submissions_by_course_id_and_users(query_storage_info, course_id, user_ids, to_gather_code)
+            _get_submissions_by_course_id_and_users(fetcher, course_id, user_ids, to_gather_code, storage)
         submissions_df.append(submissions_by_course_id_and_users)
         logger.info(f'------FINISH HANDLING COURSE {course_id}------')
     return pd.concat(submissions_df)
@@ -117,6 +226,14 @@ def configure_parser(parser: argparse.ArgumentParser) -> None:
         '--gather-code', action='store_true',
         help='Indicates if you need to download students code.',
     )
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue gathering from the last gathered page of each user after a failure.')
+    parser.add_argument('--solutions-cache-path', type=str, default=None,
+                        help='Path to directory to cache downloaded students code in. '
+                             'By default `solutions_cache` directory next to the course data is used.')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help='Number of users whose submissions are gathered in parallel '
+                             'and number of parallel code downloads for one page of submissions.')
 
 
 def main():
@@ -126,9 +243,15 @@ def main():
     args = parser.parse_args(sys.argv[1:])
     configure_logger(args.preprocessed_course_data_path, 'submissions_info', args.log_path)
     output_path = get_output_path(args.preprocessed_course_data_path, '_submissions_info')
+    # Submissions of each user are written as soon as they are gathered, so they are not lost after a failure
+    storage = SubmissionsStorage(output_path.with_suffix(''), resume=args.resume)
+    solutions_cache_path = args.solutions_cache_path
+    if solutions_cache_path is None:
+        solutions_cache_path = get_parent_folder(args.preprocessed_course_data_path) / 'solutions_cache'
+
     course_df = read_df(args.preprocessed_course_data_path)
-    query_storage_info = QueryInfoStorage()
-    submissions_df = _get_submissions(query_storage_info, course_df, to_gather_code=args.gather_code)
+    with SubmissionsFetcher(QueryInfoStorage(), args.concurrency, SolutionsCache(solutions_cache_path)) as fetcher:
+        submissions_df = _get_submissions(fetcher, course_df, to_gather_code=args.gather_code, storage=storage)
     write_df(submissions_df, output_path)
 
 
@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import pandas as pd
+
+from core.src.utils.df_utils import append_df, read_df
+from core.src.utils.file.file_utils import create_directory
+from jba.src.models.edu_columns import EduColumnName
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_FILE = 'progress.csv'
+COURSE_ID_COLUMN = EduColumnName.COURSE_ID.value
+USER_ID_COLUMN = EduColumnName.USER_ID.value
+PAGE_COLUMN = 'page'
+IS_FINISHED_COLUMN = 'is_finished'
+
+
+class SolutionsCache:
+    """ Local cache of solutions downloaded from S3 by their aws keys, which is shared by all runs. """
+
+    def __init__(self, cache_path: Union[str, Path]):
+        self.cache_path = create_directory(cache_path)
+
+    def _get_solution_path(self, aws_key: str) -> Path:
+        return self.cache_path / f'{hashlib.sha1(aws_key.encode()).hexdigest()}.json'
+
+    def get(self, aws_key: str) -> Optional[str]:
+        solution_path = self._get_solution_path(aws_key)
+        if not solution_path.exists():
+            return None
+        return solution_path.read_text(encoding='utf-8')
+
+    def put(self, aws_key: str, solution: str):
+        solution_path = self._get_solution_path(aws_key)
+        tmp_path = solution_path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        tmp_path.write_text(solution, encoding='utf-8')
+        os.replace(tmp_path, solution_path)
+
+
+class SubmissionsStorage:
+    """
+    Storage of gathered submissions on disk: each page of user submissions is appended to the partition file
+    of the user as soon as it is gathered, and the progress ledger keeps the last gathered page of each user
+    and whether all pages were gathered, so gathering can be resumed after a failure.
+    If `resume` is False, submissions gathered before are removed.
+    """
+
+    def __init__(self, storage_path: Union[str, Path], resume: bool = False):
+        self.storage_path = create_directory(storage_path, clear=not resume)
+        self._progress_path = self.storage_path / PROGRESS_FILE
+        self._progress: Dict[Tuple[str, str], Tuple[int, bool]] = {}
+        self._lock = Lock()
+
+        if self._progress_path.exists():
+            progress_df = pd.read_csv(self._progress_path, dtype={COURSE_ID_COLUMN: str, USER_ID_COLUMN: str})
+            for course_id, user_id, page, is_finished in progress_df[
+                    [COURSE_ID_COLUMN, USER_ID_COLUMN, PAGE_COLUMN, IS_FINISHED_COLUMN]].itertuples(index=False):
+                self._progress[(course_id, user_id)] = (page, is_finished)
+
+    def _get_partition_path(self, course_id, user_id) -> Path:
+        return self.storage_path / f'course_{course_id}_user_{user_id}.csv'
+
+    def get_start_page(self, course_id, user_id) -> Optional[int]:
+        """ Get the first not gathered page of user submissions or None if all pages were gathered. """
+
+        page, is_finished = self._progress.get((str(course_id), str(user_id)), (-1, False))
+        return None if is_finished else page + 1
+
+    def write_page(self, course_id, user_id, page: int, submissions_df: Optional[pd.DataFrame], is_finished: bool):
+        """ Append gathered page of user submissions to the user partition and mark the page gathered. """
+
+        if submissions_df is not None:
+            append_df(submissions_df, self._get_partition_path(course_id, user_id))
+
+        with self._lock:
+            self._progress[(str(course_id), str(user_id))] = (page, is_finished)
+            append_df(pd.DataFrame({
+                COURSE_ID_COLUMN: [course_id],
+                USER_ID_COLUMN: [user_id],
+                PAGE_COLUMN: [page],
+                IS_FINISHED_COLUMN: [is_finished],
+            }), self._progress_path)
+
+    def read_submissions(self, course_id, user_ids: Iterable) -> Optional[pd.DataFrame]:
+        """
+        Read gathered submissions of users in the given order. Pages which were gathered again after a failure
+        are written twice, so duplicated submissions are removed.
+        """
+
+        partition_dfs = [
+            read_df(self._get_partition_path(course_id, user_id))
+            for user_id in user_ids
+            if self._get_partition_path(course_id, user_id).exists()
+        ]
+        if not partition_dfs:
+            return None
+        return pd.concat(partition_dfs).drop_duplicates(subset=[EduColumnName.ID.value], keep='last')
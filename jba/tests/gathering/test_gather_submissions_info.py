@@ -0,0 +1,132 @@
+import json
+import re
+from pathlib import Path
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Dict, Iterator, List
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from jba.src.gathering.gather_submissions_info import _get_submissions, SubmissionsFetcher
+from jba.src.gathering.query_info_storage import QueryInfoStorage
+from jba.src.gathering.submissions_storage import SolutionsCache, SubmissionsStorage
+from jba.src.models.edu_columns import EduColumnName
+
+SUBMISSIONS_PATH_PATTERN = re.compile(r'^/admin/course/(?P<course_id>\d+)/user/(?P<user_id>\w+)/submissions/all$')
+PAGES_COUNT = 2
+SUBMISSIONS_PER_PAGE = 3
+
+
+def get_submission_id(user_id: str, page: int, index: int) -> str:
+    return f'{user_id}_{page}_{index}'
+
+
+class JbaPlatformHandler(BaseHTTPRequestHandler):
+    """ Handler which serves pages of submissions for each user, links to solutions and solutions themselves. """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # noqa: N802 Name is defined by BaseHTTPRequestHandler
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        self.server.requests.append(url.path)
+        if self.path in self.server.failing_paths:
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, {})
+            return
+        has_auth = self.headers.get('Authorization') == 'Bearer secret'
+
+        submissions_match = SUBMISSIONS_PATH_PATTERN.match(url.path)
+        if submissions_match is not None and has_auth:
+            user_id = submissions_match.group('user_id')
+            page = int(query['page'][0])
+            self._send(HTTPStatus.OK, {'has_next': page < PAGES_COUNT - 1, 'submissions': [
+                {EduColumnName.ID.value: get_submission_id(user_id, page, i),
+                 EduColumnName.SOLUTION_AWS_KEY.value: get_submission_id(user_id, page, i)}
+                for i in range(SUBMISSIONS_PER_PAGE)
+            ]})
+        elif url.path == '/solution' and has_auth:
+            self._send(HTTPStatus.OK, f'{self.server.url}/s3/{query["solutionKey"][0]}')
+        elif url.path.startswith('/s3/') and not has_auth:
+            self._send(HTTPStatus.OK, [{'name': 'main.kt', 'text': url.path[len('/s3/'):], 'is_visible': True}])
+        else:
+            self._send(HTTPStatus.BAD_REQUEST, {})
+
+    def _send(self, status: HTTPStatus, body):
+        data = (body if isinstance(body, str) else json.dumps(body)).encode()
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args):  # noqa: WPS125 Signature is defined by BaseHTTPRequestHandler
+        pass
+
+
+@pytest.fixture
+def jba_server() -> Iterator[ThreadingHTTPServer]:
+    server = ThreadingHTTPServer(('localhost', 0), JbaPlatformHandler)
+    server.url = f'http://localhost:{server.server_port}'
+    server.requests = []
+    server.failing_paths = set()
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def course_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        EduColumnName.COURSE_ID.value: [1, 1, 1, 2],
+        EduColumnName.USER_ID.value: ['a', 'b', 'a', 'c'],
+    })
+
+
+def get_expected_ids(user_ids: List[str]) -> List[str]:
+    return [
+        get_submission_id(user_id, page, i)
+        for user_id in user_ids for page in range(PAGES_COUNT) for i in range(SUBMISSIONS_PER_PAGE)
+    ]
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_get_submissions_with_code(jba_server: ThreadingHTTPServer, course_df: pd.DataFrame, concurrency: int):
+    with SubmissionsFetcher(QueryInfoStorage('secret', jba_server.url), concurrency) as fetcher:
+        submissions_df = _get_submissions(fetcher, course_df, to_gather_code=True)
+
+    expected_ids = get_expected_ids(['a', 'b', 'c'])
+    assert submissions_df[EduColumnName.ID.value].tolist() == expected_ids
+    code_snippets: List[List[Dict]] = [json.loads(code) for code in submissions_df[EduColumnName.CODE_SNIPPETS.value]]
+    assert code_snippets == [[{'name': 'main.kt', 'text': submission_id}] for submission_id in expected_ids]
+
+
+def test_resume_get_submissions(jba_server: ThreadingHTTPServer, course_df: pd.DataFrame, tmp_path: Path):
+    query_info_storage = QueryInfoStorage('secret', jba_server.url)
+    solutions_cache = SolutionsCache(tmp_path / 'solutions_cache')
+    jba_server.failing_paths = {'/admin/course/1/user/b/submissions/all?page=1'}
+    with SubmissionsFetcher(query_info_storage, solutions_cache=solutions_cache) as fetcher:
+        submissions_df = _get_submissions(fetcher, course_df, True, SubmissionsStorage(tmp_path / 'parts'))
+    failed_page_ids = [get_submission_id('b', 1, i) for i in range(SUBMISSIONS_PER_PAGE)]
+    assert submissions_df[EduColumnName.ID.value].tolist() == [
+        submission_id for submission_id in get_expected_ids(['a', 'b', 'c']) if submission_id not in failed_page_ids
+    ]
+
+    jba_server.failing_paths = set()
+    jba_server.requests = []
+    with SubmissionsFetcher(query_info_storage, solutions_cache=solutions_cache) as fetcher:
+        storage = SubmissionsStorage(tmp_path / 'parts', resume=True)
+        submissions_df = _get_submissions(fetcher, course_df, True, storage)
+
+    expected_ids = get_expected_ids(['a', 'b', 'c'])
+    assert submissions_df[EduColumnName.ID.value].tolist() == expected_ids
+    code_snippets: List[List[Dict]] = [json.loads(code) for code in submissions_df[EduColumnName.CODE_SNIPPETS.value]]
+    assert code_snippets == [[{'name': 'main.kt', 'text': submission_id}] for submission_id in expected_ids]
+    # Only the failed page is requested again, and only its solutions are downloaded
+    assert sorted(jba_server.requests) == sorted(
+        ['/admin/course/1/user/b/submissions/all']
+        + ['/solution'] * SUBMISSIONS_PER_PAGE
+        + [f'/s3/{submission_id}' for submission_id in failed_page_ids],
+    )
@@ -1,6 +1,7 @@
 import argparse
 import ast
 import bisect
+import logging
 from pathlib import Path
 from typing import List, Tuple, Optional
 
@@ -17,10 +18,12 @@ from core.src.utils.quality.report_utils import parse_report, parse_str_report
 from templates.src.diffs.model.diff_interval import DiffInterval
 from templates.src.diffs.model.diff_result import DiffResult
 from templates.src.diffs.model.diff_tag import DiffTag
-from templates.src.utils.template_utils import parse_template_code_from_step, is_comment
+from templates.src.utils.template_utils import StepTemplates, is_comment
 
 DIF_SUFFIX = 'diff'
 DIFF_TEMPLATE_POSITIONS_SUFFIX = 'diff_template_positions'
+ROW_NUMBER_COLUMN = 'row_number'
+OFFSET_COLUMN = 'offset'
 
 
 def get_code_prefix_lengths(code_lines: List[str]) -> List[int]:
@@ -177,10 +180,8 @@ def get_template_issues(issues: List[BaseIssue], issues_offsets: List[int], diff
     return template_issues, template_issues_offsets
 
 
-def filter_in_single_submission(submission: pd.Series, step: pd.Series, issues_column: str) -> pd.Series:
+def filter_in_single_submission(submission: pd.Series, template_lines: List[str], issues_column: str) -> pd.Series:
     code_lines = split_code_to_lines(submission[SubmissionColumns.CODE.value], keep_ends=True)
-    lang = submission[SubmissionColumns.LANG.value]
-    template_lines = parse_template_code_from_step(step, lang, keep_ends=True)
 
     report = parse_report(submission, issues_column)
     issues = report.get_issues()
@@ -199,16 +200,24 @@ def filter_in_single_submission(submission: pd.Series, step: pd.Series, issues_c
 
 def filter_template_issues_using_diff(df_submissions: pd.DataFrame, df_steps: pd.DataFrame, issues_column: str) \
         -> pd.DataFrame:
+    """
+    Filter template issues from all submissions using diffs with their templates.
+    Templates are parsed once per step and language, steps with identical templates share the parsed one.
+    """
+
     df_submissions = filter_df_by_iterable_value(df_submissions, SubmissionColumns.STEP_ID.value,
                                                  df_steps[StepColumns.ID.value].unique())
-    df_steps.set_index(StepColumns.ID.value, inplace=True, drop=False)
+    step_templates = StepTemplates(df_steps, keep_ends=True)
 
     def apply_filter(submission):
-        return filter_in_single_submission(submission,
-                                           issues_column=issues_column,
-                                           step=df_steps.loc[submission[SubmissionColumns.STEP_ID.value]])
+        template_lines = step_templates.get_template(submission[SubmissionColumns.STEP_ID.value],
+                                                     submission[SubmissionColumns.LANG.value])
+        return filter_in_single_submission(submission, template_lines=template_lines, issues_column=issues_column)
+
+    df_filtered_submissions = df_submissions.apply(apply_filter, axis=1)
+    logging.info(f'Submissions were filtered with {step_templates.get_templates_count()} distinct templates.')
 
-    return df_submissions.apply(apply_filter, axis=1)
+    return df_filtered_submissions
 
 
 def filter_by_diff(
@@ -233,16 +242,14 @@ def filter_by_diff(
 
 
 def create_templates_issues_df(df_filtered_issues: pd.DataFrame, issues_column: str) -> pd.DataFrame:
-    row_number_column = 'row_number'
-    offset_column = 'offset'
     issues_dict = {
         SubmissionColumns.STEP_ID.value: [],
         IssuesColumns.NAME.value: [],
         IssuesColumns.CATEGORY.value: [],
         IssuesColumns.DIFFICULTY.value: [],
         IssuesColumns.TEXT.value: [],
-        row_number_column: [],
-        offset_column: [],
+        ROW_NUMBER_COLUMN: [],
+        OFFSET_COLUMN: [],
     }
 
     def unzip_issue(row: pd.Series):
@@ -257,8 +264,8 @@ def create_templates_issues_df(df_filtered_issues: pd.DataFrame, issues_column:
             issues_dict[IssuesColumns.DIFFICULTY.value].append(issue.get_difficulty())
             issues_dict[IssuesColumns.TEXT.value].append(issue.get_text())
             row_number, offset = pos
-            issues_dict[row_number_column].append(row_number)
-            issues_dict[offset_column].append(offset)
+            issues_dict[ROW_NUMBER_COLUMN].append(row_number)
+            issues_dict[OFFSET_COLUMN].append(offset)
 
     df_filtered_issues.apply(unzip_issue, axis=1)
     return pd.DataFrame.from_dict(issues_dict).drop_duplicates(subset=[
@@ -266,8 +273,8 @@ def create_templates_issues_df(df_filtered_issues: pd.DataFrame, issues_column:
         IssuesColumns.NAME.value,
         IssuesColumns.CATEGORY.value,
         IssuesColumns.DIFFICULTY.value,
-        row_number_column,
-        offset_column,
+        ROW_NUMBER_COLUMN,
+        OFFSET_COLUMN,
     ])
 
 
@@ -1,65 +1,133 @@
 import argparse
 import logging
 import sys
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
 
 import pandas as pd
 
 from core.src.model.column_name import SubmissionColumns, IssuesColumns, StepColumns
-from core.src.utils.df_utils import filter_df_by_single_value, read_df, write_df
+from core.src.model.quality.issue.issue import BaseIssue
+from core.src.utils.df_utils import read_df, write_df
 from core.src.utils.logging_utils import configure_logger
 from core.src.utils.quality.code_utils import split_code_to_lines
 from core.src.utils.quality.report_utils import parse_report
-from templates.src.freq.matching.template_matching import match_code_with_template
+from templates.src.freq.matching.minhash_index import MinHashIndex
+from templates.src.freq.matching.template_matching import GREEDY_MATCH, MATCH_ALGORITHMS, match_code_with_template
 from templates.src.freq.utils.code_comparator import CodeComparator
 from templates.src.freq.utils.template_columns import TemplateColumns
 from templates.src.utils.template_utils import parse_template_code_from_step
 
 
+TemplateIssuesIndex = Dict[int, Dict[Tuple[str, int], Optional[str]]]
+StepTemplatesCache = Dict[Tuple[int, str], Tuple[List[str], Optional[MinHashIndex]]]
+
+
+def build_template_issues_index(df_templates_issues: pd.DataFrame) -> TemplateIssuesIndex:
+    """
+    Build index of template issues: step_id -> {(issue name, position in template) -> template line with issue}.
+    Template issues with undefined position should be already removed.
+    """
+
+    template_issues_index = defaultdict(dict)
+    for step_id, issue_name, pos_in_template, line_with_issue in zip(
+            df_templates_issues[SubmissionColumns.STEP_ID.value],
+            df_templates_issues[IssuesColumns.NAME.value],
+            df_templates_issues[TemplateColumns.POS_IN_TEMPLATE.value],
+            df_templates_issues[TemplateColumns.LINE.value],
+    ):
+        template_issues_index[step_id][(issue_name, int(pos_in_template))] = line_with_issue
+
+    return template_issues_index
+
+
+def get_template_issues(code_lines: List[str],
+                        template_lines: List[str],
+                        issues: List[BaseIssue],
+                        step_template_issues: Dict[Tuple[str, int], str],
+                        code_comparator: CodeComparator,
+                        match_algorithm: str = GREEDY_MATCH,
+                        template_index: Optional[MinHashIndex] = None) -> List[BaseIssue]:
+    """
+    Get issues of the code which are template issues of its step.
+    Issue is a template one if its line is matched with the line of template where the same issue was detected.
+    """
+
+    if not step_template_issues:
+        return []
+
+    code_to_template, _ = match_code_with_template(code_lines, template_lines,
+                                                   code_comparator.is_equal,
+                                                   code_comparator.is_empty,
+                                                   match_algorithm,
+                                                   code_comparator.preprocess,
+                                                   template_index)
+
+    template_issues = []
+    for issue in issues:
+        code_issue_position = issue.get_line_number() - 1
+        # Issues with zero line number do not have exact position and can not be matched with template
+        if code_issue_position < 0:
+            continue
+
+        template_issue_position = code_to_template[code_issue_position]
+        if template_issue_position is None:
+            continue
+
+        template_line_with_issue = step_template_issues.get((issue.get_name(), template_issue_position))
+        if template_line_with_issue is not None and \
+                code_comparator.is_equal(template_line_with_issue, code_lines[code_issue_position]):
+            template_issues.append(issue)
+
+    return template_issues
+
+
+def get_step_template(step_templates: StepTemplatesCache,
+                      df_steps: pd.DataFrame,
+                      step_id: int,
+                      lang: str,
+                      code_comparator: CodeComparator) -> Tuple[List[str], Optional[MinHashIndex]]:
+    """ Get template lines of the step and their index. Template is parsed and indexed once per step and language. """
+
+    key = (step_id, lang)
+    if key not in step_templates:
+        template_lines = parse_template_code_from_step(df_steps.loc[step_id], lang)
+        step_templates[key] = (template_lines, code_comparator.build_template_index(template_lines))
+
+    return step_templates[key]
+
+
 def filter_template_issues_from_submission(submission: pd.Series,
                                            df_steps: pd.DataFrame,
-                                           df_templates_issues: pd.DataFrame,
+                                           template_issues_index: TemplateIssuesIndex,
                                            issues_column: str,
-                                           code_comparator: CodeComparator) -> pd.Series:
+                                           code_comparator: CodeComparator,
+                                           match_algorithm: str = GREEDY_MATCH,
+                                           step_templates: Optional[StepTemplatesCache] = None) -> pd.Series:
     """
     Filter all template issues from submission.
     Build matching for submission's code lines with its template code lines char by char.
     Filter submission issue in case of matching line in template contains such issue.
+    Templates of steps are taken from `step_templates` cache if it is passed, steps without template issues are
+    not matched at all.
     """
 
     logging.info(f'Processing submission {submission[SubmissionColumns.ID.value]}.')
 
-    code_lines = split_code_to_lines(submission[SubmissionColumns.CODE.value])
     lang = submission[SubmissionColumns.LANG.value]
     step_id = submission[SubmissionColumns.STEP_ID.value]
-
-    step = df_steps.loc[step_id]
-    template_lines = parse_template_code_from_step(step, lang)
-    code_to_template, template_to_code = match_code_with_template(code_lines, template_lines,
-                                                                  code_comparator.is_equal,
-                                                                  code_comparator.is_empty)
-
-    df_templates_issues = filter_df_by_single_value(df_templates_issues, SubmissionColumns.STEP_ID.value, step_id)
-    template_issues = []
+    step_template_issues = template_issues_index.get(step_id, {})
 
     report = parse_report(submission, issues_column)
+    template_issues = []
+    if step_template_issues:
+        template_lines, template_index = get_step_template({} if step_templates is None else step_templates,
+                                                           df_steps, step_id, lang, code_comparator)
+        template_issues = get_template_issues(split_code_to_lines(submission[SubmissionColumns.CODE.value]),
+                                              template_lines, report.get_issues(), step_template_issues,
+                                              code_comparator, match_algorithm, template_index)
 
-    for _, templates_issue in df_templates_issues.iterrows():
-        template_issue_name = templates_issue[IssuesColumns.NAME.value]
-        template_issue_position = templates_issue[TemplateColumns.POS_IN_TEMPLATE.value]
-        template_line_with_issue = templates_issue[TemplateColumns.LINE.value]
-
-        for issue in report.get_issues():
-            code_issue_position = issue.get_line_number() - 1
-            code_line_with_issue = code_lines[code_issue_position]
-
-            if issue.get_name() == template_issue_name and \
-                    code_issue_position == template_to_code[template_issue_position] and \
-                    code_comparator.is_equal(template_line_with_issue, code_line_with_issue):
-                template_issues.append(issue)
-
-        logging.info(f'Issue {template_issue_name} in line {template_issue_position} is unmatched.')
-
-    logging.info(f'{len(template_issues)}/{df_templates_issues.shape[0]} template issues was matched.')
+    logging.info(f'{len(template_issues)}/{len(step_template_issues)} template issues was matched.')
 
     submission[issues_column] = report.filter_issues(lambda i: i not in template_issues).to_json()
     submission[f'{issues_column}_diff'] = report.filter_issues(lambda i: i in template_issues).to_json()
@@ -72,17 +140,24 @@ def filter_template_issues(df_templates_issues: pd.DataFrame,
                            df_submissions: pd.DataFrame,
                            df_steps: pd.DataFrame,
                            issues_column: str,
-                           code_comparator: CodeComparator) -> pd.DataFrame:
-    """ Filter all template issues from all submission. Skipping templates with undefined position. """
+                           code_comparator: CodeComparator,
+                           match_algorithm: str = GREEDY_MATCH) -> pd.DataFrame:
+    """
+    Filter all template issues from all submission. Skipping templates with undefined position.
+    Template of each step is parsed and indexed only once for all its submissions.
+    """
 
     df_templates_issues = df_templates_issues.dropna(subset=[TemplateColumns.POS_IN_TEMPLATE.value])
+    template_issues_index = build_template_issues_index(df_templates_issues)
     df_steps.set_index(StepColumns.ID.value, inplace=True, drop=False)
 
     return df_submissions.apply(filter_template_issues_from_submission,
                                 df_steps=df_steps,
-                                df_templates_issues=df_templates_issues,
+                                template_issues_index=template_issues_index,
                                 issues_column=issues_column,
                                 code_comparator=code_comparator,
+                                match_algorithm=match_algorithm,
+                                step_templates={},
                                 axis=1)
 
 
@@ -93,14 +168,17 @@ def main(templates_issues_path: str,
          issues_column: str,
          equal_type: str,
          ignore_trailing_comments: bool,
-         ignore_trailing_whitespaces: bool):
+         ignore_trailing_whitespaces: bool,
+         match_algorithm: str = GREEDY_MATCH,
+         use_lsh: bool = False):
     df_templates_issues = read_df(templates_issues_path)
     df_submissions = read_df(submissions_path)
     df_steps = read_df(steps_path)
-    code_comparator = CodeComparator(equal_type, ignore_trailing_comments, ignore_trailing_whitespaces)
+    code_comparator = CodeComparator(equal_type, ignore_trailing_comments, ignore_trailing_whitespaces,
+                                     use_lsh=use_lsh)
 
     df_submissions = filter_template_issues(df_templates_issues, df_submissions, df_steps, issues_column,
-                                            code_comparator)
+                                            code_comparator, match_algorithm)
     write_df(df_submissions, filtered_submissions_path)
 
 
@@ -118,6 +196,13 @@ def configure_arguments(parser: argparse.ArgumentParser) -> None:
                         help='Ignore trailing comments in code compare. True by default.')
     parser.add_argument('-iw', '--ignore-trailing-whitespaces', action='store_false',
                         help='Ignore trailing whitespaces in code compare. True by default.')
+    parser.add_argument('--match-algorithm', type=str, default=GREEDY_MATCH,
+                        help='Algorithm for matching code lines with template lines.',
+                        choices=MATCH_ALGORITHMS)
+    parser.add_argument('--lsh', action='store_true',
+                        help='Compare code lines only with similar template lines found by MinHash LSH. '
+                             'Speeds up fuzzy comparing, but a few similar lines can be missed. '
+                             'Is not used with substring comparing.')
 
     parser.add_argument('--log-path', type=str, default=None, help='Path to directory for log.')
 
@@ -134,6 +219,8 @@ if __name__ == '__main__':
          args.steps_path,
          args.filtered_submissions_path,
          args.issues_column,
-         args.equal_type,
+         args.equal,
          args.ignore_trailing_comments,
-         args.ignore_trailing_whitespaces)
+         args.ignore_trailing_whitespaces,
+         args.match_algorithm,
+         args.lsh)
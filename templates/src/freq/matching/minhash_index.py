@@ -0,0 +1,68 @@
+import random
+import zlib
+from collections import defaultdict
+from typing import Callable, Dict, Iterator, List, Set, Tuple
+
+# Mersenne prime for universal hashing of shingles
+_PRIME = (1 << 61) - 1
+_SEED = 42
+
+CandidateLines = Dict[int, List[int]]
+
+
+class MinHashIndex:
+    """
+    Index of lines to find similar ones without comparing each pair of lines.
+
+    Each line is represented by the set of its char shingles and its MinHash signature is split into bands.
+    Two lines are candidates to be equal if their signatures are the same in at least one band,
+    the probability of it grows fast with the Jaccard similarity of shingles (LSH).
+    Equal lines are always candidates, lines with only a few changed chars are candidates with high probability.
+    """
+
+    def __init__(self, lines: List[str],
+                 preprocess: Callable[[str], str],
+                 shingle_size: int = 3,
+                 bands: int = 16,
+                 rows: int = 2):
+        self._preprocess = preprocess
+        self._shingle_size = shingle_size
+        self._bands = bands
+        self._rows = rows
+
+        generator = random.Random(_SEED)
+        self._permutations = [
+            (generator.randrange(1, _PRIME), generator.randrange(0, _PRIME))
+            for _ in range(bands * rows)
+        ]
+
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        for i, line in enumerate(lines):
+            for bucket in self._get_buckets(line):
+                self._buckets[bucket].append(i)
+
+    def _get_shingles(self, line: str) -> Set[int]:
+        line = self._preprocess(line).strip()
+        if len(line) <= self._shingle_size:
+            return {zlib.crc32(line.encode())}
+        return {
+            zlib.crc32(line[k:k + self._shingle_size].encode())
+            for k in range(len(line) - self._shingle_size + 1)
+        }
+
+    def _get_buckets(self, line: str) -> Iterator[Tuple[int, Tuple[int, ...]]]:
+        shingles = self._get_shingles(line)
+        signature = [min((a * shingle + b) % _PRIME for shingle in shingles) for a, b in self._permutations]
+        for band in range(self._bands):
+            yield band, tuple(signature[band * self._rows:(band + 1) * self._rows])
+
+    def get_candidates(self, lines: List[str]) -> CandidateLines:
+        """ For each indexed line get sorted indices of given lines which are candidates to be equal to it. """
+
+        candidates = defaultdict(set)
+        for j, line in enumerate(lines):
+            for bucket in self._get_buckets(line):
+                for i in self._buckets.get(bucket, []):
+                    candidates[i].add(j)
+
+        return {i: sorted(line_indices) for i, line_indices in candidates.items()}
@@ -1,9 +1,17 @@
+from bisect import bisect_right
+from difflib import SequenceMatcher
 from typing import Callable, List, Optional, Tuple
 
+from templates.src.freq.matching.minhash_index import CandidateLines, MinHashIndex
+
 
 StringComparator = Callable[[str, str], bool]
 MatchedIndices = List[Optional[int]]
 
+GREEDY_MATCH = 'greedy'
+ANCHORS_MATCH = 'anchors'
+MATCH_ALGORITHMS = [GREEDY_MATCH, ANCHORS_MATCH]
+
 
 def match_empty_lines(
     code: List[str],
@@ -47,16 +55,36 @@ def match_code_lines(
     template_to_code: List[Optional[int]],
     is_equal: Callable[[str, str], bool],
     is_empty: Callable[[str], bool],
+    template_start: int = 0,
+    template_end: Optional[int] = None,
+    code_start: int = 0,
+    code_end: Optional[int] = None,
+    candidates: Optional[CandidateLines] = None,
 ):
-    """Match code with template not empty lines."""
+    """
+    Match code with template not empty lines.
 
-    prev_matched_line = -1
+    Matching can be restricted to the template lines [template_start, template_end)
+    and the code lines [code_start, code_end).
+    If `candidates` are passed, each template line is compared only with its candidate code lines.
+    """
+
+    template_end = len(template_lines) if template_end is None else template_end
+    code_end = len(code_lines) if code_end is None else code_end
+    prev_matched_line = code_start - 1
 
     # Ignoring WPS518 because it's a C-style algorithm
-    for i in range(len(template_lines)):  # noqa: WPS518
+    for i in range(template_start, template_end):  # noqa: WPS518
         if is_empty(template_lines[i]) or template_to_code[i] is not None:
             continue
-        for j in range(prev_matched_line + 1, len(code_lines)):  # noqa: WPS518
+        if candidates is None:
+            code_indices = range(prev_matched_line + 1, code_end)
+        else:
+            line_candidates = candidates.get(i, [])
+            code_indices = line_candidates[bisect_right(line_candidates, prev_matched_line):]
+        for j in code_indices:  # noqa: WPS518
+            if j >= code_end:
+                break
             if is_equal(code_lines[j], template_lines[i]) and code_to_template[j] is None:
                 code_to_template[j] = i
                 template_to_code[i] = j
@@ -64,11 +92,60 @@ def match_code_lines(
                 break
 
 
+def match_code_lines_by_anchors(
+    code_lines: List[str],
+    template_lines: List[str],
+    code_to_template: List[Optional[int]],
+    template_to_code: List[Optional[int]],
+    is_equal: Callable[[str, str], bool],
+    is_empty: Callable[[str], bool],
+    preprocess: Callable[[str], str],
+    candidates: Optional[CandidateLines] = None,
+):
+    """
+    Match code with template not empty lines using exactly equal lines as anchors.
+
+    Firstly, not empty lines which are equal after preprocessing are aligned with the longest common subsequence
+    (computed over a hash index of lines). Such lines are always equal according to `is_equal` too.
+    Then the remaining lines are matched by `match_code_lines` only inside the gaps between two neighbouring anchors,
+    so the fuzzy `is_equal` is called just for the lines that were changed by the student.
+    """
+
+    code_indices = [j for j, code_line in enumerate(code_lines) if not is_empty(code_line)]
+    template_indices = [i for i, template_line in enumerate(template_lines) if not is_empty(template_line)]
+
+    matcher = SequenceMatcher(
+        a=[preprocess(template_lines[i]) for i in template_indices],
+        b=[preprocess(code_lines[j]) for j in code_indices],
+        autojunk=False,
+    )
+
+    template_start, code_start = 0, 0
+    for block in matcher.get_matching_blocks():
+        # The last block is a dummy one with zero size, it is used to match lines after the last anchor
+        template_end = template_indices[block.a] if block.a < len(template_indices) else len(template_lines)
+        code_end = code_indices[block.b] if block.b < len(code_indices) else len(code_lines)
+        match_code_lines(code_lines, template_lines, code_to_template, template_to_code, is_equal, is_empty,
+                         template_start, template_end, code_start, code_end, candidates)
+
+        for k in range(block.size):
+            i, j = template_indices[block.a + k], code_indices[block.b + k]
+            code_to_template[j] = i
+            template_to_code[i] = j
+
+        if block.size > 0:
+            template_start = template_indices[block.a + block.size - 1] + 1
+            code_start = code_indices[block.b + block.size - 1] + 1
+
+
 def match_code_with_template(
     code_lines: List[str],
     template_lines: List[str],
     is_equal: StringComparator,
     is_empty: Callable[[str], bool],
+    match_algorithm: str = GREEDY_MATCH,
+    preprocess: Optional[Callable[[str], str]] = None,
+    template_index: Optional[MinHashIndex] = None,
 ) -> Tuple[MatchedIndices, MatchedIndices]:
     """
     Match code with template and return list of matched indices.
@@ -76,11 +153,25 @@ def match_code_with_template(
     Example: list of indices [0, 1, None, None, 2] means that the first and the second lines of the submission were
     matched with the first and the second lines of the template accordingly, the third and the forth lines were
     not matched with the template, the fifth line was matched with the third line of the template.
+
+    `match_algorithm` is one of MATCH_ALGORITHMS. The `anchors` algorithm uses `preprocess` to normalize lines
+    before searching for the exactly equal ones.
+
+    If `template_index` with template lines is passed, only code lines which are candidates to be equal to
+    a template line according to the index are compared with it.
     """
 
+    candidates = None if template_index is None else template_index.get_candidates(code_lines)
     code_to_template = [None for _ in range(len(code_lines))]
     template_to_code = [None for _ in range(len(template_lines))]
-    match_code_lines(code_lines, template_lines, code_to_template, template_to_code, is_equal, is_empty)
+    if match_algorithm == ANCHORS_MATCH:
+        match_code_lines_by_anchors(code_lines, template_lines, code_to_template, template_to_code, is_equal, is_empty,
+                                    (lambda line: line) if preprocess is None else preprocess, candidates)
+    elif match_algorithm == GREEDY_MATCH:
+        match_code_lines(code_lines, template_lines, code_to_template, template_to_code, is_equal, is_empty,
+                         candidates=candidates)
+    else:
+        raise ValueError(f'Unknown match algorithm: {match_algorithm}')
     match_empty_lines(code_lines, template_lines, code_to_template, template_to_code, is_empty)
 
     return code_to_template, template_to_code
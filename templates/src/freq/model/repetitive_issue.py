@@ -0,0 +1,242 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+from dataclasses_json import config, dataclass_json
+
+from core.src.model.column_name import IssuesColumns, SubmissionColumns
+from core.src.utils.json_utils import parse_json
+from templates.src.freq.utils.template_columns import TemplateColumns
+
+REPETITIVE_ISSUES_COLUMNS = [
+    IssuesColumns.NAME.value,
+    TemplateColumns.DESCRIPTION.value,
+    TemplateColumns.LINE.value,
+    TemplateColumns.POS_IN_TEMPLATE.value,
+    TemplateColumns.COUNT.value,
+    TemplateColumns.GROUPS.value,
+]
+
+
+@dataclass_json
+@dataclass(frozen=True)
+class RepetitiveIssue:
+    name: str
+    template_line_number: Optional[int]
+    line_with_issue: Optional[str]
+
+    # Other field are do not included to __eq__ method
+    description: Optional[str] = field(default=None, compare=False, hash=False)
+
+
+@dataclass_json
+@dataclass
+class RepetitiveIssueStats:
+    """ Accumulated statistics of the repetitive issue over submission series (groups) of the step. """
+
+    issue: RepetitiveIssue
+    count: int = 0
+    groups: List[int] = field(default_factory=list)
+
+    def add_group(self, group: int, max_groups: Optional[int] = None):
+        """ Count one more series with repetitive issue. Only first `max_groups` group ids are kept if specified. """
+
+        self.count += 1
+        if max_groups is None or len(self.groups) < max_groups:
+            self.groups.append(int(group))
+
+    def remove_group(self, group: int):
+        """ Do not count the series with repetitive issue anymore. """
+
+        self.count -= 1
+        if group in self.groups:
+            self.groups.remove(group)
+
+    def merge(self, other: 'RepetitiveIssueStats', max_groups: Optional[int] = None):
+        """ Add statistics of the same issue collected on other groups. """
+
+        self.count += other.count
+        free_groups = len(other.groups) if max_groups is None else max(max_groups - len(self.groups), 0)
+        self.groups.extend(other.groups[:free_groups])
+
+
+@dataclass_json
+@dataclass
+class SubmissionSeriesState:
+    """
+    State of submission series of the user in the step, which is needed to continue the series by new attempts:
+    id of its last processed submission and its repetitive issues, i.e. issues which appear in all its attempts.
+    The state does not depend on the number of attempts, so states of all series can be saved for the next merge.
+    """
+
+    step_id: int
+    user_id: int
+    group: int
+    last_submission_id: int
+    repetitive_issues: List[RepetitiveIssue] = field(default_factory=list)
+
+    def get_key(self) -> Tuple[int, int]:
+        """ Series are identified by the step and the user, so they are the same in any run. """
+
+        return self.step_id, self.user_id
+
+    def continue_with(self, other: 'SubmissionSeriesState'):
+        """ Continue the series by new attempts with given state. """
+
+        self.last_submission_id = max(self.last_submission_id, other.last_submission_id)
+        # Issue appears in all attempts of the series only if it appears in all attempts of both its parts
+        other_issues = set(other.repetitive_issues)
+        self.repetitive_issues = [issue for issue in self.repetitive_issues if issue in other_issues]
+
+
+@dataclass_json
+@dataclass
+class StepRepetitiveIssuesStats:
+    """
+    Accumulated statistics of all repetitive issues in the step.
+    Statistics are mergeable, so they can be collected on different parts of submissions and combined later.
+    States of the counted submission series are not saved with statistics, they are only passed to the merge.
+    """
+
+    step_id: int
+    submissions_count: int = 0
+    issues_stats: List[RepetitiveIssueStats] = field(default_factory=list)
+    series_states: List[SubmissionSeriesState] = field(default_factory=list,
+                                                       metadata=config(exclude=lambda _: True))
+
+    def add_series(self, series_state: SubmissionSeriesState, submissions_count: int,
+                   max_groups: Optional[int] = None, keep_state: bool = False):
+        """
+        Count repetitive issues of one more submission series.
+        The state of the series is kept only if `keep_state` is True, it is needed only to merge statistics.
+        """
+
+        issues_stats = {issue_stats.issue: issue_stats for issue_stats in self.issues_stats}
+        for issue in series_state.repetitive_issues:
+            if issue not in issues_stats:
+                issues_stats[issue] = RepetitiveIssueStats(issue)
+                self.issues_stats.append(issues_stats[issue])
+            issues_stats[issue].add_group(series_state.group, max_groups)
+
+        self.submissions_count += submissions_count
+        if keep_state:
+            self.series_states.append(series_state)
+
+    def remove_series_issues(self, group: int, issues: List[RepetitiveIssue]):
+        """ Do not count given repetitive issues of the submission series anymore. """
+
+        issues_stats = {issue_stats.issue: issue_stats for issue_stats in self.issues_stats}
+        for issue in issues:
+            if issue in issues_stats:
+                issues_stats[issue].remove_group(group)
+
+        self.issues_stats = [issue_stats for issue_stats in self.issues_stats if issue_stats.count > 0]
+
+    def merge(self, other: 'StepRepetitiveIssuesStats', max_groups: Optional[int] = None):
+        """ Add statistics of the same step collected on other submission series. """
+
+        issues_stats = {issue_stats.issue: issue_stats for issue_stats in self.issues_stats}
+        for other_issue_stats in other.issues_stats:
+            if other_issue_stats.issue in issues_stats:
+                issues_stats[other_issue_stats.issue].merge(other_issue_stats, max_groups)
+            else:
+                self.issues_stats.append(other_issue_stats)
+
+        self.submissions_count += other.submissions_count
+
+    def to_df(self) -> pd.DataFrame:
+        """ Convert all collected repetitive issues information to dataframe. """
+
+        df_repetitive_issues = pd.DataFrame.from_records(
+            [
+                (stats.issue.name, stats.issue.description, stats.issue.line_with_issue,
+                 stats.issue.template_line_number, stats.count, stats.groups)
+                for stats in self.issues_stats
+            ],
+            columns=REPETITIVE_ISSUES_COLUMNS,
+        )
+
+        df_repetitive_issues[TemplateColumns.POS_IN_TEMPLATE.value] = \
+            df_repetitive_issues[TemplateColumns.POS_IN_TEMPLATE.value].astype('Int64')
+
+        df_repetitive_issues[TemplateColumns.TOTAL_COUNT.value] = self.submissions_count
+        df_repetitive_issues[SubmissionColumns.STEP_ID.value] = self.step_id
+
+        df_repetitive_issues[TemplateColumns.FREQUENCY.value] = \
+            df_repetitive_issues[TemplateColumns.COUNT.value] / df_repetitive_issues[TemplateColumns.TOTAL_COUNT.value]
+
+        return df_repetitive_issues.sort_values(by=TemplateColumns.COUNT.value, ascending=False)
+
+
+def merge_steps_stats(steps_stats: Dict[int, StepRepetitiveIssuesStats],
+                      new_steps_stats: List[StepRepetitiveIssuesStats],
+                      series_states: Dict[Tuple[int, int], SubmissionSeriesState],
+                      max_groups: Optional[int] = None) -> Dict[int, StepRepetitiveIssuesStats]:
+    """
+    Merge statistics collected on new submissions into already existing statistics of steps.
+    New statistics must be collected with kept states of series
+    and only on submissions which are newer than the last submissions of `series_states`.
+    Series continued by new attempts are counted once with issues from all their attempts,
+    `series_states` are updated with states of new series.
+    """
+
+    for new_step_stats in new_steps_stats:
+        step_stats = steps_stats.setdefault(new_step_stats.step_id, StepRepetitiveIssuesStats(new_step_stats.step_id))
+
+        for new_series_state in new_step_stats.series_states:
+            series_state = series_states.get(new_series_state.get_key())
+            if series_state is None:
+                series_states[new_series_state.get_key()] = new_series_state
+                continue
+
+            # New attempts are counted as the continuation of the saved series, not as a separate one
+            new_step_stats.remove_series_issues(new_series_state.group, new_series_state.repetitive_issues)
+            new_issues = set(new_series_state.repetitive_issues)
+            step_stats.remove_series_issues(series_state.group, [
+                issue for issue in series_state.repetitive_issues if issue not in new_issues
+            ])
+            series_state.continue_with(new_series_state)
+
+        step_stats.merge(new_step_stats, max_groups)
+
+    return steps_stats
+
+
+def steps_stats_to_df(steps_stats: List[StepRepetitiveIssuesStats]) -> pd.DataFrame:
+    """ Convert statistics of all steps to single dataframe ordered by step id. """
+
+    df_steps = [step_stats.to_df() for step_stats in sorted(steps_stats, key=lambda stats: stats.step_id)]
+    if not df_steps:
+        return StepRepetitiveIssuesStats(step_id=0).to_df()
+
+    return pd.concat(df_steps, ignore_index=True)
+
+
+def read_steps_stats(path: Union[str, Path]) -> Dict[int, StepRepetitiveIssuesStats]:
+    """ Read statistics of steps from given .json. """
+
+    steps_stats = [StepRepetitiveIssuesStats.from_dict(step_stats) for step_stats in parse_json(path)]
+    return {step_stats.step_id: step_stats for step_stats in steps_stats}
+
+
+def write_steps_stats(steps_stats: Dict[int, StepRepetitiveIssuesStats], path: Union[str, Path]):
+    """ Write statistics of steps to given .json. """
+
+    with open(path, 'w') as file:
+        json.dump([steps_stats[step_id].to_dict() for step_id in sorted(steps_stats)], file)
+
+
+def read_series_states(path: Union[str, Path]) -> Dict[Tuple[int, int], SubmissionSeriesState]:
+    """ Read states of submission series from given .json. """
+
+    series_states = [SubmissionSeriesState.from_dict(series_state) for series_state in parse_json(path)]
+    return {series_state.get_key(): series_state for series_state in series_states}
+
+
+def write_series_states(series_states: Dict[Tuple[int, int], SubmissionSeriesState], path: Union[str, Path]):
+    """ Write states of submission series to given .json. """
+
+    with open(path, 'w') as file:
+        json.dump([series_states[key].to_dict() for key in sorted(series_states)], file)
@@ -1,20 +1,24 @@
 import argparse
 import ast
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 import pandas as pd
 
 from core.src.model.api.platform_objects import Object
 from core.src.model.column_name import SubmissionColumns, IssuesColumns, StepColumns
+from core.src.model.quality.report import BaseReport
 from core.src.utils.df_utils import read_df, write_df
 from core.src.utils.file.extension_utils import AnalysisExtension
 from core.src.utils.file.file_utils import create_directory
 from core.src.utils.file.saving_utils import save_solution_to_file
 from core.src.utils.logging_utils import configure_logger
 from core.src.utils.quality.code_utils import get_code_with_issue_comment
+from core.src.utils.quality.report_utils import parse_report
+from templates.src.freq.model.repetitive_issue import read_steps_stats, steps_stats_to_df
 from templates.src.freq.utils.template_columns import TemplateColumns
 
 
@@ -30,6 +34,7 @@ class ProcessingConfig(Object):
     solutions_number: int
     with_additional_info: bool
     base_task_url: str
+    n_workers: int = 1
 
     @staticmethod
     def parse_from_args(args) -> 'ProcessingConfig':
@@ -44,6 +49,7 @@ class ProcessingConfig(Object):
             solutions_number=args.solutions_number,
             with_additional_info=args.with_additional_info,
             base_task_url=args.base_task_url.rstrip('/'),
+            n_workers=args.n_workers,
         )
 
 
@@ -88,27 +94,49 @@ def filter_by_freq(df_repetitive_issues: pd.DataFrame, freq_to_remove: float) ->
 def save_submission_samples(df_repetitive_issues: pd.DataFrame,
                             df_submissions: pd.DataFrame,
                             config: ProcessingConfig):
-    sample_path = Path(config.result_path) / 'samples'
-    for _, repetitive_issue in df_repetitive_issues.iterrows():
-        issue_name = repetitive_issue[IssuesColumns.NAME.value]
-        issue_position = repetitive_issue[TemplateColumns.POS_IN_TEMPLATE.value]
-        issue_line_number = None if pd.isna(issue_position) else issue_position + 1
-
-        submission_group_ids = ast.literal_eval(repetitive_issue[TemplateColumns.GROUPS.value])
-
-        for group_id in submission_group_ids[:config.solutions_number]:
-            submission_series = df_submissions[df_submissions[SubmissionColumns.GROUP.value] == group_id]
-            for _, submission in submission_series.iterrows():
-                submission_with_issue = submission.copy()
-                submission_with_issue[SubmissionColumns.CODE.value] = get_code_with_issue_comment(
-                    submission, config.issues_column,
-                    issue_name=issue_name,
-                    issue_line_number=issue_line_number)
+    """
+    Save first `solutions_number` submission series with each repetitive issue, commenting the issue in code.
+    Submissions are found by the index of groups built once, files are written in the pool of threads.
+    """
 
-                step_id = submission[SubmissionColumns.STEP_ID.value]
-                attempt = submission[SubmissionColumns.ATTEMPT.value]
-                submission_path = sample_path / str(step_id) / issue_name / str(group_id)
-                save_solution_to_file(submission_with_issue, submission_path, f'attempt_{attempt}')
+    sample_path = Path(config.result_path) / 'samples'
+    group_positions = df_submissions.groupby(SubmissionColumns.GROUP.value).indices
+    reports: Dict[int, BaseReport] = {}
+
+    with ThreadPoolExecutor(max_workers=config.n_workers) as executor:
+        futures = []
+        for issue_name, issue_position, submission_group_ids in zip(
+                df_repetitive_issues[IssuesColumns.NAME.value],
+                df_repetitive_issues[TemplateColumns.POS_IN_TEMPLATE.value],
+                df_repetitive_issues[TemplateColumns.GROUPS.value],
+        ):
+            issue_line_number = None if pd.isna(issue_position) else issue_position + 1
+
+            # Groups are stored as a string in .csv file and as a list in statistics
+            if isinstance(submission_group_ids, str):
+                submission_group_ids = ast.literal_eval(submission_group_ids)
+
+            for group_id in submission_group_ids[:config.solutions_number]:
+                for position in group_positions.get(group_id, []):
+                    submission_with_issue = df_submissions.iloc[position].copy()
+                    if position not in reports:
+                        reports[position] = parse_report(submission_with_issue, config.issues_column)
+
+                    submission_with_issue[SubmissionColumns.CODE.value] = get_code_with_issue_comment(
+                        submission_with_issue, config.issues_column,
+                        issue_name=issue_name,
+                        issue_line_number=issue_line_number,
+                        report=reports[position])
+
+                    step_id = submission_with_issue[SubmissionColumns.STEP_ID.value]
+                    attempt = submission_with_issue[SubmissionColumns.ATTEMPT.value]
+                    submission_path = sample_path / str(step_id) / issue_name / str(group_id)
+                    futures.append(executor.submit(save_solution_to_file, submission_with_issue, submission_path,
+                                                   f'attempt_{attempt}'))
+
+        # Raise the first exception occurred while saving
+        for future in futures:
+            future.result()
 
 
 def add_additional_info(
@@ -118,6 +146,7 @@ def add_additional_info(
 ) -> pd.DataFrame:
     """ Add urls to steps in repetitive issues dataframe and save samples of repetitive issues occurrence. """
 
+    df_repetitive_issues = df_repetitive_issues.copy()
     df_repetitive_issues[StepColumns.URL.value] = df_repetitive_issues[SubmissionColumns.STEP_ID.value] \
         .apply(lambda step_id: f'{config.base_task_url}/{step_id}')
     if df_submissions is not None:
@@ -137,8 +166,16 @@ def process_repetitive_issues(df_repetitive_issues: pd.DataFrame,
                          config.freq_to_separate_rare_and_common_issues)
 
 
+def read_repetitive_issues(repetitive_issues_path: str) -> pd.DataFrame:
+    """ Read repetitive issues from .csv file with search result or from .json file with merged statistics. """
+
+    if AnalysisExtension.get_extension_from_file(repetitive_issues_path) == AnalysisExtension.JSON:
+        return steps_stats_to_df(list(read_steps_stats(repetitive_issues_path).values()))
+    return read_df(repetitive_issues_path)
+
+
 def postprocess(config: ProcessingConfig):
-    df_repetitive_issues = read_df(config.repetitive_issues_path)
+    df_repetitive_issues = read_repetitive_issues(config.repetitive_issues_path)
     df_submissions = read_df(config.submissions_path)
 
     df_template_issues, df_rare_typical_issues, df_common_typical_issues = \
@@ -158,7 +195,8 @@ def postprocess(config: ProcessingConfig):
 
 def configure_parser(parser: argparse.ArgumentParser) -> None:
     parser.add_argument('repetitive_issues_path', type=str,
-                        help='Path to .csv file with repetitive issues from submissions.')
+                        help='Path to .csv file with repetitive issues from submissions '
+                             'or to .json file with statistics of repetitive issues.')
     parser.add_argument('submissions_path', type=str, default=None,
                         help='Path to .csv file with submissions with issues.')
     parser.add_argument('issues_column', type=str, default=None,
@@ -181,6 +219,8 @@ def configure_parser(parser: argparse.ArgumentParser) -> None:
                         help='Tne number of random students solutions that should be gathered for each task.')
     parser.add_argument('-url', '--base-task-url', type=str, default='https://hyperskill.org/learn/step',
                         help='Base url to the tasks on an education platform.')
+    parser.add_argument('--n-workers', type=int, default=1,
+                        help='Number of threads to write samples with repetitive issues.')
     parser.add_argument('--log-path', type=str, default=None, help='Path to directory for log.')
 
 
@@ -1,55 +1,63 @@
 import argparse
+import logging
 from pathlib import Path
 
 import sys
-from collections import defaultdict
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import pandas as pd
 
-from core.src.model.column_name import SubmissionColumns, IssuesColumns, StepColumns
-from core.src.model.quality.issue.issue import BaseIssue
-from core.src.utils.df_utils import filter_df_by_iterable_value, read_df, write_or_pint_df
+from core.src.model.column_name import SubmissionColumns, StepColumns
+from core.src.utils.df_utils import append_df, filter_df_by_iterable_value, read_df, write_df, write_or_pint_df
 from core.src.utils.logging_utils import configure_logger
 from core.src.utils.quality.code_utils import split_code_to_lines
-from core.src.utils.quality.report_utils import parse_report
-from templates.src.freq.matching.template_matching import match_code_with_template
+from core.src.utils.quality.report_utils import parse_str_report
+from templates.src.freq.matching.minhash_index import MinHashIndex
+from templates.src.freq.matching.template_matching import GREEDY_MATCH, MATCH_ALGORITHMS, match_code_with_template
+from templates.src.freq.model.repetitive_issue import (
+    RepetitiveIssue,
+    RepetitiveIssueStats,
+    StepRepetitiveIssuesStats,
+    SubmissionSeriesState,
+    merge_steps_stats,
+    read_series_states,
+    read_steps_stats,
+    steps_stats_to_df,
+    write_series_states,
+    write_steps_stats,
+)
 from templates.src.freq.utils.code_comparator import CodeComparator
-from templates.src.freq.utils.template_columns import TemplateColumns
-from templates.src.utils.template_utils import parse_template_code_from_step
+from templates.src.utils.template_utils import StepTemplates, parse_template_code_from_step
 
-
-@dataclass(frozen=True)
-class RepetitiveIssue:
-    name: str
-    template_line_number: Optional[int]
-    line_with_issue: Optional[str]
-
-    # Other field are do not included to __eq__ method
-    base_issue: Optional[BaseIssue] = field(compare=False, hash=False)
-    submission: Optional[pd.Series] = field(compare=False, hash=False)
+LAST_SUBMISSION_ID = 'last_submission_id'
 
 
 def get_repetitive_issues(submission_series: pd.DataFrame,
                           template_lines: List[str],
                           issues_column: str,
-                          code_comparator: CodeComparator) -> List[RepetitiveIssue]:
+                          code_comparator: CodeComparator,
+                          match_algorithm: str = GREEDY_MATCH,
+                          template_index: Optional[MinHashIndex] = None) -> List[RepetitiveIssue]:
     """
     Get information about issue (name, position in template, etc.) for issues
     that appear in every attempt in submission series.
     """
 
-    repetitive_issues_dict = defaultdict(list)
+    repetitive_issues_counter = Counter()
     submission_series = submission_series.sort_values(SubmissionColumns.ATTEMPT.value)
 
-    for _, submission in submission_series.iterrows():
-        code_lines = split_code_to_lines(submission[SubmissionColumns.CODE.value])
+    for code, str_report in zip(submission_series[SubmissionColumns.CODE.value], submission_series[issues_column]):
+        code_lines = split_code_to_lines(code)
         code_to_template, _ = match_code_with_template(code_lines, template_lines,
                                                        code_comparator.is_equal,
-                                                       code_comparator.is_empty)
+                                                       code_comparator.is_empty,
+                                                       match_algorithm,
+                                                       code_comparator.preprocess,
+                                                       template_index)
 
-        report = parse_report(submission, issues_column)
+        report = parse_str_report(str_report, issues_column)
         for issue in report.get_issues():
             issue_name = issue.get_name()
             # In issues line count starts with 1
@@ -65,54 +73,65 @@ def get_repetitive_issues(submission_series: pd.DataFrame,
                 else:
                     line_with_issue = code_lines[code_line_number]
                 line_with_issue = code_comparator.preprocess(line_with_issue)
-            repetitive_issue = RepetitiveIssue(issue_name, pos_in_template, line_with_issue, issue, submission)
-            repetitive_issues_dict[repetitive_issue].append(repetitive_issue)
+            # Counter keeps the first added issue as a key, so its description is used as a representative one
+            repetitive_issues_counter[RepetitiveIssue(issue_name, pos_in_template, line_with_issue,
+                                                      issue.get_text())] += 1
 
     total_attempts_count = submission_series.shape[0]
 
     # Repetitive issues are which appear in all attempts
     return [
         key_issue
-        for key_issue, repetitive_issues in repetitive_issues_dict.items()
-        if len(repetitive_issues) == total_attempts_count
+        for key_issue, count in repetitive_issues_counter.items()
+        if count == total_attempts_count
     ]
 
 
-def repetitive_issues_to_df(step_id: int,
-                            step_submissions_count: int,
-                            repetitive_issues: Dict[RepetitiveIssue, List[RepetitiveIssue]]) -> pd.DataFrame:
-    """ Convert all collected repetitive issues information from dict to dataframe. """
-    repetitive_issues_series = []
-
-    for key_issue, repetitive_issues in repetitive_issues.items():
-        repetitive_issue = {IssuesColumns.NAME.value: key_issue.name,
-                            TemplateColumns.DESCRIPTION.value: key_issue.base_issue.get_text(),
-                            TemplateColumns.LINE.value: key_issue.line_with_issue,
-                            TemplateColumns.POS_IN_TEMPLATE.value: key_issue.template_line_number,
-                            TemplateColumns.COUNT.value: len(repetitive_issues),
-                            TemplateColumns.GROUPS.value:
-                                [issue.submission[SubmissionColumns.GROUP.value] for issue in repetitive_issues]}
-        repetitive_issues_series.append(pd.Series(repetitive_issue))
-
-    df_repetitive_issues = pd.DataFrame.from_records(repetitive_issues_series)
-
-    df_repetitive_issues[TemplateColumns.POS_IN_TEMPLATE.value] = \
-        df_repetitive_issues[TemplateColumns.POS_IN_TEMPLATE.value].astype('Int64')
+def get_template_repetitive_issues_stats(df_submissions: pd.DataFrame,
+                                         template: List[str],
+                                         issues_column: str,
+                                         code_comparator: CodeComparator,
+                                         match_algorithm: str = GREEDY_MATCH,
+                                         max_groups: Optional[int] = None,
+                                         template_index: Optional[MinHashIndex] = None,
+                                         keep_series_states: bool = False) -> Dict[int, StepRepetitiveIssuesStats]:
+    """
+    Collect statistics of repetitive issues of each step in submissions with given template.
+    Each submission series is counted as soon as its repetitive issues are found,
+    so only counts and first `max_groups` group ids (all if not specified) are kept for each repetitive issue.
+    Series are submissions of the same user in the same step, so they are identified in the same way in any run.
+    Their states are kept only if `keep_series_states` is True to merge statistics later.
+    """
 
-    df_repetitive_issues[TemplateColumns.TOTAL_COUNT.value] = step_submissions_count
-    df_repetitive_issues[SubmissionColumns.STEP_ID.value] = step_id
+    steps_stats: Dict[int, StepRepetitiveIssuesStats] = {}
 
-    df_repetitive_issues[TemplateColumns.FREQUENCY.value] = \
-        df_repetitive_issues[TemplateColumns.COUNT.value] / df_repetitive_issues[TemplateColumns.TOTAL_COUNT.value]
+    df_submission_series = df_submissions.groupby([SubmissionColumns.STEP_ID.value, SubmissionColumns.USER_ID.value])
+    for (step_id, user_id), submission_series in df_submission_series:
+        submission_series_repetitive_issues = get_repetitive_issues(submission_series, template, issues_column,
+                                                                    code_comparator, match_algorithm, template_index)
+        series_state = SubmissionSeriesState(
+            int(step_id),
+            int(user_id),
+            int(submission_series[SubmissionColumns.GROUP.value].iloc[0]),
+            int(submission_series[SubmissionColumns.ID.value].max()),
+            submission_series_repetitive_issues,
+        )
+        step_stats = steps_stats.setdefault(int(step_id), StepRepetitiveIssuesStats(int(step_id)))
+        step_stats.add_series(series_state, submission_series.shape[0], max_groups, keep_series_states)
 
-    return df_repetitive_issues.sort_values(by=TemplateColumns.COUNT.value, ascending=False)
+    return steps_stats
 
 
-def search_repetitive_issues_by_step(df_submissions: pd.DataFrame,
+def get_step_repetitive_issues_stats(df_submissions: pd.DataFrame,
                                      step: pd.Series,
                                      issues_column: str,
-                                     code_comparator: CodeComparator) -> pd.DataFrame:
-    """ Search template issues in submissions with given step. """
+                                     code_comparator: CodeComparator,
+                                     match_algorithm: str = GREEDY_MATCH,
+                                     max_groups: Optional[int] = None) -> StepRepetitiveIssuesStats:
+    """
+    Collect statistics of repetitive issues in submissions with given step.
+    Only counts and first `max_groups` group ids (all if not specified) are kept for each repetitive issue.
+    """
 
     step_ids = df_submissions[SubmissionColumns.STEP_ID.value].unique()
     assert len(step_ids) == 1, "All submissions should be for single step"
@@ -121,49 +140,362 @@ def search_repetitive_issues_by_step(df_submissions: pd.DataFrame,
     assert len(langs) == 1, "Can not process search for submissions with different language version"
 
     template = parse_template_code_from_step(step, langs[0])
-    repetitive_issues = defaultdict(list)
+    steps_stats = get_template_repetitive_issues_stats(df_submissions, template, issues_column, code_comparator,
+                                                       match_algorithm, max_groups,
+                                                       code_comparator.build_template_index(template))
 
-    df_submission_series = df_submissions.groupby(SubmissionColumns.GROUP.value)
-    for _, submission_series in df_submission_series:
-        submission_series_repetitive_issues = get_repetitive_issues(submission_series, template, issues_column,
-                                                                    code_comparator)
-        for issue in submission_series_repetitive_issues:
-            repetitive_issues[issue].append(issue)
+    step_id = int(step[StepColumns.ID.value])
+    return steps_stats.get(step_id, StepRepetitiveIssuesStats(step_id))
 
-    return repetitive_issues_to_df(step[StepColumns.ID.value], df_submissions.shape[0], repetitive_issues)
+
+def pool_steps_repetitive_issues_stats(steps_stats: Dict[int, StepRepetitiveIssuesStats]) \
+        -> List[StepRepetitiveIssuesStats]:
+    """
+    Count repetitive issues on submission series of all the steps together.
+    Each step gets the pooled counts, but only group ids of its own series, so its samples are its own submissions.
+    """
+
+    pooled_counts = Counter()
+    for step_stats in steps_stats.values():
+        pooled_counts.update({issue_stats.issue: issue_stats.count for issue_stats in step_stats.issues_stats})
+    pooled_submissions_count = sum(step_stats.submissions_count for step_stats in steps_stats.values())
+
+    pooled_steps_stats = []
+    for step_id, step_stats in sorted(steps_stats.items()):
+        own_groups = {issue_stats.issue: issue_stats.groups for issue_stats in step_stats.issues_stats}
+        issues_stats = [
+            RepetitiveIssueStats(issue, count, own_groups.get(issue, []))
+            for issue, count in pooled_counts.items()
+        ]
+        pooled_steps_stats.append(StepRepetitiveIssuesStats(step_id, pooled_submissions_count, issues_stats))
+
+    return pooled_steps_stats
+
+
+def get_template_steps_repetitive_issues_stats(df_submissions: pd.DataFrame,
+                                               template: List[str],
+                                               issues_column: str,
+                                               code_comparator: CodeComparator,
+                                               match_algorithm: str = GREEDY_MATCH,
+                                               max_groups: Optional[int] = None,
+                                               pool_steps: bool = False,
+                                               keep_series_states: bool = False) -> List[StepRepetitiveIssuesStats]:
+    """
+    Collect statistics of repetitive issues in submissions of steps with identical template.
+    Template is preprocessed only once for all the steps.
+
+    If `pool_steps` is True, statistics are collected on submissions of all the steps together,
+    so rare issues of steps with a few submissions are counted with enough support.
+    """
+
+    template_index = code_comparator.build_template_index(template)
+    steps_stats = get_template_repetitive_issues_stats(df_submissions, template, issues_column, code_comparator,
+                                                       match_algorithm, max_groups, template_index, keep_series_states)
+
+    if pool_steps:
+        return pool_steps_repetitive_issues_stats(steps_stats)
+
+    return [step_stats for _, step_stats in sorted(steps_stats.items())]
+
+
+def search_repetitive_issues_by_step(df_submissions: pd.DataFrame,
+                                     step: pd.Series,
+                                     issues_column: str,
+                                     code_comparator: CodeComparator,
+                                     match_algorithm: str = GREEDY_MATCH,
+                                     max_groups: Optional[int] = None) -> pd.DataFrame:
+    """ Search template issues in submissions with given step. """
+
+    return get_step_repetitive_issues_stats(df_submissions, step, issues_column, code_comparator,
+                                            match_algorithm, max_groups).to_df()
+
+
+def group_submissions_by_template(df_submissions: pd.DataFrame,
+                                  df_steps: pd.DataFrame) -> List[Tuple[List[str], pd.DataFrame]]:
+    """ Group submissions of steps by template fingerprint, so steps with identical templates are in one group. """
+
+    step_templates = StepTemplates(df_steps)
+    step_fingerprints = {}
+    for step_id, df_step_submissions in df_submissions.groupby(SubmissionColumns.STEP_ID.value):
+        langs = df_step_submissions[SubmissionColumns.LANG.value].unique()
+        assert len(langs) == 1, "Can not process search for submissions with different language version"
+        step_fingerprints[step_id] = step_templates.get_fingerprint(step_id, langs[0])
+
+    fingerprints = df_submissions[SubmissionColumns.STEP_ID.value].map(step_fingerprints)
+    templates_submissions = [
+        (step_templates.get_template(df_template_submissions[SubmissionColumns.STEP_ID.value].iloc[0],
+                                     df_template_submissions[SubmissionColumns.LANG.value].iloc[0]),
+         df_template_submissions)
+        for _, df_template_submissions in df_submissions.groupby(fingerprints)
+    ]
+    # Steps are processed approximately in order of their ids
+    templates_submissions.sort(key=lambda template_group: template_group[1][SubmissionColumns.STEP_ID.value].min())
+    logging.info(f'{len(step_fingerprints)} steps have {len(templates_submissions)} distinct templates.')
+
+    return templates_submissions
+
+
+def iterate_repetitive_issues_stats(df_submissions: pd.DataFrame,
+                                    df_steps: pd.DataFrame,
+                                    issues_column: str,
+                                    code_comparator: CodeComparator,
+                                    match_algorithm: str = GREEDY_MATCH,
+                                    n_workers: int = 1,
+                                    max_groups: Optional[int] = None,
+                                    pool_steps: bool = False,
+                                    keep_series_states: bool = False) -> Iterator[StepRepetitiveIssuesStats]:
+    """
+    Collect statistics of repetitive issues for steps with each distinct template and yield them in order of step ids.
+    Statistics of each step are yielded as soon as statistics of all steps with smaller ids are collected,
+    so they can be saved without waiting for other steps.
+
+    Steps with identical templates are processed together, so each distinct template is preprocessed once.
+    If `pool_steps` is True, statistics of steps with identical templates are collected on their pooled submissions.
+    If `n_workers` is greater than one, templates are processed in parallel in the pool of processes.
+    If `keep_series_states` is True, states of submission series are kept in statistics to merge them later.
+    """
+
+    df_submissions = filter_df_by_iterable_value(df_submissions, SubmissionColumns.STEP_ID.value,
+                                                 df_steps[StepColumns.ID.value].unique())
+    templates_submissions = group_submissions_by_template(df_submissions, df_steps)
+    step_ids = sorted(int(step_id) for step_id in df_submissions[SubmissionColumns.STEP_ID.value].unique())
+
+    if n_workers > 1:
+        templates_steps_stats = iterate_repetitive_issues_stats_in_parallel(templates_submissions, issues_column,
+                                                                            code_comparator, match_algorithm,
+                                                                            n_workers, max_groups, pool_steps,
+                                                                            keep_series_states)
+    else:
+        templates_steps_stats = (
+            get_template_steps_repetitive_issues_stats(df_template_submissions, template,
+                                                       issues_column=issues_column,
+                                                       code_comparator=code_comparator,
+                                                       match_algorithm=match_algorithm,
+                                                       max_groups=max_groups,
+                                                       pool_steps=pool_steps,
+                                                       keep_series_states=keep_series_states)
+            for template, df_template_submissions in templates_submissions
+        )
+
+    yield from order_steps_stats(templates_steps_stats, step_ids)
+
+
+def order_steps_stats(templates_steps_stats: Iterator[List[StepRepetitiveIssuesStats]],
+                      step_ids: List[int]) -> Iterator[StepRepetitiveIssuesStats]:
+    """
+    Buffer statistics of steps collected in any order and yield them in order of given sorted step ids.
+    Statistics of each step are yielded as soon as statistics of all steps with smaller ids are yielded.
+    """
+
+    collected_steps_stats: Dict[int, StepRepetitiveIssuesStats] = {}
+    next_step_index = 0
+    for template_steps_stats in templates_steps_stats:
+        for step_stats in template_steps_stats:
+            collected_steps_stats[step_stats.step_id] = step_stats
+
+        while next_step_index < len(step_ids) and step_ids[next_step_index] in collected_steps_stats:
+            yield collected_steps_stats.pop(step_ids[next_step_index])
+            next_step_index += 1
+
+
+def iterate_repetitive_issues_stats_in_parallel(templates_submissions: List[Tuple[List[str], pd.DataFrame]],
+                                                issues_column: str,
+                                                code_comparator: CodeComparator,
+                                                match_algorithm: str,
+                                                n_workers: int,
+                                                max_groups: Optional[int] = None,
+                                                pool_steps: bool = False,
+                                                keep_series_states: bool = False,
+                                                ) -> Iterator[List[StepRepetitiveIssuesStats]]:
+    """
+    Collect statistics of repetitive issues in steps with each template in the separate process.
+    The largest groups of submissions are submitted first to balance workers load,
+    results are yielded in order of their completion.
+    """
+
+    templates_submissions = sorted(templates_submissions,
+                                   key=lambda template_group: template_group[1].shape[0], reverse=True)
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = [
+            executor.submit(get_template_steps_repetitive_issues_stats,
+                            df_template_submissions,
+                            template,
+                            issues_column=issues_column,
+                            code_comparator=code_comparator,
+                            match_algorithm=match_algorithm,
+                            max_groups=max_groups,
+                            pool_steps=pool_steps,
+                            keep_series_states=keep_series_states)
+            for template, df_template_submissions in templates_submissions
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def collect_repetitive_issues_stats(df_submissions: pd.DataFrame,
+                                    df_steps: pd.DataFrame,
+                                    issues_column: str,
+                                    code_comparator: CodeComparator,
+                                    match_algorithm: str = GREEDY_MATCH,
+                                    n_workers: int = 1,
+                                    max_groups: Optional[int] = None,
+                                    pool_steps: bool = False) -> List[StepRepetitiveIssuesStats]:
+    """ Collect statistics of repetitive issues for all steps ordered by step id. """
+
+    return list(iterate_repetitive_issues_stats(df_submissions, df_steps, issues_column, code_comparator,
+                                                match_algorithm, n_workers, max_groups, pool_steps))
 
 
 def search_repetitive_issues(df_submissions: pd.DataFrame,
                              df_steps: pd.DataFrame,
                              issues_column: str,
-                             code_comparator: CodeComparator) -> pd.DataFrame:
+                             code_comparator: CodeComparator,
+                             match_algorithm: str = GREEDY_MATCH,
+                             n_workers: int = 1,
+                             max_groups: Optional[int] = None,
+                             pool_steps: bool = False) -> pd.DataFrame:
     """ Search for all repetitive issues - issue which remains in all submission of concrete user for concrete step. """
 
-    df_submissions = filter_df_by_iterable_value(df_submissions, SubmissionColumns.STEP_ID.value,
-                                                 df_steps[StepColumns.ID.value].unique())
+    return steps_stats_to_df(collect_repetitive_issues_stats(df_submissions, df_steps, issues_column, code_comparator,
+                                                             match_algorithm, n_workers, max_groups, pool_steps))
+
+
+def get_processed_steps_path(repetitive_issues_path: Union[str, Path]) -> Path:
+    """ Get path to .csv file with ids of steps whose repetitive issues are completely saved to the output. """
+
+    repetitive_issues_path = Path(repetitive_issues_path)
+    return repetitive_issues_path.with_name(f'{repetitive_issues_path.stem}_processed_steps.csv')
+
+
+def read_processed_step_ids(repetitive_issues_path: Union[str, Path]) -> Set[int]:
+    """
+    Read ids of steps which are completely processed, including steps without repetitive issues,
+    and remove rows of other steps which could be partially saved to the output before the search was interrupted.
+    """
+
+    processed_steps_path = get_processed_steps_path(repetitive_issues_path)
+    if not processed_steps_path.exists():
+        processed_step_ids = set()
+    else:
+        processed_step_ids = set(read_df(processed_steps_path)[SubmissionColumns.STEP_ID.value])
+
+    if Path(repetitive_issues_path).exists():
+        df_repetitive_issues = read_df(repetitive_issues_path)
+        is_processed = df_repetitive_issues[SubmissionColumns.STEP_ID.value].isin(processed_step_ids)
+        if not is_processed.all():
+            logging.info(f'Remove {(~is_processed).sum()} rows of partially saved steps.')
+            write_df(df_repetitive_issues[is_processed], repetitive_issues_path)
+
+    return processed_step_ids
+
+
+def get_series_states_path(stats_path: Union[str, Path]) -> Path:
+    """ Get path to .json file with states of submission series counted in statistics. """
+
+    stats_path = Path(stats_path)
+    return stats_path.with_name(f'{stats_path.stem}_series.json')
+
 
-    df_steps.set_index(StepColumns.ID.value, inplace=True, drop=False)
+def remove_processed_submissions(df_submissions: pd.DataFrame,
+                                 series_states: Dict[Tuple[int, int], SubmissionSeriesState]) -> pd.DataFrame:
+    """
+    Remove submissions of series which are already counted in statistics.
+    Submission ids are expected to grow with time, so only submissions after the last processed one are new.
+    """
+
+    if not series_states:
+        return df_submissions
+
+    df_last_submissions = pd.DataFrame.from_records(
+        [(step_id, user_id, state.last_submission_id) for (step_id, user_id), state in series_states.items()],
+        columns=[SubmissionColumns.STEP_ID.value, SubmissionColumns.USER_ID.value, LAST_SUBMISSION_ID],
+    )
+    last_submission_ids = df_submissions.merge(
+        df_last_submissions, how='left', on=[SubmissionColumns.STEP_ID.value, SubmissionColumns.USER_ID.value],
+    )[LAST_SUBMISSION_ID]
+    is_new = (last_submission_ids.isna() | (df_submissions[SubmissionColumns.ID.value] > last_submission_ids)).values
+    logging.info(f'Skip {(~is_new).sum()} already processed submissions.')
 
-    return df_submissions \
-        .groupby([SubmissionColumns.STEP_ID.value], as_index=False) \
-        .apply(lambda df_step_submissions: search_repetitive_issues_by_step(df_step_submissions,
-                                                                            # name is group key (step id)
-                                                                            step=df_steps.loc[df_step_submissions.name],
-                                                                            issues_column=issues_column,
-                                                                            code_comparator=code_comparator))
+    return df_submissions[is_new]
 
 
 def search_template_issues(submissions_path: str, steps_path: str, repetitive_issues_path: Optional[str],
                            issues_column: str, equal_type: str, ignore_trailing_comments: bool,
-                           ignore_trailing_whitespaces: bool):
-    """ Search for all repetitive issues and save result to `repetitive_issues_path` """
+                           ignore_trailing_whitespaces: bool, match_algorithm: str = GREEDY_MATCH,
+                           n_workers: int = 1, max_groups: Optional[int] = None, stats_path: Optional[str] = None,
+                           use_lsh: bool = False, pool_steps: bool = False, resume: bool = False):
+    """
+    Search for all repetitive issues and save result to `repetitive_issues_path`.
+
+    Repetitive issues of steps are appended to `repetitive_issues_path` in order of step ids as soon as the steps
+    are processed, so the memory is not occupied with results and the work done is not lost if the search is
+    interrupted. After rows of the step are appended, its id is recorded to the file of processed steps next to
+    the output, even if the step has no repetitive issues.
+    If `resume` is True, steps from the file of processed steps are skipped
+    and partially saved rows of other steps are removed from the output.
+
+    If `stats_path` is passed, statistics collected on given submissions are merged into the saved ones,
+    so only new submissions can be processed, and result contains repetitive issues of all of them.
+    States of counted submission series are saved next to statistics, so already processed submissions are skipped
+    and series continued by new attempts are counted once.
+    In this case the result is written only after all steps are processed.
+    If `use_lsh` is True, code lines are compared only with similar template lines found by MinHash LSH.
+    If `pool_steps` is True, statistics of steps with identical templates are collected on their pooled submissions.
+    """
+
+    if resume and (repetitive_issues_path is None or stats_path is not None):
+        raise ValueError('Search can be resumed only if output path is passed and stats path is not.')
+    if pool_steps and stats_path is not None:
+        raise ValueError('Pooled statistics of steps can not be merged, so steps can not be pooled with stats path.')
 
     df_submissions = read_df(submissions_path)
     df_steps = read_df(steps_path)
 
-    code_comparator = CodeComparator(equal_type, ignore_trailing_comments, ignore_trailing_whitespaces)
-    df_repetitive_issues = search_repetitive_issues(df_submissions, df_steps, issues_column, code_comparator)
-    write_or_pint_df(df_repetitive_issues, repetitive_issues_path)
+    if stats_path is not None:
+        series_states_path = get_series_states_path(stats_path)
+        series_states = read_series_states(series_states_path) if series_states_path.exists() else {}
+        df_submissions = remove_processed_submissions(df_submissions, series_states)
+
+    stream_output = repetitive_issues_path is not None and stats_path is None
+    if stream_output:
+        processed_steps_path = get_processed_steps_path(repetitive_issues_path)
+        if resume:
+            processed_step_ids = read_processed_step_ids(repetitive_issues_path)
+            df_steps = df_steps[~df_steps[StepColumns.ID.value].isin(processed_step_ids)]
+            logging.info(f'Skip {len(processed_step_ids)} already processed steps.')
+        else:
+            Path(repetitive_issues_path).unlink(missing_ok=True)
+            processed_steps_path.unlink(missing_ok=True)
+
+    code_comparator = CodeComparator(equal_type, ignore_trailing_comments, ignore_trailing_whitespaces,
+                                     use_lsh=use_lsh)
+
+    steps_stats = []
+    for step_stats in iterate_repetitive_issues_stats(df_submissions, df_steps, issues_column, code_comparator,
+                                                      match_algorithm, n_workers, max_groups, pool_steps,
+                                                      keep_series_states=stats_path is not None):
+        if stream_output:
+            append_df(steps_stats_to_df([step_stats]), repetitive_issues_path)
+            append_df(pd.DataFrame({SubmissionColumns.STEP_ID.value: [step_stats.step_id]}), processed_steps_path)
+            logging.info(f'Step {step_stats.step_id} is processed.')
+        else:
+            steps_stats.append(step_stats)
+
+    if stream_output:
+        # Output always has a header, even if there are no repetitive issues at all
+        if not Path(repetitive_issues_path).exists():
+            write_df(steps_stats_to_df([]), repetitive_issues_path)
+        return
+
+    if stats_path is not None:
+        saved_steps_stats = read_steps_stats(stats_path) if Path(stats_path).exists() else {}
+        merged_steps_stats = merge_steps_stats(saved_steps_stats, steps_stats, series_states, max_groups)
+        write_steps_stats(merged_steps_stats, stats_path)
+        write_series_states(series_states, series_states_path)
+        steps_stats = list(merged_steps_stats.values())
+
+    write_or_pint_df(steps_stats_to_df(steps_stats), repetitive_issues_path)
 
 
 def configure_parser(parser: argparse.ArgumentParser) -> None:
@@ -185,6 +517,29 @@ def configure_parser(parser: argparse.ArgumentParser) -> None:
                         help='Ignore trailing comments in code compare. True by default.')
     parser.add_argument('-iw', '--ignore-trailing-whitespaces', action='store_true',
                         help='Ignore trailing whitespaces in code compare. True by default.')
+    parser.add_argument('--match-algorithm', type=str, default=GREEDY_MATCH,
+                        help='Algorithm for matching code lines with template lines.',
+                        choices=MATCH_ALGORITHMS)
+    parser.add_argument('--n-workers', type=int, default=1,
+                        help='Number of processes to search repetitive issues in different steps in parallel.')
+    parser.add_argument('--max-groups', type=int, default=None,
+                        help='Maximum number of group ids to keep for each repetitive issue. All are kept by default.')
+    parser.add_argument('--stats-path', type=str, default=None,
+                        help='Path to .json file with statistics of repetitive issues. If the file exists, statistics '
+                             'collected on the given submissions are merged into it. The file is updated after merge.')
+    parser.add_argument('--lsh', action='store_true',
+                        help='Compare code lines only with similar template lines found by MinHash LSH. '
+                             'Speeds up fuzzy comparing, but a few similar lines can be missed. '
+                             'Is not used with substring comparing.')
+    parser.add_argument('--pool-steps', action='store_true',
+                        help='Collect statistics of steps with identical templates on their pooled submissions. '
+                             'Each of such steps gets the same repetitive issues, but samples only of its own '
+                             'submissions. Can not be used with --stats-path.')
+
+    parser.add_argument('--resume', action='store_true',
+                        help='Skip steps which are already processed, including steps without repetitive issues. '
+                             'Processed steps are recorded to the file with "_processed_steps" suffix next to the '
+                             'output file. Can not be used without --output-path or with --stats-path.')
 
     parser.add_argument('--log-path', type=str, default=None, help='Path to directory for log.')
 
@@ -194,6 +549,11 @@ def main():
     configure_parser(parser)
 
     args = parser.parse_args(sys.argv[1:])
+    if args.resume and (args.output_path is None or args.stats_path is not None):
+        parser.error('--resume can be used only with --output-path and without --stats-path')
+    if args.pool_steps and args.stats_path is not None:
+        parser.error('--pool-steps can not be used with --stats-path')
+
     if args.output_path is None:
         log_file_suffix = Path(args.submissions_path).parent
     else:
@@ -201,7 +561,9 @@ def main():
     configure_logger(log_file_suffix, f'repetitive_issues_{args.equal}', args.log_path)
 
     search_template_issues(args.submissions_path, args.steps_path, args.output_path, args.issues_column,
-                           args.equal, args.ignore_trailing_comments, args.ignore_trailing_whitespaces)
+                           args.equal, args.ignore_trailing_comments, args.ignore_trailing_whitespaces,
+                           args.match_algorithm, args.n_workers, args.max_groups, args.stats_path, args.lsh,
+                           args.pool_steps, args.resume)
 
 
 if __name__ == '__main__':
@@ -1,5 +1,6 @@
-from typing import Callable, Optional, Union
+from typing import Callable, List, Optional, Union
 
+from templates.src.freq.matching.minhash_index import MinHashIndex
 from templates.src.freq.utils.code_compare_utils import remove_trailing_comment, remove_trailing_whitespaces, EQUAL
 
 
@@ -13,11 +14,26 @@ class CodeComparator:
     def __init__(self, equal_type: str,
                  ignore_trailing_comments: bool,
                  ignore_trailing_whitespaces: bool,
-                 equal_upper_bound: Optional[Union[int, float]] = None):
+                 equal_upper_bound: Optional[Union[int, float]] = None,
+                 use_lsh: bool = False):
+        self._args = (equal_type, ignore_trailing_comments, ignore_trailing_whitespaces, equal_upper_bound, use_lsh)
+        # Substring of the line can be not similar to it, so such lines can not be found with LSH
+        self.use_lsh = use_lsh and equal_type != 'substring'
         self.preprocess = self._configure_preprocess_code_line(ignore_trailing_comments, ignore_trailing_whitespaces)
         self.is_equal = self._configure_is_equal(equal_type, self.preprocess, equal_upper_bound)
         self.is_empty = self._configure_is_empty(self.preprocess)
 
+    def __reduce__(self):
+        # Configured functions are closures which can not be pickled, so comparator is recreated from its arguments
+        return CodeComparator, self._args
+
+    def build_template_index(self, template_lines: List[str]) -> Optional[MinHashIndex]:
+        """ Build index of template lines to prune compared lines if LSH is used, otherwise return None. """
+
+        if not self.use_lsh:
+            return None
+        return MinHashIndex(template_lines, self.preprocess)
+
     @staticmethod
     def _configure_preprocess_code_line(ignore_trailing_comments: bool = True,
                                         ignore_trailing_whitespaces: bool = True) -> Callable[[str], str]:
@@ -21,11 +21,42 @@ def edit_distance(first_string: str, second_string: str) -> int:
     return dp[n - 1][m - 1]
 
 
+def bounded_edit_distance(first_string: str, second_string: str, upper_bound: int) -> int:
+    """
+    Compute edit distance for two strings if it is no more than upper_bound, otherwise return upper_bound + 1.
+    Only cells of the diagonal band with width upper_bound are computed, so it is much faster than edit_distance.
+    """
+
+    n = len(first_string) + 1
+    m = len(second_string) + 1
+    exceeded = upper_bound + 1
+    if abs(n - m) > upper_bound:
+        return exceeded
+
+    prev_row = [j if j <= upper_bound else exceeded for j in range(m)]
+    for i in range(1, n):
+        row = [exceeded] * m
+        if i <= upper_bound:
+            row[0] = i
+
+        left = max(1, i - upper_bound)
+        right = min(m - 1, i + upper_bound)
+        for j in range(left, right + 1):
+            d = 0 if first_string[i - 1] == second_string[j - 1] else 1
+            row[j] = min(prev_row[j - 1] + d, prev_row[j] + 1, row[j - 1] + 1, exceeded)
+
+        if min(row[left - 1:right + 1]) == exceeded:
+            return exceeded
+        prev_row = row
+
+    return prev_row[m - 1]
+
+
 def equal_edit_distance(code_line: str, template_line: str, upper_bound: int = 0) -> bool:
     """ Consider two strings as equal if their edit distance is no more than upper_bound. """
     if upper_bound == 0:
         return code_line == template_line
-    return edit_distance(code_line, template_line) <= upper_bound
+    return bounded_edit_distance(code_line, template_line, upper_bound) <= upper_bound
 
 
 def equal_edit_ratio(code_line: str, template_line: str, upper_bound: float = 0.2) -> bool:
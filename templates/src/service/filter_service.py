@@ -0,0 +1,246 @@
+import argparse
+import json
+import logging
+import sys
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from core.src.model.column_name import StepColumns, SubmissionColumns
+from core.src.utils.df_utils import read_df
+from core.src.utils.logging_utils import configure_logger
+from core.src.utils.quality.code_utils import split_code_to_lines
+from core.src.utils.quality.report_utils import parse_str_report
+from templates.src.diffs.filter_by_diff import ROW_NUMBER_COLUMN
+from templates.src.freq.filter_by_freq import TemplateIssuesIndex, build_template_issues_index, get_template_issues
+from templates.src.freq.matching.minhash_index import MinHashIndex
+from templates.src.freq.matching.template_matching import GREEDY_MATCH, MATCH_ALGORITHMS
+from templates.src.freq.utils.code_comparator import CodeComparator
+from templates.src.freq.utils.template_columns import TemplateColumns
+from templates.src.utils.template_utils import TemplateCodeParseException, parse_template_code_from_step
+
+FILTER_ENDPOINT = '/filter'
+HEALTH_ENDPOINT = '/health'
+
+
+def read_template_issues_index(templates_issues_path: str) -> TemplateIssuesIndex:
+    """
+    Read template issues catalog and build index of them.
+
+    The catalog can be produced by `postprocess_by_freq` (issues with `pos_in_template` and `line` columns)
+    or by `filter_by_diff --templates-issues-path` (issues with `row_number` column). In the last case
+    lines with issues are unknown, so they are taken from the template itself while filtering.
+    """
+
+    df_templates_issues = read_df(templates_issues_path)
+    if TemplateColumns.POS_IN_TEMPLATE.value in df_templates_issues.columns:
+        df_templates_issues = df_templates_issues.dropna(subset=[TemplateColumns.POS_IN_TEMPLATE.value])
+        return build_template_issues_index(df_templates_issues)
+
+    # In issues line count starts with 1
+    df_templates_issues = df_templates_issues.assign(**{
+        TemplateColumns.POS_IN_TEMPLATE.value: df_templates_issues[ROW_NUMBER_COLUMN] - 1,
+        TemplateColumns.LINE.value: None,
+    })
+    return build_template_issues_index(df_templates_issues)
+
+
+StepTemplate = Tuple[List[str], Dict[Tuple[str, int], str], Optional[MinHashIndex]]
+
+
+class TemplateIssuesCatalog:
+    """ In-memory catalog of template issues and parsed templates of their steps to filter submissions issues. """
+
+    def __init__(self, template_issues_index: TemplateIssuesIndex,
+                 df_steps: pd.DataFrame,
+                 issues_column: str,
+                 code_comparator: CodeComparator,
+                 match_algorithm: str = GREEDY_MATCH):
+        self.template_issues_index = template_issues_index
+        self.issues_column = issues_column
+        self.code_comparator = code_comparator
+        self.match_algorithm = match_algorithm
+
+        # Only steps with template issues are kept, other submissions are returned unchanged
+        self._steps = {
+            step[StepColumns.ID.value]: step
+            for _, step in df_steps.iterrows()
+            if step[StepColumns.ID.value] in template_issues_index
+        }
+        self._step_templates: Dict[Tuple[int, str], StepTemplate] = {}
+        self._lock = Lock()
+
+    def get_step_template(self, step_id: int, lang: str) -> StepTemplate:
+        """
+        Get template lines of the step with template issues on them and index of template lines if LSH is used.
+        Template is parsed and indexed only once.
+        """
+
+        key = (step_id, lang)
+        with self._lock:
+            if key not in self._step_templates:
+                template_lines = parse_template_code_from_step(self._steps[step_id], lang)
+                step_template_issues = {
+                    (issue_name, pos_in_template): template_lines[pos_in_template] if line is None else line
+                    for (issue_name, pos_in_template), line in self.template_issues_index[step_id].items()
+                    if line is not None or pos_in_template < len(template_lines)
+                }
+                template_index = self.code_comparator.build_template_index(template_lines)
+                self._step_templates[key] = (template_lines, step_template_issues, template_index)
+
+            return self._step_templates[key]
+
+    def filter_issues(self, step_id: int, lang: str, code: str, str_report: str) -> Dict[str, Any]:
+        """ Filter template issues from the report of the code. Result has the same columns as `filter_by_freq`. """
+
+        report = parse_str_report(str_report, self.issues_column)
+        template_issues = []
+        if step_id in self._steps:
+            template_lines, step_template_issues, template_index = self.get_step_template(step_id, lang)
+            template_issues = get_template_issues(split_code_to_lines(code), template_lines, report.get_issues(),
+                                                  step_template_issues, self.code_comparator, self.match_algorithm,
+                                                  template_index)
+
+        return {
+            self.issues_column: json.loads(report.filter_issues(lambda i: i not in template_issues).to_json()),
+            f'{self.issues_column}_diff': json.loads(report.filter_issues(lambda i: i in template_issues).to_json()),
+        }
+
+
+class TemplateIssuesFilterHandler(BaseHTTPRequestHandler):
+    """
+    Handler of requests to the filtering service:
+    - GET /health returns the number of steps with template issues
+    - POST /filter takes json with `step_id`, `lang`, `code`, `issues` fields and returns filtered issues
+    """
+
+    server: 'TemplateIssuesFilterServer'
+
+    def do_GET(self):  # noqa: N802 Name is defined by BaseHTTPRequestHandler
+        if self.path != HEALTH_ENDPOINT:
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': f'Unknown endpoint: {self.path}'})
+            return
+
+        self._send_json(HTTPStatus.OK, {'status': 'ok', 'steps': len(self.server.catalog.template_issues_index)})
+
+    def do_POST(self):  # noqa: N802 Name is defined by BaseHTTPRequestHandler
+        if self.path != FILTER_ENDPOINT:
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': f'Unknown endpoint: {self.path}'})
+            return
+
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            issues = request['issues']
+            # Issues can be passed both as json string (like in the submissions .csv) and as json object
+            str_report = issues if isinstance(issues, str) else json.dumps(issues)
+            response = self.server.catalog.filter_issues(int(request[SubmissionColumns.STEP_ID.value]),
+                                                         request[SubmissionColumns.LANG.value],
+                                                         request[SubmissionColumns.CODE.value],
+                                                         str_report)
+        except (ValueError, KeyError, TypeError, TemplateCodeParseException) as e:
+            logging.exception('Can not filter template issues')
+            self._send_json(HTTPStatus.BAD_REQUEST, {'error': repr(e)})
+            return
+        except Exception as e:
+            # Connection should not be dropped without a response on unexpected errors
+            logging.exception('Unexpected error while filtering template issues')
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': repr(e)})
+            return
+
+        self._send_json(HTTPStatus.OK, response)
+
+    def log_message(self, format: str, *args):  # noqa: WPS125 Signature is defined by BaseHTTPRequestHandler
+        logging.debug(format % args)
+
+    def _send_json(self, status: HTTPStatus, body: Dict[str, Any]):
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class TemplateIssuesFilterServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], catalog: TemplateIssuesCatalog):
+        super().__init__(address, TemplateIssuesFilterHandler)
+        self.catalog = catalog
+
+
+def create_server(templates_issues_path: str,
+                  steps_path: str,
+                  issues_column: str,
+                  equal_type: str,
+                  ignore_trailing_comments: bool,
+                  ignore_trailing_whitespaces: bool,
+                  match_algorithm: str = GREEDY_MATCH,
+                  host: str = 'localhost',
+                  port: int = 8080,
+                  equal_upper_bound: Optional[float] = None,
+                  use_lsh: bool = False) -> TemplateIssuesFilterServer:
+    """ Load template issues catalog with steps into memory and create server to filter submissions issues. """
+
+    code_comparator = CodeComparator(equal_type, ignore_trailing_comments, ignore_trailing_whitespaces,
+                                     equal_upper_bound, use_lsh)
+    catalog = TemplateIssuesCatalog(read_template_issues_index(templates_issues_path), read_df(steps_path),
+                                    issues_column, code_comparator, match_algorithm)
+    logging.info(f'Loaded template issues for {len(catalog.template_issues_index)} steps.')
+
+    return TemplateIssuesFilterServer((host, port), catalog)
+
+
+def configure_parser(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('templates_issues_path', type=str,
+                        help='Path to .csv file with template issues produced by postprocess_by_freq '
+                             'or by filter_by_diff with --templates-issues-path.')
+    parser.add_argument('steps_path', type=str, help='Path to .csv file with steps.')
+    parser.add_argument('issues_column', type=str,
+                        help='Column where issues stored.',
+                        choices=[SubmissionColumns.HYPERSTYLE_ISSUES.value, SubmissionColumns.QODANA_ISSUES.value])
+
+    parser.add_argument('--host', type=str, default='localhost', help='Host to run the service on.')
+    parser.add_argument('--port', type=int, default=8080, help='Port to run the service on.')
+    parser.add_argument('--equal', type=str, default='edit_distance',
+                        help='Function for lines comparing.',
+                        choices=['edit_distance', 'edit_ratio', 'substring'])
+    parser.add_argument('-ic', '--ignore-trailing-comments', action='store_false',
+                        help='Ignore trailing comments in code compare. True by default.')
+    parser.add_argument('-iw', '--ignore-trailing-whitespaces', action='store_false',
+                        help='Ignore trailing whitespaces in code compare. True by default.')
+    parser.add_argument('--match-algorithm', type=str, default=GREEDY_MATCH,
+                        help='Algorithm for matching code lines with template lines.',
+                        choices=MATCH_ALGORITHMS)
+    parser.add_argument('--lsh', action='store_true',
+                        help='Compare code lines only with similar template lines found by MinHash LSH. '
+                             'Speeds up fuzzy comparing, but a few similar lines can be missed. '
+                             'Is not used with substring comparing.')
+
+    parser.add_argument('--log-path', type=str, default=None, help='Path to directory for log.')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    configure_parser(parser)
+
+    args = parser.parse_args(sys.argv[1:])
+    configure_logger(args.templates_issues_path, 'template_issues_service', args.log_path)
+
+    server = create_server(args.templates_issues_path, args.steps_path, args.issues_column, args.equal,
+                           args.ignore_trailing_comments, args.ignore_trailing_whitespaces, args.match_algorithm,
+                           args.host, args.port, use_lsh=args.lsh)
+    print(f'Serving on http://{args.host}:{server.server_port}{FILTER_ENDPOINT}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
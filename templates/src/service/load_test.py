@@ -0,0 +1,101 @@
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from statistics import quantiles
+from threading import local
+from typing import Dict, List, Tuple
+
+import pandas as pd
+import requests
+
+from core.src.model.column_name import SubmissionColumns
+from core.src.utils.df_utils import read_df
+from templates.src.service.filter_service import FILTER_ENDPOINT
+
+_thread_local = local()
+
+
+def _get_session() -> requests.Session:
+    # Sessions are not thread-safe, so each thread keeps its own one
+    if not hasattr(_thread_local, 'session'):
+        _thread_local.session = requests.Session()
+    return _thread_local.session
+
+
+def send_filter_request(url: str, submission: Dict) -> Tuple[float, bool]:
+    """ Send submission to the filtering service and return request latency in seconds and success flag. """
+
+    start = time.perf_counter()
+    try:
+        response = _get_session().post(url, json=submission, timeout=60)
+        is_ok = response.status_code == requests.codes.ok
+    except requests.RequestException:
+        is_ok = False
+    return time.perf_counter() - start, is_ok
+
+
+def build_requests(df_submissions: pd.DataFrame, issues_column: str, requests_number: int) -> List[Dict]:
+    """ Build request bodies from submissions, repeating them to get `requests_number` requests. """
+
+    bodies = [
+        {
+            SubmissionColumns.STEP_ID.value: int(step_id),
+            SubmissionColumns.LANG.value: lang,
+            SubmissionColumns.CODE.value: code,
+            'issues': issues,
+        }
+        for step_id, lang, code, issues in zip(df_submissions[SubmissionColumns.STEP_ID.value],
+                                               df_submissions[SubmissionColumns.LANG.value],
+                                               df_submissions[SubmissionColumns.CODE.value],
+                                               df_submissions[issues_column])
+    ]
+    return [bodies[i % len(bodies)] for i in range(requests_number)]
+
+
+def run_load_test(url: str, bodies: List[Dict], concurrency: int) -> Dict[str, float]:
+    """ Send all requests with given concurrency and collect throughput and latency statistics. """
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda body: send_filter_request(url, body), bodies))
+    total_time = time.perf_counter() - start
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    p50, p90, p99 = [quantiles(latencies, n=100)[q - 1] for q in (50, 90, 99)] if len(latencies) > 1 \
+        else latencies * 3
+    return {
+        'requests': len(results),
+        'errors': sum(not is_ok for _, is_ok in results),
+        'requests_per_second': len(results) / total_time,
+        'latency_p50_ms': p50,
+        'latency_p90_ms': p90,
+        'latency_p99_ms': p99,
+        'latency_max_ms': latencies[-1],
+    }
+
+
+def configure_parser(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('submissions_path', type=str, help='Path to .csv file with submissions to send.')
+    parser.add_argument('issues_column', type=str,
+                        help='Column where issues stored.',
+                        choices=[SubmissionColumns.HYPERSTYLE_ISSUES.value, SubmissionColumns.QODANA_ISSUES.value])
+    parser.add_argument('--url', type=str, default='http://localhost:8080', help='Base url of the service.')
+    parser.add_argument('-n', '--requests-number', type=int, default=1000, help='Number of requests to send.')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='Number of concurrent requests.')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    configure_parser(parser)
+
+    args = parser.parse_args(sys.argv[1:])
+    bodies = build_requests(read_df(args.submissions_path), args.issues_column, args.requests_number)
+    stats = run_load_test(f'{args.url.rstrip("/")}{FILTER_ENDPOINT}', bodies, args.concurrency)
+
+    for name, value in stats.items():
+        print(f'{name}: {value:.2f}' if isinstance(value, float) else f'{name}: {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,8 @@
 import ast
+import hashlib
 import pandas as pd
 
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 
 from core.src.model.column_name import StepColumns
 from core.src.utils.quality.code_utils import split_code_to_lines
@@ -35,6 +36,61 @@ def parse_template_from_dict(template_dict: str, lang: Optional[str] = None, kee
     return split_code_to_lines(templates_code[lang], keep_ends=keep_ends)
 
 
+def normalize_template_lines(template_lines: List[str]) -> List[str]:
+    """ Remove line ends, trailing whitespaces and trailing empty lines, which do not change the template. """
+
+    normalized_lines = [line.rstrip() for line in template_lines]
+    while normalized_lines and not normalized_lines[-1]:
+        normalized_lines.pop()
+
+    return normalized_lines
+
+
+def get_template_fingerprint(template_lines: List[str], lang: Optional[str] = None, normalize: bool = True) -> str:
+    """
+    Get hash of parsed template lines, so templates are identical regardless of the format they were stored in.
+    If `normalize` is True, line ends, trailing whitespaces and trailing empty lines are ignored too.
+    Identical templates in different languages have different hashes.
+    """
+
+    if normalize:
+        template_lines = normalize_template_lines(template_lines)
+    template_code = '\n'.join(template_lines)
+    return hashlib.sha1(f'{lang}\n{template_code}'.encode()).hexdigest()
+
+
+class StepTemplates:
+    """
+    Templates of steps, each of them is parsed only once.
+    Steps with identical templates share the same list of template lines, so it can be preprocessed once too.
+    If `keep_ends` is True, lines are compared as they are, otherwise templates differing only in line ends,
+    trailing whitespaces and trailing empty lines are identical.
+    """
+
+    def __init__(self, df_steps: pd.DataFrame, keep_ends: bool = False):
+        self._steps = {step[StepColumns.ID.value]: step for _, step in df_steps.iterrows()}
+        self._keep_ends = keep_ends
+        self._fingerprints: Dict[Tuple[int, Optional[str]], str] = {}
+        self._templates: Dict[str, List[str]] = {}
+
+    def get_fingerprint(self, step_id: int, lang: Optional[str] = None) -> str:
+        key = (step_id, lang)
+        if key not in self._fingerprints:
+            template_lines = parse_template_code_from_step(self._steps[step_id], lang, keep_ends=self._keep_ends)
+            fingerprint = get_template_fingerprint(template_lines, lang, normalize=not self._keep_ends)
+            self._templates.setdefault(fingerprint, template_lines)
+            self._fingerprints[key] = fingerprint
+
+        return self._fingerprints[key]
+
+    def get_template(self, step_id: int, lang: Optional[str] = None) -> List[str]:
+        return self._templates[self.get_fingerprint(step_id, lang)]
+
+    def get_templates_count(self) -> int:
+        """ Get number of distinct templates among already requested ones. """
+        return len(self._templates)
+
+
 # TODO: support multi-line comments
 def is_comment(code_line) -> bool:
     return code_line.lstrip().startswith("#") or code_line.lstrip().startswith("//")
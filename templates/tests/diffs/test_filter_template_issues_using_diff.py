@@ -1,9 +1,10 @@
 import pandas as pd
 import pytest
 
-from core.src.model.column_name import IssuesColumns, SubmissionColumns
+from core.src.model.column_name import IssuesColumns, StepColumns, SubmissionColumns
 from core.src.utils.df_utils import read_df, equal_df
 from templates.src.diffs.filter_by_diff import filter_template_issues_using_diff, create_templates_issues_df
+from templates.src.utils.template_utils import StepTemplates, parse_template_code_from_str
 from templates.tests.diffs import DIFF_TEMPLATE_ISSUES_FOLDER, SUBMISSIONS_FILE, STEPS_FILE
 
 TEMPLATE_ISSUES_TEST_DATA = [
@@ -44,3 +45,24 @@ def test_filter_template_issues_using_diff(submissions_path: str,
     df_template_issues = create_templates_issues_df(df_filtered_issues, issues_column)
     df_template_issues_expected = read_df(DIFF_TEMPLATE_ISSUES_FOLDER / template_issues)
     assert equal_df(df_template_issues_expected, df_template_issues)
+
+
+
+@pytest.mark.parametrize(('keep_ends', 'templates_count'), [(True, 2), (False, 1)])
+def test_step_templates_with_formatted_template_twin(keep_ends: bool, templates_count: int):
+    df_steps = read_df(DIFF_TEMPLATE_ISSUES_FOLDER / STEPS_FILE).head(1)
+    # Twin of the step differs only in trailing whitespaces, diffs with it would have other positions
+    template = df_steps[StepColumns.CODE_TEMPLATE.value].iloc[0]
+    df_twin_steps = df_steps.assign(**{
+        StepColumns.ID.value: 5,
+        StepColumns.CODE_TEMPLATE.value: template.replace('\n', ' \n'),
+    })
+    step_templates = StepTemplates(pd.concat([df_twin_steps, df_steps]), keep_ends=keep_ends)
+
+    twin_template = step_templates.get_template(5, 'python3')
+    actual_template = step_templates.get_template(1, 'python3')
+
+    assert step_templates.get_templates_count() == templates_count
+    assert twin_template == parse_template_code_from_str(template.replace('\n', ' \n'), keep_ends=keep_ends)
+    if keep_ends:
+        assert actual_template == parse_template_code_from_str(template, keep_ends=True)
@@ -3,6 +3,7 @@ from typing import Optional, Union
 import pytest
 
 from templates.src.freq.utils.code_comparator import CodeComparator
+from templates.src.freq.utils.code_compare_utils import bounded_edit_distance, edit_distance
 
 LINES_TEST_DATA = [
     ('abc = 1', 'abc = 1', 'edit_distance', False, False, None, True),
@@ -37,3 +38,24 @@ def test_template_matching(code_line: str,
                                      ignore_trailing_whitespaces, equal_upper_bound)
 
     assert code_comparator.is_equal(code_line, template_line) == result
+
+
+BOUNDED_EDIT_DISTANCE_TEST_DATA = [
+    ('', '', 0),
+    ('abc', 'abc', 0),
+    ('abc', '', 2),
+    ('abc = 1', 'abc =  1', 1),
+    ('abc = 1', 'abd = 2', 1),
+    ('abc = 1', 'abd = 2', 3),
+    ('kitten', 'sitting', 2),
+    ('kitten', 'sitting', 3),
+    ('print(x)', 'x = input()', 4),
+]
+
+
+@pytest.mark.parametrize(('first_string', 'second_string', 'upper_bound'), BOUNDED_EDIT_DISTANCE_TEST_DATA)
+def test_bounded_edit_distance(first_string: str, second_string: str, upper_bound: int):
+    distance = edit_distance(first_string, second_string)
+    expected = distance if distance <= upper_bound else upper_bound + 1
+
+    assert bounded_edit_distance(first_string, second_string, upper_bound) == expected
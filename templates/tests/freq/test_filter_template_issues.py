@@ -1,11 +1,14 @@
 from typing import Optional, Union
 
+import pandas as pd
 import pytest
 
-from core.src.model.column_name import SubmissionColumns
+from core.src.model.column_name import StepColumns, SubmissionColumns
 from core.src.utils.df_utils import read_df, equal_df
+from templates.src.freq import filter_by_freq
 from templates.src.freq.filter_by_freq import filter_template_issues
 from templates.src.freq.utils.code_comparator import CodeComparator
+from templates.src.utils.template_utils import parse_template_code_from_step
 from templates.tests.freq import FREQ_TEMPLATE_ISSUES_FOLDER
 
 TEMPLATE_ISSUES_FOLDER = FREQ_TEMPLATE_ISSUES_FOLDER / 'template_issues'
@@ -42,3 +45,30 @@ def test_filter_template_issues(templates_issues_path: str,
 
     df_result = read_df(TEMPLATE_ISSUES_FOLDER / result_path)
     assert equal_df(df_filtered_issues, df_result)
+
+
+def test_filter_template_issues_parses_template_once(monkeypatch: pytest.MonkeyPatch):
+    df_templates_issues = read_df(TEMPLATE_ISSUES_FOLDER / 'template_issues_python3_hyperstyle.csv')
+    df_steps = read_df(TEMPLATE_ISSUES_FOLDER / 'steps.csv')
+    df_submissions = read_df(TEMPLATE_ISSUES_FOLDER / 'submissions_python3_hyperstyle.csv')
+    # The step without template issues has no template at all, so it can not be parsed
+    df_submissions = pd.concat([df_submissions, df_submissions.assign(**{SubmissionColumns.STEP_ID.value: 2})])
+    df_steps = pd.concat([df_steps, df_steps.assign(**{
+        StepColumns.ID.value: 2,
+        StepColumns.CODE_TEMPLATE.value: None,
+    })])
+
+    parsed_steps = []
+
+    def parse_template(step: pd.Series, lang: Optional[str] = None):
+        parsed_steps.append(step[StepColumns.ID.value])
+        return parse_template_code_from_step(step, lang)
+
+    monkeypatch.setattr(filter_by_freq, 'parse_template_code_from_step', parse_template)
+    df_filtered_issues = filter_template_issues(df_templates_issues, df_submissions, df_steps,
+                                                SubmissionColumns.HYPERSTYLE_ISSUES.value,
+                                                CodeComparator('edit_distance', False, False, 0))
+
+    assert parsed_steps == [1]
+    df_result = read_df(TEMPLATE_ISSUES_FOLDER / 'filtered_submissions_python3_hyperstyle.csv')
+    assert equal_df(df_filtered_issues.iloc[:df_result.shape[0]], df_result)
@@ -1,12 +1,24 @@
+from pathlib import Path
 from typing import List, Optional, Tuple, Union
 
+import pandas as pd
 import pytest
 
-from core.src.model.column_name import SubmissionColumns
-from core.src.utils.df_utils import read_df
-from templates.src.freq.search_template_issues import RepetitiveIssue, get_repetitive_issues
+from core.src.model.column_name import StepColumns, SubmissionColumns
+from core.src.utils.df_utils import equal_df, read_df, write_df
+from templates.src.freq.model.repetitive_issue import RepetitiveIssue
+from templates.src.freq.search_template_issues import (
+    get_processed_steps_path,
+    get_repetitive_issues,
+    get_series_states_path,
+    group_submissions_by_template,
+    iterate_repetitive_issues_stats,
+    search_repetitive_issues,
+    search_template_issues,
+)
 from templates.src.freq.utils.code_comparator import CodeComparator
-from templates.tests.freq import FREQ_TEMPLATE_ISSUES_FOLDER
+from templates.src.freq.utils.template_columns import TemplateColumns
+from templates.tests.freq import FREQ_TEMPLATE_ISSUES_FOLDER, STEPS_FILE, SUBMISSIONS_FILE
 
 REPETITIVE_ISSUES_FOLDER = FREQ_TEMPLATE_ISSUES_FOLDER / 'repetitive_issues'
 LINES_TEST_DATA = [
@@ -14,13 +26,13 @@ LINES_TEST_DATA = [
      ['e = 2.718281828459045',
       '# put your python code here'],
      SubmissionColumns.HYPERSTYLE_ISSUES.value,
-     'edit_distance', False, False, 0, [RepetitiveIssue('WPS446', 0, 'e = 2.718281828459045', None, None)]),
+     'edit_distance', False, False, 0, [RepetitiveIssue('WPS446', 0, 'e = 2.718281828459045')]),
     ('in_2_submission_series_python3_hyperstyle.csv',
      ['e = 2.718281828459045',
       '# put your python code here'],
      SubmissionColumns.HYPERSTYLE_ISSUES.value,
-     'edit_distance', False, False, 0, [RepetitiveIssue('WPS446', 0, 'e = 2.718281828459045', None, None),
-                                        RepetitiveIssue('WPS237', None, 'print(f"{e:.5f}")', None, None)]),
+     'edit_distance', False, False, 0, [RepetitiveIssue('WPS446', 0, 'e = 2.718281828459045'),
+                                        RepetitiveIssue('WPS237', None, 'print(f"{e:.5f}")')]),
     ('in_3_submission_series_python3_hyperstyle.csv',
      ['e = 2.718281828459045',
       '# put your python code here'],
@@ -51,3 +63,181 @@ def test_get_repetitive_issues(submission_series_path: str,
         get_repetitive_issues(df_submission_series, template_lines, issues_column, code_comparator)
 
     assert set(actual_repetitive_issues) == set(repetitive_issues)
+
+
+def test_search_repetitive_issues_in_parallel():
+    template_issues_folder = FREQ_TEMPLATE_ISSUES_FOLDER / 'template_issues'
+    df_submissions = read_df(template_issues_folder / SUBMISSIONS_FILE)
+    df_steps = read_df(template_issues_folder / STEPS_FILE)
+
+    # Copy the single step to have several independent steps for workers
+    df_submissions = pd.concat([df_submissions, df_submissions.assign(**{SubmissionColumns.STEP_ID.value: 2})])
+    df_steps = pd.concat([df_steps, df_steps.assign(**{StepColumns.ID.value: 2})])
+
+    code_comparator = CodeComparator('edit_distance', False, False, 0)
+
+    df_expected = search_repetitive_issues(df_submissions, df_steps.copy(), SubmissionColumns.HYPERSTYLE_ISSUES.value,
+                                           code_comparator)
+    df_actual = search_repetitive_issues(df_submissions, df_steps.copy(), SubmissionColumns.HYPERSTYLE_ISSUES.value,
+                                         code_comparator, n_workers=2)
+
+    assert equal_df(df_expected, df_actual)
+
+
+@pytest.mark.parametrize('keep_series_states', [False, True])
+def test_collect_repetitive_issues_stats_with_series_states(keep_series_states: bool):
+    template_issues_folder = FREQ_TEMPLATE_ISSUES_FOLDER / 'template_issues'
+    df_submissions = read_df(template_issues_folder / SUBMISSIONS_FILE)
+    df_steps = read_df(template_issues_folder / STEPS_FILE)
+
+    code_comparator = CodeComparator('edit_distance', False, False, 0)
+    steps_stats = list(iterate_repetitive_issues_stats(df_submissions, df_steps,
+                                                       SubmissionColumns.HYPERSTYLE_ISSUES.value, code_comparator,
+                                                       keep_series_states=keep_series_states))
+
+    # Series are folded into counts, their states are kept only to merge statistics
+    series_count = df_submissions[SubmissionColumns.GROUP.value].nunique()
+    assert [len(step_stats.series_states) for step_stats in steps_stats] == [series_count if keep_series_states else 0]
+    assert [step_stats.submissions_count for step_stats in steps_stats] == [df_submissions.shape[0]]
+
+
+def test_search_repetitive_issues_with_pooled_steps():
+    template_issues_folder = FREQ_TEMPLATE_ISSUES_FOLDER / 'template_issues'
+    df_submissions = read_df(template_issues_folder / SUBMISSIONS_FILE)
+    df_steps = read_df(template_issues_folder / STEPS_FILE)
+
+    # Copy the single step with other submission series to have two steps with identical templates
+    groups_shift = df_submissions[SubmissionColumns.GROUP.value].max() + 1
+    df_submissions = pd.concat([df_submissions, df_submissions.assign(**{
+        SubmissionColumns.STEP_ID.value: 2,
+        SubmissionColumns.GROUP.value: df_submissions[SubmissionColumns.GROUP.value] + groups_shift,
+    })])
+    df_steps = pd.concat([df_steps, df_steps.assign(**{StepColumns.ID.value: 2})])
+
+    code_comparator = CodeComparator('edit_distance', False, False, 0)
+
+    df_by_step = search_repetitive_issues(df_submissions, df_steps, SubmissionColumns.HYPERSTYLE_ISSUES.value,
+                                          code_comparator)
+    df_pooled = search_repetitive_issues(df_submissions, df_steps, SubmissionColumns.HYPERSTYLE_ISSUES.value,
+                                         code_comparator, pool_steps=True)
+
+    assert df_pooled[SubmissionColumns.STEP_ID.value].tolist() == df_by_step[SubmissionColumns.STEP_ID.value].tolist()
+    assert (df_pooled[TemplateColumns.COUNT.value] == 2 * df_by_step[TemplateColumns.COUNT.value]).all()
+    assert (df_pooled[TemplateColumns.TOTAL_COUNT.value] == 2 * df_by_step[TemplateColumns.TOTAL_COUNT.value]).all()
+    assert (df_pooled[TemplateColumns.FREQUENCY.value] == df_by_step[TemplateColumns.FREQUENCY.value]).all()
+    # Each step keeps only its own groups, so its samples are not taken from the other step
+    for step_id, groups in zip(df_pooled[SubmissionColumns.STEP_ID.value], df_pooled[TemplateColumns.GROUPS.value]):
+        step_groups = df_submissions.loc[df_submissions[SubmissionColumns.STEP_ID.value] == step_id,
+                                         SubmissionColumns.GROUP.value]
+        assert groups and set(groups).issubset(step_groups)
+
+
+def test_group_submissions_by_template_with_different_formatting():
+    template_issues_folder = FREQ_TEMPLATE_ISSUES_FOLDER / 'template_issues'
+    df_submissions = read_df(template_issues_folder / SUBMISSIONS_FILE)
+    df_steps = read_df(template_issues_folder / STEPS_FILE)
+
+    template = df_steps[StepColumns.CODE_TEMPLATE.value].iloc[0]
+    df_submissions = pd.concat([df_submissions, df_submissions.assign(**{SubmissionColumns.STEP_ID.value: 2})])
+    df_steps = pd.concat([df_steps, df_steps.assign(**{
+        StepColumns.ID.value: 2,
+        StepColumns.CODE_TEMPLATE.value: template.replace('\n', '  \r\n') + '\n\n',
+    })])
+
+    templates_submissions = group_submissions_by_template(df_submissions, df_steps)
+
+    assert len(templates_submissions) == 1
+    assert set(templates_submissions[0][1][SubmissionColumns.STEP_ID.value]) == {1, 2}
+
+
+NO_ISSUES_REPORT = '{"quality": {"code": "EXCELLENT", "text": "Code quality (beta): EXCELLENT"}, "issues": []}'
+
+
+def write_steps_with_different_templates(tmp_path: Path) -> Tuple[Path, Path]:
+    """ Write submissions of three steps with different templates, the second step has no repetitive issues. """
+
+    template_issues_folder = FREQ_TEMPLATE_ISSUES_FOLDER / 'template_issues'
+    df_submissions = read_df(template_issues_folder / SUBMISSIONS_FILE)
+    df_steps = read_df(template_issues_folder / STEPS_FILE)
+
+    submissions_path = tmp_path / 'submissions.csv'
+    steps_path = tmp_path / 'steps.csv'
+    write_df(pd.concat([
+        df_submissions,
+        df_submissions.assign(**{
+            SubmissionColumns.STEP_ID.value: 2,
+            SubmissionColumns.HYPERSTYLE_ISSUES.value: NO_ISSUES_REPORT,
+        }),
+        df_submissions.assign(**{SubmissionColumns.STEP_ID.value: 3}),
+    ]), submissions_path)
+    write_df(pd.concat([
+        df_steps,
+        df_steps.assign(**{StepColumns.ID.value: 2, StepColumns.CODE_TEMPLATE.value: 'print(e)'}),
+        df_steps.assign(**{StepColumns.ID.value: 3, StepColumns.CODE_TEMPLATE.value: 'e = 2.718281828459045'}),
+    ]), steps_path)
+
+    return submissions_path, steps_path
+
+
+def test_search_template_issues_in_parallel(tmp_path: Path):
+    submissions_path, steps_path = write_steps_with_different_templates(tmp_path)
+
+    expected_path = tmp_path / 'expected.csv'
+    search_template_issues(submissions_path, steps_path, expected_path, SubmissionColumns.HYPERSTYLE_ISSUES.value,
+                           'edit_distance', False, False)
+    actual_path = tmp_path / 'actual.csv'
+    search_template_issues(submissions_path, steps_path, actual_path, SubmissionColumns.HYPERSTYLE_ISSUES.value,
+                           'edit_distance', False, False, n_workers=3)
+
+    df_expected = read_df(expected_path)
+    assert df_expected[SubmissionColumns.STEP_ID.value].tolist() == [1, 1, 3, 3]
+    assert equal_df(df_expected, read_df(actual_path))
+    assert read_df(get_processed_steps_path(actual_path))[SubmissionColumns.STEP_ID.value].tolist() == [1, 2, 3]
+
+
+def test_search_template_issues_with_resume(tmp_path: Path):
+    submissions_path, steps_path = write_steps_with_different_templates(tmp_path)
+
+    expected_path = tmp_path / 'expected.csv'
+    search_template_issues(submissions_path, steps_path, expected_path, SubmissionColumns.HYPERSTYLE_ISSUES.value,
+                           'edit_distance', False, False)
+    df_expected = read_df(expected_path)
+
+    # Imitate the search interrupted while the third step is saved:
+    # its rows are in the output, but it is not recorded as processed yet
+    actual_path = tmp_path / 'actual.csv'
+    write_df(df_expected.head(3), actual_path)
+    write_df(pd.DataFrame({SubmissionColumns.STEP_ID.value: [1, 2]}), get_processed_steps_path(actual_path))
+    search_template_issues(submissions_path, steps_path, actual_path, SubmissionColumns.HYPERSTYLE_ISSUES.value,
+                           'edit_distance', False, False, resume=True)
+
+    assert equal_df(df_expected, read_df(actual_path))
+    # The step without repetitive issues is not processed again
+    assert read_df(get_processed_steps_path(actual_path))[SubmissionColumns.STEP_ID.value].tolist() == [1, 2, 3]
+
+
+def test_search_template_issues_with_stats(tmp_path: Path):
+    template_issues_folder = FREQ_TEMPLATE_ISSUES_FOLDER / 'template_issues'
+    df_submissions = read_df(template_issues_folder / SUBMISSIONS_FILE)
+    stats_path = tmp_path / 'stats.json'
+
+    # The last attempt of the series is not in the first part of submissions
+    first_part_path = tmp_path / 'first_part.csv'
+    write_df(df_submissions.iloc[:-1], first_part_path)
+    submissions_path = tmp_path / 'submissions.csv'
+    write_df(df_submissions, submissions_path)
+
+    expected_path = tmp_path / 'expected.csv'
+    search_template_issues(submissions_path, template_issues_folder / STEPS_FILE, expected_path,
+                           SubmissionColumns.HYPERSTYLE_ISSUES.value, 'edit_distance', False, False)
+
+    actual_path = tmp_path / 'actual.csv'
+    for path in [first_part_path, submissions_path, submissions_path]:
+        search_template_issues(path, template_issues_folder / STEPS_FILE, actual_path,
+                               SubmissionColumns.HYPERSTYLE_ISSUES.value, 'edit_distance', False, False,
+                               stats_path=stats_path)
+
+    # Merging the same submissions again changes nothing, continued series is counted once
+    assert equal_df(read_df(expected_path), read_df(actual_path))
+    assert 'series_states' not in stats_path.read_text()
+    assert get_series_states_path(stats_path).exists()
@@ -0,0 +1,98 @@
+from pathlib import Path
+from typing import List
+
+from templates.src.freq.model.repetitive_issue import (
+    RepetitiveIssue,
+    RepetitiveIssueStats,
+    StepRepetitiveIssuesStats,
+    SubmissionSeriesState,
+    merge_steps_stats,
+    read_series_states,
+    read_steps_stats,
+    write_series_states,
+    write_steps_stats,
+)
+
+FIRST_ISSUE = RepetitiveIssue('WPS446', 0, 'e = 2.718281828459045', 'Found approximate constant')
+SECOND_ISSUE = RepetitiveIssue('WPS237', None, 'print(f"{e:.5f}")', 'Found a too complex `f` string')
+
+
+def get_step_stats(step_id: int, series_states: List[SubmissionSeriesState]) -> StepRepetitiveIssuesStats:
+    step_stats = StepRepetitiveIssuesStats(step_id)
+    for series_state in series_states:
+        step_stats.add_series(series_state, submissions_count=2, keep_state=True)
+    return step_stats
+
+
+def test_merge_steps_stats():
+    first_step_states = [
+        SubmissionSeriesState(1, 1, 0, 2, [FIRST_ISSUE]),
+        SubmissionSeriesState(1, 2, 1, 4, [FIRST_ISSUE, SECOND_ISSUE]),
+    ]
+    second_step_states = [SubmissionSeriesState(2, 3, 2, 6, [SECOND_ISSUE])]
+    steps_stats = {1: get_step_stats(1, first_step_states), 2: get_step_stats(2, second_step_states)}
+    series_states = {state.get_key(): state for state in first_step_states + second_step_states}
+    new_steps_stats = [
+        get_step_stats(1, [
+            SubmissionSeriesState(1, 5, 5, 8, [FIRST_ISSUE]),
+            SubmissionSeriesState(1, 6, 6, 10, [FIRST_ISSUE, SECOND_ISSUE]),
+        ]),
+        get_step_stats(3, [SubmissionSeriesState(3, 7, 7, 12, [])]),
+    ]
+
+    merged_steps_stats = merge_steps_stats(steps_stats, new_steps_stats, series_states, max_groups=3)
+
+    assert {step_id: step_stats.submissions_count for step_id, step_stats in merged_steps_stats.items()} == {
+        1: 8, 2: 2, 3: 2,
+    }
+    assert merged_steps_stats[1].issues_stats == [
+        RepetitiveIssueStats(FIRST_ISSUE, 4, [0, 1, 5]),
+        RepetitiveIssueStats(SECOND_ISSUE, 2, [1, 6]),
+    ]
+    assert merged_steps_stats[2].issues_stats == [RepetitiveIssueStats(SECOND_ISSUE, 1, [2])]
+    assert merged_steps_stats[3].issues_stats == []
+    assert sorted(series_states) == [(1, 1), (1, 2), (1, 5), (1, 6), (2, 3), (3, 7)]
+
+
+def test_merge_steps_stats_with_continued_series():
+    series_state = SubmissionSeriesState(1, 1, 0, 2, [FIRST_ISSUE, SECOND_ISSUE])
+    steps_stats = {1: get_step_stats(1, [series_state])}
+    series_states = {series_state.get_key(): series_state}
+    # New attempt of the same series has only one of the issues, its group id is other in the new run
+    new_steps_stats = [
+        get_step_stats(1, [
+            SubmissionSeriesState(1, 1, 5, 3, [SECOND_ISSUE]),
+            SubmissionSeriesState(1, 2, 6, 4, [FIRST_ISSUE]),
+        ]),
+    ]
+
+    merged_steps_stats = merge_steps_stats(steps_stats, new_steps_stats, series_states)
+
+    assert merged_steps_stats[1].submissions_count == 6
+    assert merged_steps_stats[1].issues_stats == [
+        RepetitiveIssueStats(SECOND_ISSUE, 1, [0]),
+        RepetitiveIssueStats(FIRST_ISSUE, 1, [6]),
+    ]
+    assert series_states[(1, 1)] == SubmissionSeriesState(1, 1, 0, 3, [SECOND_ISSUE])
+
+
+def test_read_and_write_steps_stats(tmp_path: Path):
+    series_state = SubmissionSeriesState(1, 2, 1, 3, [FIRST_ISSUE, SECOND_ISSUE])
+    steps_stats = {1: get_step_stats(1, [SubmissionSeriesState(1, 1, 0, 2, [FIRST_ISSUE]), series_state])}
+    stats_path = tmp_path / 'stats.json'
+
+    write_steps_stats(steps_stats, stats_path)
+    actual_steps_stats = read_steps_stats(stats_path)
+
+    # States of series are not saved with statistics
+    assert actual_steps_stats == {1: StepRepetitiveIssuesStats(1, 4, steps_stats[1].issues_stats)}
+    assert actual_steps_stats[1].issues_stats[0].issue.description == FIRST_ISSUE.description
+
+
+def test_read_and_write_series_states(tmp_path: Path):
+    series_states = {(1, 2): SubmissionSeriesState(1, 2, 1, 3, [FIRST_ISSUE, SECOND_ISSUE])}
+    series_states_path = tmp_path / 'stats_series.json'
+
+    write_series_states(series_states, series_states_path)
+
+    assert read_series_states(series_states_path) == series_states
@@ -1,4 +1,5 @@
 import sys
+from pathlib import Path
 
 from core.src.model.column_name import SubmissionColumns
 from core.src.utils.subprocess_runner import run_in_subprocess
@@ -34,3 +35,31 @@ def test_correct_arguments():
     assert 'Columns: [name, description, line, pos_in_template, count, groups, total_count, step_id, frequency]' \
            in stdout
     assert '[1 rows x 9 columns]' in stdout
+
+
+def test_with_additional_info(tmp_path: Path):
+    data_folder = 'template_issues'
+    command = [
+        sys.executable,
+        (MAIN_FOLDER.parent / 'freq' / 'postprocess.py'),
+        FREQ_TEMPLATE_ISSUES_FOLDER / data_folder / TEMPLATES_ISSUES_FILE,
+        FREQ_TEMPLATE_ISSUES_FOLDER / data_folder / SUBMISSIONS_FILE,
+        SubmissionColumns.HYPERSTYLE_ISSUES.value,
+        '--output-path', tmp_path,
+        '--with-additional-info',
+        '--n-workers', '2',
+    ]
+
+    stdout, stderr = run_in_subprocess(command)
+
+    assert stderr == ''
+    samples = sorted(path.relative_to(tmp_path / 'samples').as_posix() for path in tmp_path.rglob('*.py'))
+    assert samples == [
+        '1/WPS446/0/solution_1/attempt_1.py',
+        '1/WPS446/0/solution_2/attempt_2.py',
+        '1/WPS446/0/solution_3/attempt_3.py',
+        '1/WPS446/1/solution_4/attempt_1.py',
+        '1/WPS446/1/solution_5/attempt_2.py',
+        '1/WPS446/1/solution_6/attempt_3.py',
+    ]
+    assert '# WPS446' in (tmp_path / 'samples' / samples[0]).read_text()
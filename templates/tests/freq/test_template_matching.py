@@ -2,7 +2,7 @@ from typing import List, Optional, Union
 
 import pytest
 
-from templates.src.freq.matching.template_matching import match_code_with_template
+from templates.src.freq.matching.template_matching import ANCHORS_MATCH, MATCH_ALGORITHMS, match_code_with_template
 from templates.src.freq.utils.code_comparator import CodeComparator
 
 
@@ -48,12 +48,23 @@ TEMPLATE_TEST_DATA = [
     (['\t\tx = 1234 ', ''], ['x = 1234'], 'edit_distance', False, True, 0, [0, None], [0]),
 ]
 
+ANCHORS_TEMPLATE_TEST_DATA = [
+    # exactly equal lines are preferred to the fuzzy equal ones
+    (['x = 2', 'x = 1', 'y = 2'], ['x = 1', 'y = 2'], 'edit_distance', False, False, 1, [None, 0, 1], [1, 2]),
+    (['a', 'x = 3', 'b', 'y = 4', 'c'], ['a', 'x = 1', 'b', 'y = 2', 'c'],
+     'edit_distance', False, False, 1, [0, 1, 2, 3, 4], [0, 1, 2, 3, 4]),
+    (['b', 'a', 'c'], ['a', 'b', 'c'], 'edit_distance', False, False, 0, [None, 0, 2], [1, None, 2]),
+    (['// comment', 'x = 1 // code', 'y = 2'], ['x = 1', 'y = 2'],
+     'edit_distance', True, True, 0, [None, 0, 1], [1, 2]),
+]
+
 
 @pytest.mark.parametrize(
     ('code', 'template', 'equal_type', 'ignore_trailing_comments', 'ignore_trailing_whitespaces', 'equal_upper_bound',
      'code_to_template', 'template_to_code'),
     TEMPLATE_TEST_DATA,
 )
+@pytest.mark.parametrize('match_algorithm', MATCH_ALGORITHMS)
 def test_template_matching(code: List[str],
                            template: List[str],
                            equal_type: str,
@@ -61,11 +72,65 @@ def test_template_matching(code: List[str],
                            ignore_trailing_whitespaces: bool,
                            equal_upper_bound: Optional[Union[int, float]],
                            code_to_template: List[Optional[int]],
-                           template_to_code: List[Optional[int]]):
+                           template_to_code: List[Optional[int]],
+                           match_algorithm: str):
     code_comparator = CodeComparator(equal_type, ignore_trailing_comments,
                                      ignore_trailing_whitespaces, equal_upper_bound)
     actual_code_to_template, actual_template_to_code = \
-        match_code_with_template(code, template, code_comparator.is_equal, code_comparator.is_empty)
+        match_code_with_template(code, template, code_comparator.is_equal, code_comparator.is_empty,
+                                 match_algorithm, code_comparator.preprocess)
+
+    assert array_equal(actual_code_to_template, code_to_template)
+    assert array_equal(actual_template_to_code, template_to_code)
+
+
+@pytest.mark.parametrize(
+    ('code', 'template', 'equal_type', 'ignore_trailing_comments', 'ignore_trailing_whitespaces', 'equal_upper_bound',
+     'code_to_template', 'template_to_code'),
+    ANCHORS_TEMPLATE_TEST_DATA,
+)
+def test_template_matching_by_anchors(code: List[str],
+                                      template: List[str],
+                                      equal_type: str,
+                                      ignore_trailing_comments: bool,
+                                      ignore_trailing_whitespaces: bool,
+                                      equal_upper_bound: Optional[Union[int, float]],
+                                      code_to_template: List[Optional[int]],
+                                      template_to_code: List[Optional[int]]):
+    code_comparator = CodeComparator(equal_type, ignore_trailing_comments,
+                                     ignore_trailing_whitespaces, equal_upper_bound)
+    actual_code_to_template, actual_template_to_code = \
+        match_code_with_template(code, template, code_comparator.is_equal, code_comparator.is_empty,
+                                 ANCHORS_MATCH, code_comparator.preprocess)
+
+    assert array_equal(actual_code_to_template, code_to_template)
+    assert array_equal(actual_template_to_code, template_to_code)
+
+
+LSH_TEMPLATE_TEST_DATA = [
+    (['import sys', '', 'numbers = list(map(int, input().split()))', 'print(sum(numbers))'],
+     ['numbers = list(map(int, input().split()))', 'print(sum(number))'],
+     [None, None, 0, 1], [2, 3]),
+    (['def main():', '    name = input()', '    print(f"Hello, {name}!")', 'main()'],
+     ['def main():', '    # put your code here', 'main()'],
+     [0, None, None, 2], [0, None, 3]),
+    (['x = 10', 'y = x * 2', 'print(x, y)'], ['first_variable = 10', 'second_variable = 20'],
+     [None, None, None], [None, None]),
+]
+
+
+@pytest.mark.parametrize(('code', 'template', 'code_to_template', 'template_to_code'), LSH_TEMPLATE_TEST_DATA)
+@pytest.mark.parametrize('match_algorithm', MATCH_ALGORITHMS)
+def test_template_matching_with_lsh(code: List[str],
+                                    template: List[str],
+                                    code_to_template: List[Optional[int]],
+                                    template_to_code: List[Optional[int]],
+                                    match_algorithm: str):
+    code_comparator = CodeComparator('edit_ratio', True, True, use_lsh=True)
+    actual_code_to_template, actual_template_to_code = \
+        match_code_with_template(code, template, code_comparator.is_equal, code_comparator.is_empty,
+                                 match_algorithm, code_comparator.preprocess,
+                                 code_comparator.build_template_index(template))
 
     assert array_equal(actual_code_to_template, code_to_template)
     assert array_equal(actual_template_to_code, template_to_code)
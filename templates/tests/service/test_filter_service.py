@@ -0,0 +1,87 @@
+import json
+from threading import Thread
+
+import pytest
+import requests
+
+from core.src.model.column_name import SubmissionColumns
+from core.src.utils.df_utils import read_df
+from templates.src.service.filter_service import FILTER_ENDPOINT, create_server, read_template_issues_index
+from templates.src.utils.template_utils import TemplateCodeParseException
+from templates.tests import TEST_DATA_FOLDER
+from templates.tests.freq import FREQ_TEMPLATE_ISSUES_FOLDER, STEPS_FILE, SUBMISSIONS_FILE, TEMPLATES_ISSUES_FILE
+
+TEMPLATE_ISSUES_FOLDER = FREQ_TEMPLATE_ISSUES_FOLDER / 'template_issues'
+
+
+def test_read_template_issues_index_from_diffs():
+    template_issues_index = read_template_issues_index(TEST_DATA_FOLDER / 'diffs' / TEMPLATES_ISSUES_FILE)
+
+    assert template_issues_index == {
+        1: {('WPS446', 0): None},
+        2: {('SC200', 0): None, ('WPS446', 0): None},
+        3: {('WPS432', 0): None, ('WPS432', 1): None},
+        4: {('SC200', 3): None, ('SC200', 5): None, ('SC200', 8): None},
+    }
+
+
+def test_filter_service():
+    issues_column = SubmissionColumns.HYPERSTYLE_ISSUES.value
+    server = create_server(TEMPLATE_ISSUES_FOLDER / 'template_issues_python3_hyperstyle.csv',
+                           TEMPLATE_ISSUES_FOLDER / STEPS_FILE,
+                           issues_column,
+                           'edit_distance', False, False, port=0, equal_upper_bound=0)
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        url = f'http://localhost:{server.server_port}{FILTER_ENDPOINT}'
+        df_submissions = read_df(TEMPLATE_ISSUES_FOLDER / SUBMISSIONS_FILE)
+        df_expected = read_df(TEMPLATE_ISSUES_FOLDER / 'filtered_submissions_python3_hyperstyle.csv')
+
+        for (_, submission), (_, expected) in zip(df_submissions.iterrows(), df_expected.iterrows()):
+            response = requests.post(url, json={
+                SubmissionColumns.STEP_ID.value: int(submission[SubmissionColumns.STEP_ID.value]),
+                SubmissionColumns.LANG.value: submission[SubmissionColumns.LANG.value],
+                SubmissionColumns.CODE.value: submission[SubmissionColumns.CODE.value],
+                'issues': submission[issues_column],
+            })
+
+            assert response.status_code == requests.codes.ok
+            assert response.json()[issues_column] == json.loads(expected[issues_column])
+            assert response.json()[f'{issues_column}_diff'] == json.loads(expected[f'{issues_column}_diff'])
+
+        assert requests.post(url, json={}).status_code == requests.codes.bad_request
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.parametrize(('error', 'status_code'), [
+    (TemplateCodeParseException('Can not parse template code!'), requests.codes.bad_request),
+    (RuntimeError('Unexpected error'), requests.codes.internal_server_error),
+])
+def test_filter_service_with_error(monkeypatch: pytest.MonkeyPatch, error: Exception, status_code: int):
+    server = create_server(TEMPLATE_ISSUES_FOLDER / 'template_issues_python3_hyperstyle.csv',
+                           TEMPLATE_ISSUES_FOLDER / STEPS_FILE,
+                           SubmissionColumns.HYPERSTYLE_ISSUES.value,
+                           'edit_distance', False, False, port=0, equal_upper_bound=0)
+
+    def filter_issues(*args):
+        raise error
+
+    monkeypatch.setattr(server.catalog, 'filter_issues', filter_issues)
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        response = requests.post(f'http://localhost:{server.server_port}{FILTER_ENDPOINT}', json={
+            SubmissionColumns.STEP_ID.value: 1,
+            SubmissionColumns.LANG.value: 'python3',
+            SubmissionColumns.CODE.value: '',
+            'issues': '{}',
+        })
+
+        assert response.status_code == status_code
+        assert response.json() == {'error': repr(error)}
+    finally:
+        server.shutdown()
+        server.server_close()